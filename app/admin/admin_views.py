@@ -6,18 +6,34 @@ from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import JSONResponse
-from tortoise.expressions import Q
 
-from app.core.deps import get_current_active_user, get_current_superuser
-from app.core.security import get_password_hash
+from app.core.deps import get_current_active_principal, get_current_superuser, TokenPrincipal
+from app.core.security import hash_password_async, token_cache
+from app.core.password_hasher import password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.token_versions import token_versions
+from app.core.rate_limit import rate_limiter
+from app.core.response_cache import response_cache
+from app.core.cache_tags import USERS_NAMESPACE, invalidate_users
+from app.core.api_keys import API_KEY_SCOPES, api_key_resolver, generate_api_key, hash_api_key
+from app.core.db_router import get_routing_stats, use_replica
 from app.models.models import (
-    User, UserProfile,
-    IntervalSchedule, CrontabSchedule, PeriodicTask, TaskResult
+    User, UserProfile, ApiKey,
+    IntervalSchedule, CrontabSchedule
 )
 from app.services.task_scheduler import TaskSchedulerService
+from app.services.last_login import last_login_buffer
+from app.services.user_search import search_users
+from app.utils.database import get_database_stats
+from app.utils.pagination import count_total, paginate_cursor
+from app.utils.redis_client import redis_client
+from app.utils.serialization import json_bytes_response, render_page, response_fields
+from app.utils.tiered_cache import cache_invalidation_bus
 from .schemas import (
     # 用户管理
     UserAdminCreate, UserAdminUpdate, UserAdminResponse, UserListResponse,
+    # API 密钥
+    ApiKeyCreate, ApiKeyResponse, ApiKeyCreateResponse,
     # 间隔调度
     IntervalScheduleCreate, IntervalScheduleResponse,
     # Crontab调度
@@ -35,13 +51,29 @@ from .schemas import (
 
 router = APIRouter(prefix="/admin", tags=["Admin 管理"])
 
+# 变更后需要吊销已签发令牌的用户字段
+AUTH_FIELDS = {"username", "hashed_password", "is_active", "is_staff", "is_superuser"}
+
+# 用户列表排序（游标分页的排序字段，与 users 表的 (created_at, id) 索引对应）
+USER_ORDERING = ("-created_at", "-id")
+
+# 列表接口只查询响应中的列
+USER_LIST_FIELDS = response_fields(UserAdminResponse)
+CRONTAB_FIELDS = ("minute", "hour", "day_of_month", "month_of_year", "day_of_week")
+PERIODIC_TASK_LIST_FIELDS = (
+    response_fields(PeriodicTaskResponse, exclude=("interval_display", "crontab_display"))
+    + ("interval__every", "interval__period")
+    + tuple(f"crontab__{name}" for name in CRONTAB_FIELDS)
+)
+TASK_RESULT_LIST_FIELDS = response_fields(TaskResultResponse)
+
 
 # ============================================================================
 # 管理员权限检查
 # ============================================================================
 
-async def check_admin_permission(current_user: User = Depends(get_current_active_user)):
-    """检查管理员权限"""
+async def check_admin_permission(current_user: TokenPrincipal = Depends(get_current_active_principal)):
+    """检查管理员权限（基于令牌声明，无需查询数据库）"""
     if not (current_user.is_superuser or current_user.is_staff):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -55,35 +87,45 @@ async def check_admin_permission(current_user: User = Depends(get_current_active
 # ============================================================================
 
 @router.get("/users", response_model=UserListResponse, summary="获取用户列表")
+@use_replica
 async def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应中的 next_cursor，提供时忽略 skip）"),
+    with_total: bool = Query(True, description="是否返回总数（false 时不计数，total 为 null）"),
     is_active: Optional[bool] = None,
-    search: Optional[str] = None,
-    current_user: User = Depends(check_admin_permission)
+    search: Optional[str] = Query(None, description="按用户名或邮箱搜索（不少于 3 个字符时匹配子串，否则匹配前缀）"),
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
-    """获取用户列表（管理员）"""
+    """获取用户列表（管理员），响应由响应缓存中间件按用户命名空间缓存（ETag/304），用户写操作后整体失效"""
     query = User.all()
     
     if is_active is not None:
         query = query.filter(is_active=is_active)
     
-    if search:
-        query = query.filter(Q(username__icontains=search) | Q(email__icontains=search))
+    # 按用户名、邮箱搜索（索引查找，见 app/services/user_search.py）
+    query = search_users(query, search)
     
-    total = await query.count()
-    users = await query.offset(skip).limit(limit).order_by("-created_at")
+    # 总数按过滤条件单独缓存，翻页时不重复计数
+    total, total_is_estimate = await count_total(query, USERS_NAMESPACE, with_total)
+    page = await paginate_cursor(
+        query, USER_ORDERING, limit, cursor=cursor, offset=skip, fields=USER_LIST_FIELDS
+    )
     
-    return UserListResponse(
+    return json_bytes_response(render_page(
+        UserListResponse,
+        UserAdminResponse,
+        page.items,
         total=total,
-        items=[UserAdminResponse.model_validate(u, from_attributes=True) for u in users]
-    )
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor
+    ))
 
 
 @router.post("/users", response_model=UserAdminResponse, status_code=status.HTTP_201_CREATED, summary="创建用户")
 async def create_user(
     user_data: UserAdminCreate,
-    current_user: User = Depends(get_current_superuser)
+    current_user: TokenPrincipal = Depends(get_current_superuser)
 ):
     """创建新用户（仅超级管理员）"""
     # 检查用户名是否存在
@@ -101,7 +143,7 @@ async def create_user(
         )
     
     # 创建用户
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user = await User.create(
         username=user_data.username,
         email=user_data.email,
@@ -113,14 +155,16 @@ async def create_user(
     
     # 创建用户资料
     await UserProfile.create(user=user)
+    await invalidate_users(user.id)
     
     return UserAdminResponse.model_validate(user, from_attributes=True)
 
 
 @router.get("/users/{user_id}", response_model=UserAdminResponse, summary="获取用户详情")
+@use_replica
 async def get_user(
     user_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取用户详情"""
     user = await User.get_or_none(id=user_id)
@@ -136,7 +180,7 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_data: UserAdminUpdate,
-    current_user: User = Depends(get_current_superuser)
+    current_user: TokenPrincipal = Depends(get_current_superuser)
 ):
     """更新用户信息（仅超级管理员）"""
     user = await User.get_or_none(id=user_id)
@@ -147,6 +191,7 @@ async def update_user(
         )
     
     update_data = user_data.model_dump(exclude_unset=True)
+    old_username = user.username
     
     # 检查用户名唯一性
     if "username" in update_data:
@@ -166,20 +211,26 @@ async def update_user(
     
     # 处理密码
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await hash_password_async(update_data.pop("password"))
     
     # 更新用户
     for key, value in update_data.items():
         setattr(user, key, value)
     await user.save()
     
+    # 使认证用户缓存失效；权限、密码或用户名变更时吊销该用户已签发的令牌
+    await principal_cache.invalidate(old_username)
+    if update_data.keys() & AUTH_FIELDS:
+        await token_versions.bump(user.id)
+    await invalidate_users(user.id)
+    
     return UserAdminResponse.model_validate(user, from_attributes=True)
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除用户")
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_superuser)
+    current_user: TokenPrincipal = Depends(get_current_superuser)
 ):
     """删除用户（仅超级管理员）"""
     if user_id == current_user.id:
@@ -196,6 +247,79 @@ async def delete_user(
         )
     
     await user.delete()
+    await principal_cache.invalidate(user.username)
+    await token_versions.bump(user.id)
+    await invalidate_users(user.id)
+    return None
+
+
+# ============================================================================
+# API 密钥管理
+# ============================================================================
+
+def _api_key_response(api_key: ApiKey) -> ApiKeyResponse:
+    return ApiKeyResponse(
+        id=api_key.id,
+        name=api_key.name,
+        prefix=api_key.prefix,
+        scopes=api_key.get_scopes(),
+        is_active=api_key.is_active,
+        expires_at=api_key.expires_at,
+        last_used_at=api_key.last_used_at,
+        created_at=api_key.created_at
+    )
+
+
+@router.get("/api-keys", response_model=List[ApiKeyResponse], summary="获取API密钥列表")
+@use_replica
+async def list_api_keys(
+    current_user: TokenPrincipal = Depends(get_current_superuser)
+):
+    """获取 API 密钥列表（仅超级管理员）"""
+    api_keys = await ApiKey.all().order_by("-created_at")
+    return [_api_key_response(k) for k in api_keys]
+
+
+@router.post("/api-keys", response_model=ApiKeyCreateResponse, status_code=status.HTTP_201_CREATED, summary="创建API密钥")
+async def create_api_key(
+    data: ApiKeyCreate,
+    current_user: TokenPrincipal = Depends(get_current_superuser)
+):
+    """创建 API 密钥（仅超级管理员），完整密钥只在创建时返回一次"""
+    invalid_scopes = set(data.scopes) - API_KEY_SCOPES
+    if invalid_scopes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的权限范围: {', '.join(sorted(invalid_scopes))}"
+        )
+    
+    key, prefix = generate_api_key()
+    api_key = await ApiKey.create(
+        name=data.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+        scopes=",".join(sorted(set(data.scopes))),
+        expires_at=data.expires_at
+    )
+    return ApiKeyCreateResponse(**_api_key_response(api_key).model_dump(), key=key)
+
+
+@router.delete("/api-keys/{api_key_id}", status_code=status.HTTP_204_NO_CONTENT, summary="吊销API密钥")
+async def revoke_api_key(
+    api_key_id: int,
+    current_user: TokenPrincipal = Depends(get_current_superuser)
+):
+    """吊销 API 密钥（仅超级管理员）"""
+    api_key = await ApiKey.get_or_none(id=api_key_id)
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API密钥不存在"
+        )
+    
+    api_key.is_active = False
+    await api_key.save()
+    await api_key_resolver.invalidate(api_key.prefix)
     return None
 
 
@@ -204,8 +328,9 @@ async def delete_user(
 # ============================================================================
 
 @router.get("/schedules/intervals", response_model=List[IntervalScheduleResponse], summary="获取间隔调度列表")
+@use_replica
 async def list_intervals(
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取所有间隔调度"""
     intervals = await TaskSchedulerService.list_intervals()
@@ -224,7 +349,7 @@ async def list_intervals(
 @router.post("/schedules/intervals", response_model=IntervalScheduleResponse, status_code=status.HTTP_201_CREATED, summary="创建间隔调度")
 async def create_interval(
     data: IntervalScheduleCreate,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """创建间隔调度"""
     try:
@@ -248,7 +373,7 @@ async def create_interval(
 @router.delete("/schedules/intervals/{interval_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除间隔调度")
 async def delete_interval(
     interval_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """删除间隔调度"""
     if not await TaskSchedulerService.delete_interval(interval_id):
@@ -264,8 +389,9 @@ async def delete_interval(
 # ============================================================================
 
 @router.get("/schedules/crontabs", response_model=List[CrontabScheduleResponse], summary="获取Crontab调度列表")
+@use_replica
 async def list_crontabs(
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取所有 Crontab 调度"""
     crontabs = await TaskSchedulerService.list_crontabs()
@@ -288,7 +414,7 @@ async def list_crontabs(
 @router.post("/schedules/crontabs", response_model=CrontabScheduleResponse, status_code=status.HTTP_201_CREATED, summary="创建Crontab调度")
 async def create_crontab(
     data: CrontabScheduleCreate,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """创建 Crontab 调度"""
     crontab = await TaskSchedulerService.create_crontab(
@@ -314,7 +440,7 @@ async def create_crontab(
 @router.delete("/schedules/crontabs/{crontab_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除Crontab调度")
 async def delete_crontab(
     crontab_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """删除 Crontab 调度"""
     if not await TaskSchedulerService.delete_crontab(crontab_id):
@@ -330,54 +456,51 @@ async def delete_crontab(
 # ============================================================================
 
 @router.get("/tasks", response_model=PeriodicTaskListResponse, summary="获取定时任务列表")
+@use_replica
 async def list_periodic_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应中的 next_cursor，提供时忽略 skip）"),
+    with_total: bool = Query(True, description="是否返回总数（false 时不计数，total 为 null）"),
     enabled: Optional[bool] = None,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取定时任务列表"""
-    tasks = await TaskSchedulerService.list_periodic_tasks(
+    page = await TaskSchedulerService.page_periodic_tasks(
         enabled=enabled,
         limit=limit,
-        offset=skip
+        cursor=cursor,
+        offset=skip,
+        fields=PERIODIC_TASK_LIST_FIELDS
     )
     
-    total = await PeriodicTask.all().count()
+    total, total_is_estimate = await TaskSchedulerService.count_periodic_tasks(enabled=enabled, with_total=with_total)
     
-    items = []
-    for task in tasks:
-        item = PeriodicTaskResponse(
-            id=task.id,
-            name=task.name,
-            task=task.task,
-            interval_id=task.interval_id,
-            interval_display=str(task.interval) if task.interval else None,
-            crontab_id=task.crontab_id,
-            crontab_display=str(task.crontab) if task.crontab else None,
-            args=task.args,
-            kwargs=task.kwargs,
-            queue=task.queue,
-            priority=task.priority,
-            expires=task.expires,
-            one_off=task.one_off,
-            start_time=task.start_time,
-            enabled=task.enabled,
-            last_run_at=task.last_run_at,
-            total_run_count=task.total_run_count,
-            description=task.description,
-            created_at=task.created_at,
-            updated_at=task.updated_at
+    # 调度的显示文本由关联列计算
+    for row in page.items:
+        row["interval_display"] = (
+            IntervalSchedule.describe(row["interval__every"], row["interval__period"])
+            if row["interval_id"] else None
+        )
+        row["crontab_display"] = (
+            CrontabSchedule.describe(*(row[f"crontab__{name}"] for name in CRONTAB_FIELDS))
+            if row["crontab_id"] else None
         )
-        items.append(item)
     
-    return PeriodicTaskListResponse(total=total, items=items)
+    return json_bytes_response(render_page(
+        PeriodicTaskListResponse,
+        PeriodicTaskResponse,
+        page.items,
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor
+    ))
 
 
 @router.post("/tasks", response_model=PeriodicTaskResponse, status_code=status.HTTP_201_CREATED, summary="创建定时任务")
 async def create_periodic_task(
     data: PeriodicTaskCreate,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """创建定时任务"""
     try:
@@ -430,9 +553,10 @@ async def create_periodic_task(
 
 
 @router.get("/tasks/{task_id}", response_model=PeriodicTaskResponse, summary="获取定时任务详情")
+@use_replica
 async def get_periodic_task(
     task_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取定时任务详情"""
     task = await TaskSchedulerService.get_periodic_task(task_id)
@@ -470,7 +594,7 @@ async def get_periodic_task(
 async def update_periodic_task(
     task_id: int,
     data: PeriodicTaskUpdate,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """更新定时任务"""
     update_data = data.model_dump(exclude_unset=True)
@@ -512,7 +636,7 @@ async def update_periodic_task(
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除定时任务")
 async def delete_periodic_task(
     task_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """删除定时任务"""
     if not await TaskSchedulerService.delete_periodic_task(task_id):
@@ -526,7 +650,7 @@ async def delete_periodic_task(
 @router.post("/tasks/{task_id}/enable", response_model=dict, summary="启用定时任务")
 async def enable_task(
     task_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """启用定时任务"""
     if not await TaskSchedulerService.enable_task(task_id):
@@ -540,7 +664,7 @@ async def enable_task(
 @router.post("/tasks/{task_id}/disable", response_model=dict, summary="禁用定时任务")
 async def disable_task(
     task_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """禁用定时任务"""
     if not await TaskSchedulerService.disable_task(task_id):
@@ -554,7 +678,7 @@ async def disable_task(
 @router.post("/tasks/{task_id}/run", response_model=dict, summary="立即执行任务")
 async def run_task_now(
     task_id: int,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """立即执行定时任务"""
     task_result_id = await TaskSchedulerService.run_task_now(task_id)
@@ -571,37 +695,45 @@ async def run_task_now(
 # ============================================================================
 
 @router.get("/results", response_model=TaskResultListResponse, summary="获取任务执行结果列表")
+@use_replica
 async def list_task_results(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应中的 next_cursor，提供时忽略 skip）"),
+    with_total: bool = Query(True, description="是否返回总数（false 时不计数，total 为 null）"),
     task_name: Optional[str] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取任务执行结果列表"""
-    results = await TaskSchedulerService.list_task_results(
+    page = await TaskSchedulerService.page_task_results(
         task_name=task_name,
         status=status,
         limit=limit,
-        offset=skip
+        cursor=cursor,
+        offset=skip,
+        fields=TASK_RESULT_LIST_FIELDS
     )
     
-    query = TaskResult.all()
-    if task_name:
-        query = query.filter(task_name=task_name)
-    if status:
-        query = query.filter(status=status)
-    total = await query.count()
-    
-    items = [TaskResultResponse.model_validate(r, from_attributes=True) for r in results]
+    total, total_is_estimate = await TaskSchedulerService.count_task_results(
+        task_name=task_name, status=status, with_total=with_total
+    )
     
-    return TaskResultListResponse(total=total, items=items)
+    return json_bytes_response(render_page(
+        TaskResultListResponse,
+        TaskResultResponse,
+        page.items,
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor
+    ))
 
 
 @router.get("/results/{task_id}", response_model=TaskResultResponse, summary="获取任务执行结果详情")
+@use_replica
 async def get_task_result(
     task_id: str,
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取任务执行结果详情"""
     result = await TaskSchedulerService.get_task_result(task_id)
@@ -616,7 +748,7 @@ async def get_task_result(
 @router.delete("/results/cleanup", response_model=dict, summary="清理旧的任务结果")
 async def cleanup_task_results(
     days: int = Query(30, ge=1, le=365, description="保留最近N天的结果"),
-    current_user: User = Depends(get_current_superuser)
+    current_user: TokenPrincipal = Depends(get_current_superuser)
 ):
     """清理旧的任务结果（仅超级管理员）"""
     deleted_count = await TaskSchedulerService.cleanup_old_results(days=days)
@@ -628,8 +760,9 @@ async def cleanup_task_results(
 # ============================================================================
 
 @router.get("/statistics", response_model=TaskStatisticsResponse, summary="获取任务统计信息")
+@use_replica
 async def get_task_statistics(
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取任务统计信息"""
     stats = await TaskSchedulerService.get_task_statistics()
@@ -642,7 +775,7 @@ async def get_task_statistics(
 
 @router.get("/available-tasks", response_model=List[AvailableTaskResponse], summary="获取可用任务列表")
 async def get_available_tasks(
-    current_user: User = Depends(check_admin_permission)
+    current_user: TokenPrincipal = Depends(check_admin_permission)
 ):
     """获取系统中可用的 Celery 任务列表"""
     from celery_app.celery import celery_app
@@ -661,3 +794,29 @@ async def get_available_tasks(
             ))
     
     return available_tasks
+
+
+
+# ============================================================================
+# 系统运行指标
+# ============================================================================
+
+@router.get("/system/metrics", response_model=dict, summary="获取系统运行指标")
+async def get_system_metrics(
+    current_user: TokenPrincipal = Depends(get_current_superuser)
+):
+    """获取系统运行指标（仅超级管理员）"""
+    return {
+        "password_hasher": password_hasher.get_stats(),
+        "principal_cache": principal_cache.get_stats(),
+        "token_cache": token_cache.get_stats(),
+        "last_login_buffer": last_login_buffer.get_stats(),
+        "rate_limiter": rate_limiter.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "database_pool": get_database_stats(),
+        "database_routing": get_routing_stats(),
+        "redis_pool": redis_client.get_pool_stats(),
+        "redis_circuit": redis_client.breaker.get_stats(),
+        "read_through_cache": redis_client.get_cache_stats(),
+        "cache_invalidation": cache_invalidation_bus.get_stats(),
+    }
@@ -46,8 +46,36 @@ class UserAdminResponse(BaseModel):
 
 class UserListResponse(BaseModel):
     """用户列表响应"""
-    total: int
+    total: Optional[int] = None  # with_total=false 时为空
+    total_is_estimate: bool = False  # total 为数据库估算值（数据量较大时）
     items: List[UserAdminResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+
+
+# ==================== API 密钥 Schema ====================
+
+class ApiKeyCreate(BaseModel):
+    """创建 API 密钥"""
+    name: str = Field(..., min_length=1, max_length=100, description="密钥名称")
+    scopes: List[str] = Field(default=[], description="权限范围: admin/superuser/tasks")
+    expires_at: Optional[datetime] = Field(None, description="过期时间")
+
+
+class ApiKeyResponse(BaseModel):
+    """API 密钥响应"""
+    id: int
+    name: str
+    prefix: str
+    scopes: List[str]
+    is_active: bool
+    expires_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    created_at: datetime
+
+
+class ApiKeyCreateResponse(ApiKeyResponse):
+    """创建 API 密钥响应（完整密钥只返回这一次）"""
+    key: str
 
 
 # ==================== 间隔调度 Schema ====================
@@ -161,8 +189,10 @@ class PeriodicTaskResponse(BaseModel):
 
 class PeriodicTaskListResponse(BaseModel):
     """定时任务列表响应"""
-    total: int
+    total: Optional[int] = None  # with_total=false 时为空
+    total_is_estimate: bool = False  # total 为数据库估算值（数据量较大时）
     items: List[PeriodicTaskResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
 
 
 # ==================== 任务结果 Schema ====================
@@ -187,8 +217,10 @@ class TaskResultResponse(BaseModel):
 
 class TaskResultListResponse(BaseModel):
     """任务结果列表响应"""
-    total: int
+    total: Optional[int] = None  # with_total=false 时为空
+    total_is_estimate: bool = False  # total 为数据库估算值（数据量较大时）
     items: List[TaskResultResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
 
 
 # ==================== 统计信息 Schema ====================
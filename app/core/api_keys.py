@@ -0,0 +1,119 @@
+"""
+API 密钥
+密钥格式为 "<前缀标识>_<prefix>_<secret>"：
+- prefix 明文保存并建有唯一索引，用于 O(1) 查找
+- 完整密钥只保存 HMAC-SHA256 哈希，校验开销为一次 HMAC 计算（不使用 bcrypt）
+"""
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from config.settings import settings
+from app.models.models import ApiKey
+from app.utils.local_cache import LRUTTLCache
+from app.utils.tiered_cache import cache_invalidation_bus
+
+
+# 可分配给 API 密钥的权限范围
+# admin: 等同管理员（is_staff），superuser: 等同超级管理员，tasks: 调用任务接口
+API_KEY_SCOPES = frozenset({"admin", "superuser", "tasks"})
+
+
+def _secret() -> bytes:
+    return (settings.API_KEY_SECRET or settings.SECRET_KEY).encode("utf-8")
+
+
+def hash_api_key(key: str) -> str:
+    """计算 API 密钥的 HMAC-SHA256 哈希"""
+    return hmac.new(_secret(), key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """生成新的 API 密钥，返回 (完整密钥, 前缀)"""
+    prefix = secrets.token_hex(4)
+    key = f"{settings.API_KEY_PREFIX}_{prefix}_{secrets.token_urlsafe(32)}"
+    return key, prefix
+
+
+def parse_api_key_prefix(key: str) -> Optional[str]:
+    """从完整密钥中解析出前缀"""
+    parts = key.split("_", 2)
+    if len(parts) != 3 or parts[0] != settings.API_KEY_PREFIX or not parts[1]:
+        return None
+    return parts[1]
+
+
+class ApiKeyResolver:
+    """
+    API 密钥解析（按前缀缓存密钥记录，未知前缀做短时负缓存）
+    记录只缓存在进程内（密钥哈希不写入 Redis），吊销时通过缓存失效消息清除所有 worker 的缓存
+    """
+
+    namespace = "auth:api_key"
+
+    def __init__(self):
+        self.local = LRUTTLCache(maxsize=10000, ttl=settings.API_KEY_CACHE_TTL)
+        # 负缓存标记（未知前缀）
+        self._missing: Dict[str, Any] = {}
+        cache_invalidation_bus.register(self)
+
+    async def _load(self, prefix: str) -> Optional[Dict[str, Any]]:
+        record = self.local.get(prefix)
+        if record is not None:
+            return record or None
+
+        api_key = await ApiKey.get_or_none(prefix=prefix)
+        if api_key is None:
+            self.local.set(prefix, self._missing, ttl=min(settings.API_KEY_CACHE_TTL, 10))
+            return None
+
+        record = {
+            "id": api_key.id,
+            "name": api_key.name,
+            "key_hash": api_key.key_hash,
+            "scopes": frozenset(api_key.get_scopes()),
+            "is_active": api_key.is_active,
+            "expires_at": api_key.expires_at,
+        }
+        self.local.set(prefix, record)
+        # 仅在缓存未命中时记录使用时间，避免每个请求都写库
+        await ApiKey.filter(id=api_key.id).update(last_used_at=datetime.utcnow())
+        return record
+
+    async def resolve(self, key: str) -> Optional[Dict[str, Any]]:
+        """校验 API 密钥，成功时返回密钥记录（id、name、scopes）"""
+        prefix = parse_api_key_prefix(key)
+        if prefix is None:
+            return None
+
+        record = await self._load(prefix)
+        if record is None or not record["is_active"]:
+            return None
+        if not hmac.compare_digest(record["key_hash"], hash_api_key(key)):
+            return None
+
+        expires_at = record["expires_at"]
+        if expires_at is not None:
+            now = datetime.now(timezone.utc) if expires_at.tzinfo else datetime.utcnow()
+            if expires_at <= now:
+                return None
+        return record
+
+    async def invalidate(self, prefix: str):
+        """使指定前缀的缓存失效（包括其他 worker 进程的缓存）"""
+        self.local.delete(prefix)
+        await cache_invalidation_bus.publish(self.namespace, [prefix])
+
+
+# 全局 API 密钥解析器实例
+api_key_resolver = ApiKeyResolver()
+
+
+def scopes_to_flags(scopes: FrozenSet[str]) -> Dict[str, bool]:
+    """将权限范围映射为用户权限标志"""
+    return {
+        "is_staff": "admin" in scopes or "superuser" in scopes,
+        "is_superuser": "superuser" in scopes,
+    }
@@ -0,0 +1,54 @@
+"""
+缓存标签与命名空间
+集中定义读写两端共用的缓存命名空间/标签，写操作后调用对应的失效函数
+"""
+from app.utils.redis_client import redis_client
+
+
+# 用户列表等依赖全体用户数据的缓存
+USERS_NAMESPACE = "users"
+# 用户资料列表
+PROFILES_NAMESPACE = "profiles"
+# 定时任务及其间隔/Crontab 调度
+TASKS_NAMESPACE = "tasks"
+# 任务执行结果
+TASK_RESULTS_NAMESPACE = "task_results"
+
+
+def user_tag(user_id: int) -> str:
+    """依赖单个用户数据的缓存标签"""
+    return f"user:{user_id}"
+
+
+def namespace_tag(namespace: str) -> str:
+    """命名空间对应的标签（与 redis_client 的 namespace 参数一致）"""
+    return f"ns:{namespace}"
+
+
+async def invalidate_namespaces(*namespaces: str):
+    """使命名空间下的缓存全部失效"""
+    if redis_client.redis is None:
+        return
+    await redis_client.invalidate_tags(*(namespace_tag(namespace) for namespace in namespaces))
+
+
+async def invalidate_users(*user_ids: int):
+    """用户新增、修改或删除后，使用户列表及相关用户的缓存失效"""
+    if redis_client.redis is None:
+        return
+    await redis_client.invalidate_tags(namespace_tag(USERS_NAMESPACE), *(user_tag(user_id) for user_id in user_ids))
+
+
+async def invalidate_profiles():
+    """用户资料新增、修改或删除后，使资料列表缓存失效"""
+    await invalidate_namespaces(PROFILES_NAMESPACE)
+
+
+async def invalidate_tasks():
+    """定时任务或调度变更后，使任务列表与统计缓存失效"""
+    await invalidate_namespaces(TASKS_NAMESPACE)
+
+
+async def invalidate_task_results():
+    """任务结果写入或清理后，使结果列表与统计缓存失效"""
+    await invalidate_namespaces(TASK_RESULTS_NAMESPACE)
@@ -0,0 +1,240 @@
+"""
+读写分离路由（Tortoise 数据库路由）
+- 写操作、事务内的查询以及未标记的读取使用主库（default 连接）
+- use_replica 标记的只读代码中的读取分发到只读副本（replica 连接）
+- 读己之写：写入后的 DB_READ_YOUR_WRITES_WINDOW 秒内，
+  写入者（授权主体）的全部读取、以及所有请求对被写入表的读取都使用主库，
+  避免从尚未同步的副本读到旧数据并写入缓存。
+  写入记录保存在本进程与 Redis 中（其他 worker 也能看到），Redis 不可用时只在本进程内生效
+"""
+import asyncio
+import functools
+import itertools
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tortoise import Tortoise, connections
+from tortoise.backends.base.client import TransactionalDBClient
+from tortoise.router import router as tortoise_router
+
+from config.settings import settings
+from config.logging import get_logger
+from app.utils.local_cache import LRUTTLCache
+from app.utils.redis_client import redis_client
+from app.utils.redis_keys import hash_tag
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RoutingState:
+    """当前请求的路由状态"""
+    principal: Optional[str] = None
+    wrote: bool = False  # 本请求已写入
+    marked: Set[str] = field(default_factory=set)  # 本请求已记录写入的表
+    pinned: bool = False  # 授权主体处于读己之写窗口内
+    hot_tables: Optional[Set[str]] = None  # 窗口内被写入过的表（首次读取副本前查询）
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar("db_routing_state", default=None)
+_replica_reads: ContextVar[bool] = ContextVar("db_replica_reads", default=False)
+
+
+class RecentWrites:
+    """最近写入记录（读己之写窗口）"""
+
+    # 所有记录使用相同的哈希标签，集群模式下可以一条 MGET 读取
+    key_prefix = f"db:{hash_tag('rw')}:"
+
+    def __init__(self, window: Optional[float] = None, maxsize: int = 10000):
+        self.window = settings.DB_READ_YOUR_WRITES_WINDOW if window is None else window
+        self.local = LRUTTLCache(maxsize=maxsize, ttl=self.window)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def principal_key(principal: str) -> str:
+        return f"user:{principal}"
+
+    @staticmethod
+    def table_key(table: str) -> str:
+        return f"table:{table}"
+
+    def mark(self, *names: str):
+        """记录写入（同步调用，在路由中执行；Redis 写入在后台完成）"""
+        if self.window <= 0 or not names:
+            return
+        for name in names:
+            self.local.set(name, True)
+        if redis_client.redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._mark_redis(names))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _mark_redis(self, names: Tuple[str, ...]):
+        expire = math.ceil(self.window * 1000)
+        try:
+            async with redis_client.redis.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.set(f"{self.key_prefix}{name}", 1, px=expire)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"记录数据库写入失败: {e}")
+
+    async def recent(self, names: List[str]) -> Set[str]:
+        """返回窗口内写入过的记录名称"""
+        if self.window <= 0 or not names:
+            return set()
+        found = {name for name in names if self.local.get(name)}
+        remaining = [name for name in names if name not in found]
+        if not remaining or redis_client.redis is None:
+            return found
+        try:
+            values = await redis_client.redis.mget([f"{self.key_prefix}{name}" for name in remaining])
+        except Exception as e:
+            logger.warning(f"读取数据库写入记录失败: {e}")
+            return found
+        return found | {name for name, value in zip(remaining, values) if value is not None}
+
+
+# 全局最近写入记录
+recent_writes = RecentWrites()
+
+
+def bind_principal(principal: str) -> RoutingState:
+    """在认证依赖中绑定当前授权主体（用户名或 API 密钥名称），每个请求开始新的路由状态"""
+    state = RoutingState(principal=principal)
+    _state.set(state)
+    return state
+
+
+def _in_transaction() -> bool:
+    try:
+        return isinstance(connections.get("default"), TransactionalDBClient)
+    except Exception:
+        return False
+
+
+class ReplicaRouter:
+    """Tortoise 数据库路由"""
+
+    def __init__(self):
+        self.replicas = replica_connection_names()
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._tables: Optional[List[str]] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.writes = 0
+
+    @property
+    def tables(self) -> List[str]:
+        """已注册模型的表名"""
+        if self._tables is None:
+            self._tables = sorted({
+                model._meta.db_table
+                for models in Tortoise.apps.values()
+                for model in models.values()
+            })
+        return self._tables
+
+    def db_for_read(self, model) -> Optional[str]:
+        if self._cycle is None or not _replica_reads.get():
+            return None
+        state = _state.get()
+        if (
+            (state is not None and (state.wrote or state.pinned or model._meta.db_table in (state.hot_tables or ())))
+            or _in_transaction()
+        ):
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        return next(self._cycle)
+
+    def db_for_write(self, model) -> Optional[str]:
+        self.writes += 1
+        state = _state.get()
+        if state is None:
+            # 未经认证的代码（如后台任务）没有授权主体，只记录被写入的表
+            state = RoutingState()
+            _state.set(state)
+        state.wrote = True
+        table = model._meta.db_table
+        if table not in state.marked:
+            names = [recent_writes.table_key(table)]
+            if not state.marked and state.principal is not None:
+                names.append(recent_writes.principal_key(state.principal))
+            state.marked.add(table)
+            recent_writes.mark(*names)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": list(self.replicas),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "writes": self.writes,
+        }
+
+
+def replica_connection_names() -> List[str]:
+    """只读副本连接名称：replica、replica_1、replica_2…"""
+    urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    return ["replica" if i == 0 else f"replica_{i}" for i in range(len(urls))]
+
+
+def active_router() -> Optional[ReplicaRouter]:
+    """Tortoise 当前启用的读写分离路由"""
+    for router in tortoise_router._routers or []:
+        if isinstance(router, ReplicaRouter):
+            return router
+    return None
+
+
+def use_replica(func):
+    """
+    标记只读的异步函数：其中的读取使用只读副本
+    （未配置副本、处于事务中、本请求已写入、授权主体或被读取的表处于读己之写窗口内时仍读取主库）
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        router = active_router()
+        if _replica_reads.get() or router is None:
+            return await func(*args, **kwargs)
+
+        state = _state.get()
+        state_token = None
+        if state is None:
+            state = RoutingState()
+            state_token = _state.set(state)
+        if state.hot_tables is None:
+            names = [recent_writes.table_key(table) for table in router.tables]
+            if state.principal is not None:
+                names.append(recent_writes.principal_key(state.principal))
+            recent = await recent_writes.recent(names)
+            state.pinned = state.principal is not None and recent_writes.principal_key(state.principal) in recent
+            state.hot_tables = {table for table in router.tables if recent_writes.table_key(table) in recent}
+
+        token = _replica_reads.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+            if state_token is not None:
+                _state.reset(state_token)
+
+    return wrapper
+
+
+def get_routing_stats() -> Dict[str, Any]:
+    """获取读写分离统计信息"""
+    router = active_router()
+    if router is None:
+        return {"enabled": False}
+    return {"enabled": True, **router.get_stats()}
@@ -1,32 +1,135 @@
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.security import verify_token
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
+from app.core.security import decode_access_token
+from app.core.api_keys import api_key_resolver, scopes_to_flags
+from app.core.db_router import bind_principal, use_replica
+from app.core.principal_cache import principal_cache
+from app.core.token_versions import token_versions
 from app.models.models import User
 
 
 security = HTTPBearer()
+optional_bearer = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """获取当前用户"""
-    credentials_exception = HTTPException(
+@dataclass
+class TokenPrincipal:
+    """令牌中携带的授权主体（无需查询数据库）"""
+    id: int
+    username: str
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+    scopes: FrozenSet[str] = field(default_factory=frozenset)
+    api_key_id: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "TokenPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=user.is_active,
+            is_staff=user.is_staff,
+            is_superuser=user.is_superuser,
+        )
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+@use_replica
+async def _load_user(username: str) -> Optional[User]:
+    """加载认证用户（只读查询，配置了只读副本时读取副本）"""
+    return await principal_cache.get_user(username)
+
+
+async def _token_version_valid(payload: dict, user: User) -> bool:
+    """
+    令牌版本是否与用户当前版本一致（不携带版本号的旧格式令牌不校验）
+    优先读取 Redis 中缓存的版本，未缓存时查询数据库（不使用认证用户缓存中可能过期的版本）并写回缓存
+    """
+    if "ver" not in payload:
+        return True
+    return payload["ver"] == await token_versions.current(user.id)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """获取当前用户（已吊销版本的令牌无效）"""
+    credentials_exception = _credentials_exception()
     
-    username = verify_token(credentials.credentials)
-    if username is None:
+    payload = decode_access_token(credentials.credentials)
+    if payload is None:
         raise credentials_exception
     
-    user = await User.get_or_none(username=username)
-    if user is None:
+    bind_principal(payload["sub"])
+    user = await _load_user(payload["sub"])
+    if user is None or not await _token_version_valid(payload, user):
         raise credentials_exception
     
     return user
 
 
+async def get_current_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+    api_key: Optional[str] = Depends(api_key_header),
+) -> TokenPrincipal:
+    """
+    获取当前授权主体
+    - 携带 X-API-Key 时按 API 密钥授权（服务间调用）
+    - 令牌携带授权声明且版本号与 Redis 中缓存的版本一致时直接使用令牌中的声明；
+      旧格式令牌、版本未缓存或 Redis 不可用时回退到加载用户，按数据库中的版本校验
+    """
+    credentials_exception = _credentials_exception()
+
+    if api_key:
+        record = await api_key_resolver.resolve(api_key)
+        if record is None:
+            raise credentials_exception
+        bind_principal(f"api-key:{record['name']}")
+        return TokenPrincipal(
+            id=0,
+            username=f"api-key:{record['name']}",
+            is_active=True,
+            scopes=record["scopes"],
+            api_key_id=record["id"],
+            **scopes_to_flags(record["scopes"]),
+        )
+
+    if credentials is None:
+        raise credentials_exception
+
+    payload = decode_access_token(credentials.credentials)
+    if payload is None:
+        raise credentials_exception
+    bind_principal(payload["sub"])
+
+    if "uid" in payload and "ver" in payload:
+        current_version = await token_versions.get(payload["uid"])
+        if current_version is not None:
+            if payload["ver"] != current_version:
+                raise credentials_exception
+            return TokenPrincipal(
+                id=payload["uid"],
+                username=payload["sub"],
+                is_active=bool(payload.get("is_active")),
+                is_staff=bool(payload.get("is_staff")),
+                is_superuser=bool(payload.get("is_superuser")),
+            )
+
+    user = await _load_user(payload["sub"])
+    if user is None or not await _token_version_valid(payload, user):
+        raise credentials_exception
+    return TokenPrincipal.from_user(user)
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """获取当前活跃用户"""
     if not current_user.is_active:
@@ -34,11 +137,41 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
-async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_principal(
+    principal: TokenPrincipal = Depends(get_current_principal)
+) -> TokenPrincipal:
+    """获取当前活跃的授权主体"""
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+async def get_current_superuser(
+    principal: TokenPrincipal = Depends(get_current_principal)
+) -> TokenPrincipal:
     """获取当前超级用户"""
-    if not current_user.is_superuser:
+    if not principal.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return principal
+
+
+def require_scopes(*scopes: str):
+    """
+    要求 API 密钥具备指定权限范围的依赖
+    使用用户令牌访问时，超级管理员视为拥有全部权限范围
+    """
+    async def dependency(principal: TokenPrincipal = Depends(get_current_active_principal)) -> TokenPrincipal:
+        if principal.api_key_id is None:
+            allowed = principal.is_superuser
+        else:
+            allowed = set(scopes) <= principal.scopes
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return principal
+    return dependency
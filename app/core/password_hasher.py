@@ -0,0 +1,121 @@
+"""
+密码哈希工作池
+将 bcrypt 的哈希/校验从事件循环转移到独立的线程池或进程池中执行
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希队列已满，拒绝新的计算请求"""
+
+
+def _timed_call(func: Callable, *args) -> Tuple[float, float, Any]:
+    """在工作线程/进程中执行函数，并返回开始、结束时间（用于统计排队和执行耗时）"""
+    started_at = time.time()
+    result = func(*args)
+    return started_at, time.time(), result
+
+
+class PasswordHasherPool:
+    """
+    密码哈希工作池
+
+    - executor_type: thread 使用线程池（bcrypt 计算时会释放 GIL），process 使用进程池
+    - max_workers: 工作线程/进程数，0 表示使用 CPU 核数
+    - max_pending: 除正在执行的任务外允许排队的任务数，超出后抛出 PasswordHasherBusy
+    """
+
+    def __init__(
+        self,
+        executor_type: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.executor_type = (executor_type or settings.PASSWORD_HASH_EXECUTOR).lower()
+        if self.executor_type not in ("thread", "process"):
+            raise ValueError(f"不支持的密码哈希执行器类型: {self.executor_type}")
+
+        workers = settings.PASSWORD_HASH_WORKERS if max_workers is None else max_workers
+        self.max_workers = workers or os.cpu_count() or 1
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "peak_in_flight": 0,
+            "total_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        """延迟创建执行器（测试环境不经过 lifespan 也可直接使用）"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        """在工作池中执行函数"""
+        if self._in_flight >= self.max_workers + self.max_pending:
+            self._stats["rejected"] += 1
+            raise PasswordHasherBusy("密码哈希队列已满，请稍后重试")
+
+        self._in_flight += 1
+        self._stats["submitted"] += 1
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+        submitted_at = time.time()
+
+        try:
+            loop = asyncio.get_running_loop()
+            started_at, finished_at, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._stats["completed"] += 1
+        self._stats["total_wait_ms"] += max(started_at - submitted_at, 0) * 1000
+        self._stats["total_run_ms"] += (finished_at - started_at) * 1000
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取工作池统计信息"""
+        completed = self._stats["completed"]
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self.max_workers, 0),
+            **self._stats,
+            "avg_wait_ms": round(self._stats["total_wait_ms"] / completed, 3) if completed else 0.0,
+            "avg_run_ms": round(self._stats["total_run_ms"] / completed, 3) if completed else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭工作池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# 全局密码哈希工作池实例
+password_hasher = PasswordHasherPool()
@@ -0,0 +1,83 @@
+"""
+认证用户缓存
+两级缓存：进程内 LRU（短 TTL）+ Redis（较长 TTL），命中时无需查询数据库；
+用户变更时通过失效消息清除所有 worker 的本地缓存。
+缓存中不保存密码哈希（登录时从数据库读取并校验），还原的用户对象是部分字段的对象，不能直接保存
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+from app.models.models import User
+from app.utils.tiered_cache import TwoTierCache
+
+
+class PrincipalCache:
+    """认证用户缓存"""
+
+    namespace = "auth:principal"
+
+    def __init__(self):
+        self.cache = TwoTierCache(
+            self.namespace,
+            maxsize=settings.PRINCIPAL_CACHE_SIZE,
+            local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+            redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL
+        )
+        self.local = self.cache.local
+        self.db_loads = 0
+
+    # 不写入缓存的字段
+    excluded_fields = frozenset({"hashed_password"})
+
+    @classmethod
+    def _dump(cls, user: User) -> Dict[str, Any]:
+        """将用户对象转换为可 JSON 序列化的数据库行（不包含密码哈希）"""
+        row = {}
+        for field_name, column in User._meta.fields_db_projection.items():
+            if field_name in cls.excluded_fields:
+                continue
+            value = getattr(user, field_name)
+            row[column] = value.isoformat() if isinstance(value, datetime) else value
+        return row
+
+    @staticmethod
+    def _load(row: Dict[str, Any]) -> User:
+        """从缓存行还原用户对象（与用 .only() 加载的对象等价，保存时会抛出 IncompleteInstanceError）"""
+        user = User._init_from_db(**row)
+        user._partial = True
+        return user
+
+    async def get_user(self, username: str) -> Optional[User]:
+        """按用户名获取用户，依次查询本地缓存、Redis、数据库"""
+        if not settings.PRINCIPAL_CACHE_ENABLED:
+            return await User.get_or_none(username=username)
+
+        row = await self.cache.get(username)
+        if isinstance(row, dict):
+            return self._load(row)
+
+        user = await User.get_or_none(username=username)
+        self.db_loads += 1
+        if user is not None:
+            await self.set_user(user, broadcast=False)
+        return user
+
+    async def set_user(self, user: User, broadcast: bool = True):
+        """写入缓存"""
+        await self.cache.set(user.username, self._dump(user), broadcast=broadcast)
+
+    async def invalidate(self, username: str):
+        """使指定用户的缓存失效（包括其他 worker 进程的本地缓存）"""
+        await self.cache.delete(username)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        return {
+            **self.cache.get_stats(),
+            "db_loads": self.db_loads,
+        }
+
+
+# 全局认证用户缓存实例
+principal_cache = PrincipalCache()
@@ -0,0 +1,263 @@
+"""
+限流与准入控制
+基于令牌桶算法的 ASGI 中间件：
+- 令牌桶状态保存在 Redis 中，通过 Lua 脚本原子地完成"补充 + 扣减"
+- Redis 不可用时回退到进程内令牌桶
+- 按路由配置策略，按用户（令牌）或客户端 IP 计数
+- bcrypt 相关接口（登录、注册）使用更严格的默认预算
+"""
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from config.settings import settings
+from app.core.security import decode_access_token
+from app.utils.local_cache import LRUTTLCache
+from app.utils.redis_client import redis_client
+from app.utils.redis_keys import hash_tag
+
+
+# 令牌桶 Lua 脚本
+# KEYS[1]: 桶键  ARGV[1]: 容量  ARGV[2]: 每毫秒补充的令牌数  ARGV[3]: 本次消耗的令牌数
+# 返回 {是否允许, 剩余令牌数, 需要等待的毫秒数}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait_ms = math.ceil((requested - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {allowed, math.floor(tokens), wait_ms}
+"""
+
+
+@dataclass
+class RateLimitPolicy:
+    """
+    限流策略
+
+    - limit/window: 每 window 秒最多 limit 个请求（即令牌桶容量与补充速率）
+    - path: 路由路径前缀，None 表示默认策略
+    - methods: 生效的 HTTP 方法，空表示全部
+    - per: principal 按用户（无令牌时按 IP），ip 按客户端 IP，global 全局共享
+    """
+    name: str
+    limit: int
+    window: int
+    path: Optional[str] = None
+    methods: FrozenSet[str] = field(default_factory=frozenset)
+    per: str = "principal"
+
+    @property
+    def rate_per_ms(self) -> float:
+        return self.limit / (self.window * 1000)
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        return self.path is None or path == self.path or path.startswith(self.path.rstrip("/") + "/")
+
+
+def parse_rate(value: str) -> Tuple[int, int]:
+    """解析 "次数/秒数" 格式的限流配置，如 "10/60" """
+    limit, _, window = value.partition("/")
+    return int(limit), int(window or 1)
+
+
+def default_policies() -> List[RateLimitPolicy]:
+    """根据配置生成默认限流策略（越具体的策略越靠前）"""
+    policies = []
+    bcrypt_limit, bcrypt_window = parse_rate(settings.RATE_LIMIT_BCRYPT)
+    for name, path in (("auth_login", "/auth/login"), ("auth_register", "/auth/register")):
+        policies.append(RateLimitPolicy(
+            name=name,
+            limit=bcrypt_limit,
+            window=bcrypt_window,
+            path=path,
+            methods=frozenset({"POST"}),
+            per="ip"
+        ))
+
+    for name, rule in json.loads(settings.RATE_LIMIT_ROUTES or "{}").items():
+        limit, window = parse_rate(rule["rate"])
+        policies.append(RateLimitPolicy(
+            name=name,
+            limit=limit,
+            window=window,
+            path=rule["path"],
+            methods=frozenset(m.upper() for m in rule.get("methods", [])),
+            per=rule.get("per", "principal")
+        ))
+
+    default_limit, default_window = parse_rate(settings.RATE_LIMIT_DEFAULT)
+    policies.append(RateLimitPolicy(name="default", limit=default_limit, window=default_window))
+    return policies
+
+
+class RateLimiter:
+    """令牌桶限流器（Redis 优先，失败时回退到进程内）"""
+
+    key_prefix = "ratelimit:"
+
+    def __init__(self, local_maxsize: int = 100000):
+        self._local_buckets = LRUTTLCache(maxsize=local_maxsize, ttl=0)
+        self.redis_checks = 0
+        self.local_checks = 0
+        self.rejected = 0
+
+    async def hit(self, policy: RateLimitPolicy, identity: str, cost: int = 1) -> Tuple[bool, int, float]:
+        """消耗令牌，返回 (是否允许, 剩余令牌数, 需等待秒数)"""
+        # 策略与身份作为哈希标签：同一个桶的相关键在集群中落在同一槽位，脚本可以安全地访问多个键
+        key = f"{self.key_prefix}{hash_tag(f'{policy.name}:{identity}')}"
+
+        result = None
+        if redis_client.redis is not None:
+            result = await redis_client.run_script(
+                TOKEN_BUCKET_SCRIPT,
+                keys=[key],
+                args=[policy.limit, policy.rate_per_ms, cost]
+            )
+
+        if result is not None:
+            self.redis_checks += 1
+            allowed, remaining, wait_ms = bool(int(result[0])), int(result[1]), int(result[2])
+        else:
+            self.local_checks += 1
+            allowed, remaining, wait_ms = self._local_hit(key, policy, cost)
+
+        if not allowed:
+            self.rejected += 1
+        return allowed, remaining, wait_ms / 1000
+
+    def _local_hit(self, key: str, policy: RateLimitPolicy, cost: int) -> Tuple[bool, int, int]:
+        """进程内令牌桶"""
+        now = time.monotonic() * 1000
+        tokens, ts = self._local_buckets.get(key) or (policy.limit, now)
+        tokens = min(policy.limit, tokens + (now - ts) * policy.rate_per_ms)
+
+        if tokens >= cost:
+            tokens -= cost
+            allowed, wait_ms = True, 0
+        else:
+            allowed, wait_ms = False, math.ceil((cost - tokens) / policy.rate_per_ms)
+
+        self._local_buckets.set(key, (tokens, now), ttl=policy.window + 1)
+        return allowed, int(tokens), wait_ms
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取限流统计信息"""
+        return {
+            "redis_checks": self.redis_checks,
+            "local_checks": self.local_checks,
+            "rejected": self.rejected,
+            "local_buckets": len(self._local_buckets),
+        }
+
+
+# 全局限流器实例
+rate_limiter = RateLimiter()
+
+
+class RateLimitMiddleware:
+    """限流中间件"""
+
+    exempt_paths = ("/health", "/docs", "/redoc", "/openapi.json")
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None, policies: Optional[List[RateLimitPolicy]] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.policies = policies if policies is not None else default_policies()
+
+    def _match_policy(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return None
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        if settings.RATE_LIMIT_TRUST_FORWARDED:
+            forwarded = headers.get(b"x-forwarded-for")
+            if forwarded:
+                return forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _identity(self, scope, policy: RateLimitPolicy) -> str:
+        if policy.per == "global":
+            return "global"
+        if policy.per == "principal":
+            headers = dict(scope.get("headers") or [])
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = decode_access_token(token)
+                if payload is not None:
+                    return f"user:{payload.get('uid', payload['sub'])}"
+        return f"ip:{self._client_ip(scope)}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        policy = self._match_policy(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, remaining, retry_after = await self.limiter.hit(policy, self._identity(scope, policy))
+        rate_headers = [
+            (b"x-ratelimit-limit", str(policy.limit).encode()),
+            (b"x-ratelimit-remaining", str(max(remaining, 0)).encode()),
+        ]
+
+        if not allowed:
+            body = json.dumps({
+                "error": True,
+                "message": "请求过于频繁，请稍后重试",
+                "status_code": 429
+            }, ensure_ascii=False).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+                    *rate_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + rate_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
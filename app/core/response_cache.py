@@ -0,0 +1,308 @@
+"""
+HTTP 响应缓存
+按路由配置的 ASGI 中间件，缓存 GET 接口的 JSON 响应：
+- 缓存键由路由、路径、排序后的查询参数与授权作用域组成
+- 响应保存在 Redis 中，使用带版本号的标签失效（与 cache_tags 中的失效函数共用标签）
+- 响应携带强 ETag，If-None-Match 匹配时直接返回 304，不执行接口处理函数
+- 命中缓存前校验令牌签名与令牌版本，已吊销的令牌不会读到缓存
+"""
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from config.settings import settings
+from app.core.cache_tags import (
+    PROFILES_NAMESPACE,
+    TASK_RESULTS_NAMESPACE,
+    TASKS_NAMESPACE,
+    USERS_NAMESPACE,
+    namespace_tag,
+)
+from app.core.security import decode_access_token
+from app.core.token_versions import token_versions
+from app.utils.redis_client import redis_client
+
+
+# 不随缓存保存的响应头（发送时重新生成）
+SKIPPED_HEADERS = {b"content-length", b"etag", b"date", b"cache-control"}
+
+
+@dataclass
+class ResponseCachePolicy:
+    """
+    响应缓存策略
+
+    - path: 路由路径（精确匹配，忽略末尾的斜杠）
+    - ttl: 过期时间（秒）
+    - tags: 失效标签，写操作后通过 cache_tags 中的函数使其失效
+    - scope: role 同一角色的用户共享缓存，principal 按用户缓存，public 不区分用户（不校验令牌）
+    """
+    name: str
+    path: str
+    ttl: int
+    tags: Tuple[str, ...] = ()
+    scope: str = "role"
+
+    def matches(self, path: str) -> bool:
+        return path.rstrip("/") == self.path.rstrip("/")
+
+
+def default_policies() -> List[ResponseCachePolicy]:
+    """
+    根据配置生成缓存策略（自定义策略优先）
+    不经过标签失效的写入在 TTL 内不可见：Celery Beat 更新的 last_run_at/total_run_count、
+    批量写入的最后登录时间
+    """
+    ttl = settings.RESPONSE_CACHE_TTL
+    users = namespace_tag(USERS_NAMESPACE)
+    tasks = namespace_tag(TASKS_NAMESPACE)
+    results = namespace_tag(TASK_RESULTS_NAMESPACE)
+
+    policies = []
+    for name, rule in json.loads(settings.RESPONSE_CACHE_ROUTES or "{}").items():
+        policies.append(ResponseCachePolicy(
+            name=name,
+            path=rule["path"],
+            ttl=rule.get("ttl", ttl),
+            tags=tuple(rule.get("tags", [])),
+            scope=rule.get("scope", "role")
+        ))
+
+    policies.extend([
+        ResponseCachePolicy(name="admin_users", path="/api/v1/admin/users", ttl=ttl, tags=(users,)),
+        ResponseCachePolicy(name="admin_tasks", path="/api/v1/admin/tasks", ttl=ttl, tags=(tasks,)),
+        ResponseCachePolicy(name="admin_statistics", path="/api/v1/admin/statistics", ttl=ttl, tags=(tasks, results)),
+        ResponseCachePolicy(name="users", path="/api/v1/users", ttl=ttl, tags=(users,)),
+        # 删除用户会级联删除资料
+        ResponseCachePolicy(
+            name="profiles",
+            path="/api/v1/profiles",
+            ttl=ttl,
+            tags=(namespace_tag(PROFILES_NAMESPACE), users)
+        ),
+    ])
+    return policies
+
+
+def compute_etag(body: bytes) -> str:
+    """根据响应内容生成强 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否匹配（按 RFC 7232 使用弱比较）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (item.strip() for item in if_none_match.split(","))
+    return etag in (item[2:] if item.startswith("W/") else item for item in candidates)
+
+
+class ResponseCache:
+    """响应缓存存储与统计"""
+
+    key_prefix = "respcache:"
+
+    def __init__(self, policies: Optional[List[ResponseCachePolicy]] = None):
+        self.policies = policies if policies is not None else default_policies()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bypassed = 0
+        self.stored = 0
+
+    def match(self, path: str) -> Optional[ResponseCachePolicy]:
+        for policy in self.policies:
+            if policy.matches(path):
+                return policy
+        return None
+
+    @staticmethod
+    def principal_scope(policy: ResponseCachePolicy, headers: Dict[bytes, bytes]) -> Optional[Tuple[str, Optional[Dict]]]:
+        """
+        解析授权作用域，返回 (作用域标识, 令牌载荷)
+        未携带有效令牌、使用旧格式令牌或 API 密钥时返回 None（不使用缓存，由接口自行鉴权）
+        """
+        if policy.scope == "public":
+            return "public", None
+        if b"x-api-key" in headers:
+            return None
+
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        payload = decode_access_token(token)
+        if payload is None or "uid" not in payload or "ver" not in payload or not payload.get("is_active"):
+            return None
+
+        if policy.scope == "principal":
+            return f"user:{payload['uid']}", payload
+        if payload.get("is_superuser"):
+            role = "superuser"
+        elif payload.get("is_staff"):
+            role = "staff"
+        else:
+            role = "user"
+        return f"role:{role}", payload
+
+    @staticmethod
+    async def token_valid(payload: Optional[Dict]) -> bool:
+        """令牌版本是否仍然有效"""
+        if payload is None:
+            return True
+        return await token_versions.current(payload["uid"]) == payload["ver"]
+
+    def cache_key(self, policy: ResponseCachePolicy, scope_id: str, path: str, query_string: bytes) -> str:
+        query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        digest = hashlib.blake2b(f"{path.rstrip('/')}?{query}".encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self.key_prefix}{policy.name}:{scope_id}:{digest}"
+
+    async def lookup(self, key: str, policy: ResponseCachePolicy) -> Tuple[Optional[Dict], Optional[Dict[str, int]]]:
+        """读取缓存，返回 (缓存项, 当前标签版本)"""
+        hit, entry, versions = await redis_client.lookup_tagged(key, policy.tags, None)
+        return (entry if hit else None), versions
+
+    async def store(self, key: str, policy: ResponseCachePolicy, entry: Dict, versions: Dict[str, int]):
+        """写入缓存（使用读取时的标签版本，处理期间发生的失效会使本次写入直接失效）"""
+        if await redis_client.set_tagged(key, entry, policy.tags, expire=policy.ttl, versions=versions):
+            self.stored += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取响应缓存统计信息"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "bypassed": self.bypassed,
+            "stored": self.stored,
+        }
+
+
+# 全局响应缓存实例
+response_cache = ResponseCache()
+
+
+class ResponseCacheMiddleware:
+    """响应缓存中间件"""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.cache.match(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        principal = self.cache.principal_scope(policy, headers)
+        if principal is None:
+            self.cache.bypassed += 1
+            await self.app(scope, receive, send)
+            return
+        scope_id, payload = principal
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+
+        key = None
+        versions = None
+        if redis_client.redis is not None:
+            key = self.cache.cache_key(policy, scope_id, scope["path"], scope.get("query_string", b""))
+            (entry, versions), valid = await asyncio.gather(
+                self.cache.lookup(key, policy),
+                self.cache.token_valid(payload)
+            )
+            if not valid:
+                self.cache.bypassed += 1
+                await self.app(scope, receive, send)
+                return
+            if entry is not None:
+                self.cache.hits += 1
+                await self._send_entry(send, entry, if_none_match, "HIT")
+                return
+
+        self.cache.misses += 1
+        start, body = await self._capture(scope, receive)
+        if start is None:
+            return
+
+        entry = self._build_entry(start, body)
+        if entry is None:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self._send_entry(send, entry, if_none_match, "MISS")
+        if key is not None and versions is not None and len(body) <= settings.RESPONSE_CACHE_MAX_BODY:
+            await self.cache.store(key, policy, entry, versions)
+
+    async def _capture(self, scope, receive) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """执行接口并收集完整响应"""
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        return start, b"".join(chunks)
+
+    @staticmethod
+    def _build_entry(start: Dict[str, Any], body: bytes) -> Optional[Dict[str, Any]]:
+        """生成缓存项，不可缓存（非 200、设置 Cookie、禁止缓存或非文本内容）时返回 None"""
+        if start["status"] != 200:
+            return None
+        response_headers = []
+        for name, value in start.get("headers") or []:
+            name = name.lower()
+            if name == b"set-cookie" or (name == b"cache-control" and b"no-store" in value):
+                return None
+            if name not in SKIPPED_HEADERS:
+                response_headers.append([name.decode("latin-1"), value.decode("latin-1")])
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return {
+            "status": start["status"],
+            "headers": response_headers,
+            "body": text,
+            "etag": compute_etag(body),
+        }
+
+    async def _send_entry(self, send, entry: Dict[str, Any], if_none_match: str, cache_status: str):
+        """发送缓存项，If-None-Match 匹配时返回 304"""
+        common_headers = [
+            (b"etag", entry["etag"].encode("latin-1")),
+            (b"cache-control", b"private, no-cache"),
+            (b"x-cache", cache_status.encode("latin-1")),
+        ]
+        if etag_matches(if_none_match, entry["etag"]):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": common_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        body = entry["body"].encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": entry["status"],
+            "headers": [
+                *((name.encode("latin-1"), value.encode("latin-1")) for name, value in entry["headers"]),
+                (b"content-length", str(len(body)).encode()),
+                *common_headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,8 +1,17 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from config.settings import settings
+from app.core.password_hasher import password_hasher
+from app.utils.local_cache import LRUTTLCache
+
+
+# 已验证令牌缓存：令牌摘要 -> 声明，缓存至令牌过期
+# 只缓存签名校验结果，吊销检查（令牌版本）仍在每次请求时进行
+token_cache = LRUTTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -21,6 +30,16 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在密码哈希工作池中验证密码（不阻塞事件循环）"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """在密码哈希工作池中计算密码哈希（不阻塞事件循环）"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
     to_encode = data.copy()
@@ -34,13 +53,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """验证令牌并返回用户名"""
+def create_user_access_token(user, token_version: int = 0, expires_delta: Optional[timedelta] = None) -> str:
+    """为用户创建携带授权声明的访问令牌"""
+    return create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "is_active": user.is_active,
+            "is_staff": user.is_staff,
+            "is_superuser": user.is_superuser,
+            "ver": token_version,
+        },
+        expires_delta=expires_delta
+    )
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """验证令牌并返回全部声明（命中已验证令牌缓存时跳过签名校验）"""
+    cache_key = None
+    if settings.TOKEN_CACHE_ENABLED:
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        payload = token_cache.get(cache_key)
+        if payload is not None:
+            # 缓存条目按 exp 过期，这里再检查一次以防时钟边界
+            if payload.get("exp") is None or payload["exp"] > time.time():
+                return dict(payload)
+            token_cache.delete(cache_key)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    if payload.get("sub") is None:
+        return None
+    
+    if cache_key is not None:
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        if ttl is None or ttl > 0:
+            token_cache.set(cache_key, payload, ttl=ttl)
+    return dict(payload)
+
+
+def verify_token(token: str) -> Optional[str]:
+    """验证令牌并返回用户名"""
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+任务统计计数器
+定时任务总数/启用数与各状态的任务结果数保存在 Redis 哈希中，统计接口只读取一次哈希；
+写操作（创建、删除、启用/禁用、状态变化、清理）通过 HINCRBY 增量维护。
+哈希不存在时不增量更新（避免只有部分字段），由下一次读取用 GROUP BY 聚合重建；
+哈希设置过期时间（TASK_STATS_COUNTER_TTL），重建与写入并发时产生的少量偏差会在过期后修正
+"""
+from typing import Dict, Optional
+
+from config.settings import settings
+from config.logging import get_logger
+from app.utils.redis_client import redis_client
+
+
+logger = get_logger(__name__)
+
+
+TASKS_TOTAL = "tasks:total"
+TASKS_ENABLED = "tasks:enabled"
+RESULTS_TOTAL = "results:total"
+
+
+def result_field(status: str) -> str:
+    return f"results:{status}"
+
+
+# 哈希存在时才增量更新，ARGV 为 字段, 增量, 字段, 增量...
+INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# 哈希不存在时写入聚合结果，ARGV[1] 为过期时间，其后为 字段, 值...
+REBUILD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class TaskCounters:
+    """任务统计计数器"""
+
+    key = "stats:task_counters"
+
+    @property
+    def enabled(self) -> bool:
+        return redis_client.redis is not None and settings.TASK_STATS_COUNTER_TTL > 0
+
+    async def get(self) -> Optional[Dict[str, int]]:
+        """读取计数器，不可用或尚未重建时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            values = await redis_client.redis.hgetall(self.key)
+        except Exception as e:
+            logger.warning(f"读取任务统计计数器失败: {e}")
+            return None
+        if not values:
+            return None
+        return {field: int(value) for field, value in values.items()}
+
+    async def rebuild(self, counts: Dict[str, int]):
+        """用聚合结果重建计数器（已存在时不覆盖）"""
+        if not self.enabled:
+            return
+        args = [settings.TASK_STATS_COUNTER_TTL]
+        for field, value in counts.items():
+            args.extend([field, value])
+        await redis_client.run_script(REBUILD_SCRIPT, keys=[self.key], args=args)
+
+    async def increment(self, deltas: Dict[str, int]):
+        """增量更新计数器（忽略为 0 的增量）"""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not self.enabled or not deltas:
+            return
+        args = []
+        for field, delta in deltas.items():
+            args.extend([field, delta])
+        await redis_client.run_script(INCREMENT_SCRIPT, keys=[self.key], args=args)
+
+    async def reset(self):
+        """删除计数器，下一次读取时重新聚合"""
+        if self.enabled:
+            await redis_client.delete_key(self.key)
+
+
+# 全局任务统计计数器实例
+task_counters = TaskCounters()
@@ -0,0 +1,123 @@
+"""
+用户令牌版本
+令牌版本保存在用户表中（users.token_version），签发的令牌携带当时的版本号；
+版本号递增后，该用户之前签发的令牌全部失效。
+Redis 中缓存各用户的当前版本，键不存在（过期、被淘汰或 Redis 不可用）时返回 None，
+由调用方按数据库中的版本校验，不会把缺失的键当作版本 0
+"""
+from typing import Iterable, Optional, Set
+
+from tortoise.expressions import F
+
+from config.settings import settings
+from config.logging import get_logger
+from app.models.models import User
+from app.utils.redis_client import redis_client
+
+
+logger = get_logger(__name__)
+
+# 缓存的版本只增不减：不存在或小于 ARGV[1] 时写入，ARGV[2] 为过期时间
+STORE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+if current == nil or tonumber(ARGV[1]) > current then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+end
+return 1
+"""
+
+
+class TokenVersionStore:
+    """
+    用户令牌版本存储
+    递增版本后更新缓存失败（Redis 不可用）时记录该用户，之后每次读取前重试删除旧的缓存；
+    删除成功前本进程对该用户按数据库校验，其他进程最多在 TOKEN_VERSION_CACHE_TTL 内读到旧版本
+    """
+
+    key_prefix = "auth:token_version:"
+
+    def __init__(self):
+        # 缓存中可能仍是旧版本、等待删除的用户
+        self._stale: Set[int] = set()
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    async def _delete(self, user_ids: Iterable[int]) -> bool:
+        """删除缓存的版本，Redis 不可用时返回 False"""
+        if redis_client.redis is None:
+            return False
+        try:
+            await redis_client.redis.delete(*(self._key(user_id) for user_id in user_ids))
+        except Exception as e:
+            logger.warning(f"删除令牌版本缓存失败: {e}")
+            return False
+        return True
+
+    async def _retry_stale(self):
+        """重试删除更新失败的缓存"""
+        stale = list(self._stale)
+        if await self._delete(stale):
+            self._stale.difference_update(stale)
+
+    async def get(self, user_id: int) -> Optional[int]:
+        """获取缓存的令牌版本，Redis 不可用、未缓存或缓存可能过期时返回 None（由调用方按数据库校验）"""
+        if redis_client.redis is None:
+            return None
+        if self._stale:
+            await self._retry_stale()
+            if user_id in self._stale:
+                return None
+        try:
+            value = await redis_client.redis.get(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"获取令牌版本失败: {e}")
+            return None
+        return int(value) if value is not None else None
+
+    async def current(self, user_id: int) -> Optional[int]:
+        """获取用户当前令牌版本（未缓存时查询数据库并写回缓存），用户不存在时返回 None"""
+        version = await self.get(user_id)
+        if version is None:
+            version = await User.filter(id=user_id).first().values_list("token_version", flat=True)
+            if version is not None:
+                await self.remember(user_id, version)
+        return version
+
+    async def remember(self, user_id: int, version: int) -> bool:
+        """
+        缓存从数据库读取的令牌版本（不会覆盖更新的版本）
+        写入失败时删除缓存，两者都失败时返回 False
+        """
+        if redis_client.redis is None:
+            return False
+        key = self._key(user_id)
+        result = await redis_client.run_script(
+            STORE_SCRIPT, keys=[key], args=[version, settings.TOKEN_VERSION_CACHE_TTL]
+        )
+        if result is None:
+            return await self._delete([user_id])
+        # 写入的是数据库中的最新版本，缓存不再过期
+        self._stale.discard(user_id)
+        return True
+
+    async def bump(self, user_id: int) -> Optional[int]:
+        """
+        递增用户令牌版本并更新缓存，使旧令牌失效；用户已删除时清除缓存并返回 None
+        缓存更新失败时记录该用户，稍后重试删除
+        """
+        await User.filter(id=user_id).update(token_version=F("token_version") + 1)
+        version = await User.filter(id=user_id).first().values_list("token_version", flat=True)
+        if version is None:
+            updated = await self._delete([user_id])
+        else:
+            updated = await self.remember(user_id, version)
+        if not updated:
+            if redis_client.redis is not None:
+                logger.warning(f"更新用户 {user_id} 的令牌版本缓存失败，稍后重试删除")
+            self._stale.add(user_id)
+        return version
+
+
+# 全局令牌版本存储实例
+token_versions = TokenVersionStore()
@@ -0,0 +1,11 @@
+"""
+数据库迁移文件（由 app.utils.migrations 按版本号顺序执行，执行记录保存在 schema_version 表中）
+
+文件名格式为 v<四位版本号>_<名称>.py，模块中定义：
+- SQL: 按数据库类型（sqlite、postgres）列出要执行的语句，每条语句单独执行
+- upgrade(connection, dialect): 可选，数据迁移等无法用 SQL 表达的步骤，在 SQL 之后执行
+- check(connection, dialect): 可选，执行前检查数据库是否满足要求（如版本、扩展），不满足时抛出 MigrationError
+
+每个迁移在事务中执行，已发布的迁移不要修改，模型变更时新增迁移文件，
+并同步更新 app/models/models.py（测试会比较迁移结果与模型生成的表结构）
+"""
@@ -0,0 +1,277 @@
+"""
+初始表结构（与此前 generate_schemas 创建的表结构一致，已有数据库执行时不会改变任何表）
+"""
+
+SQLITE = [
+    """CREATE TABLE IF NOT EXISTS "api_keys" (
+    "created_at" TIMESTAMP NOT NULL /* 创建时间 */,
+    "updated_at" TIMESTAMP NOT NULL /* 更新时间 */,
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL /* 密钥ID */,
+    "name" VARCHAR(100) NOT NULL /* 密钥名称 */,
+    "prefix" VARCHAR(16) NOT NULL UNIQUE /* 密钥前缀（用于查找） */,
+    "key_hash" VARCHAR(64) NOT NULL /* 密钥哈希 (HMAC-SHA256) */,
+    "scopes" VARCHAR(255) NOT NULL /* 权限范围（逗号分隔） */,
+    "is_active" INT NOT NULL /* 是否启用 */,
+    "expires_at" TIMESTAMP /* 过期时间 */,
+    "last_used_at" TIMESTAMP /* 最后使用时间 */
+) /* API密钥表 */""",
+    """CREATE TABLE IF NOT EXISTS "celery_crontab_schedule" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "minute" VARCHAR(240) NOT NULL /* 分钟 (0-59) */,
+    "hour" VARCHAR(96) NOT NULL /* 小时 (0-23) */,
+    "day_of_week" VARCHAR(64) NOT NULL /* 星期几 (0-6, 0是周日) */,
+    "day_of_month" VARCHAR(124) NOT NULL /* 日期 (1-31) */,
+    "month_of_year" VARCHAR(64) NOT NULL /* 月份 (1-12) */,
+    "timezone" VARCHAR(64) NOT NULL /* 时区 */
+) /* Crontab调度表 */""",
+    """CREATE TABLE IF NOT EXISTS "celery_interval_schedule" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "every" INT NOT NULL /* 间隔数量 */,
+    "period" VARCHAR(24) NOT NULL /* 间隔类型(days/hours/minutes/seconds) */,
+    CONSTRAINT "uid_celery_inte_every_bbdee8" UNIQUE ("every", "period")
+) /* 间隔调度表 */""",
+    """CREATE TABLE IF NOT EXISTS "celery_periodic_task" (
+    "created_at" TIMESTAMP NOT NULL /* 创建时间 */,
+    "updated_at" TIMESTAMP NOT NULL /* 更新时间 */,
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "name" VARCHAR(200) NOT NULL UNIQUE /* 任务名称 */,
+    "task" VARCHAR(200) NOT NULL /* 任务路径 (如: celery_app.tasks.general_tasks.test_periodic_task) */,
+    "args" TEXT NOT NULL /* 位置参数 (JSON格式) */,
+    "kwargs" TEXT NOT NULL /* 关键字参数 (JSON格式) */,
+    "queue" VARCHAR(200) /* 队列名称 */,
+    "exchange" VARCHAR(200) /* 交换机 */,
+    "routing_key" VARCHAR(200) /* 路由键 */,
+    "priority" INT /* 优先级 (0-9) */,
+    "expires" TIMESTAMP /* 过期时间 */,
+    "expire_seconds" INT /* 过期秒数 */,
+    "one_off" INT NOT NULL /* 是否只执行一次 */,
+    "start_time" TIMESTAMP /* 开始时间 */,
+    "enabled" INT NOT NULL /* 是否启用 */,
+    "last_run_at" TIMESTAMP /* 上次运行时间 */,
+    "total_run_count" INT NOT NULL /* 总运行次数 */,
+    "date_changed" TIMESTAMP NOT NULL /* 修改时间 */,
+    "description" TEXT /* 任务描述 */,
+    "crontab_id" INT REFERENCES "celery_crontab_schedule" ("id") ON DELETE SET NULL /* Crontab调度 */,
+    "interval_id" INT REFERENCES "celery_interval_schedule" ("id") ON DELETE SET NULL /* 间隔调度 */
+) /* 定时任务表 */""",
+    """CREATE TABLE IF NOT EXISTS "celery_periodic_task_changed" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "last_update" TIMESTAMP NOT NULL /* 最后更新时间 */
+) /* 定时任务变更标记表 */""",
+    """CREATE TABLE IF NOT EXISTS "celery_task_result" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "task_id" VARCHAR(255) NOT NULL UNIQUE /* 任务ID */,
+    "task_name" VARCHAR(255) /* 任务名称 */,
+    "task_args" TEXT /* 任务参数 */,
+    "task_kwargs" TEXT /* 任务关键字参数 */,
+    "status" VARCHAR(50) NOT NULL /* 状态 */,
+    "result" TEXT /* 执行结果 */,
+    "traceback" TEXT /* 错误堆栈 */,
+    "date_created" TIMESTAMP NOT NULL /* 创建时间 */,
+    "date_done" TIMESTAMP /* 完成时间 */,
+    "worker" VARCHAR(100) /* 执行的Worker */
+) /* 任务执行结果表 */""",
+    """CREATE INDEX IF NOT EXISTS "idx_celery_task_task_na_b50810" ON "celery_task_result" ("task_name")""",
+    """CREATE INDEX IF NOT EXISTS "idx_celery_task_status_2bfff6" ON "celery_task_result" ("status")""",
+    """CREATE TABLE IF NOT EXISTS "users" (
+    "created_at" TIMESTAMP NOT NULL /* 创建时间 */,
+    "updated_at" TIMESTAMP NOT NULL /* 更新时间 */,
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL /* 用户ID */,
+    "username" VARCHAR(50) NOT NULL UNIQUE /* 用户名 */,
+    "email" VARCHAR(100) NOT NULL UNIQUE /* 邮箱 */,
+    "hashed_password" VARCHAR(255) NOT NULL /* 密码哈希 */,
+    "is_active" INT NOT NULL /* 是否激活 */,
+    "is_superuser" INT NOT NULL /* 是否为超级管理员 */,
+    "is_staff" INT NOT NULL /* 是否为管理员 */,
+    "last_login" TIMESTAMP /* 最后登录时间 */
+) /* 用户表 */""",
+    """CREATE TABLE IF NOT EXISTS "user_profiles" (
+    "created_at" TIMESTAMP NOT NULL /* 创建时间 */,
+    "updated_at" TIMESTAMP NOT NULL /* 更新时间 */,
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL /* 资料ID */,
+    "first_name" VARCHAR(50) /* 名 */,
+    "last_name" VARCHAR(50) /* 姓 */,
+    "phone" VARCHAR(20) /* 电话 */,
+    "avatar" VARCHAR(255) /* 头像URL */,
+    "bio" TEXT /* 个人简介 */,
+    "user_id" INT NOT NULL UNIQUE REFERENCES "users" ("id") ON DELETE CASCADE /* 用户 */
+) /* 用户资料表 */""",
+]
+
+POSTGRES = [
+    """CREATE TABLE IF NOT EXISTS "api_keys" (
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "prefix" VARCHAR(16) NOT NULL UNIQUE,
+    "key_hash" VARCHAR(64) NOT NULL,
+    "scopes" VARCHAR(255) NOT NULL,
+    "is_active" BOOL NOT NULL,
+    "expires_at" TIMESTAMPTZ,
+    "last_used_at" TIMESTAMPTZ
+)""",
+    """COMMENT ON COLUMN "api_keys"."created_at" IS '创建时间'""",
+    """COMMENT ON COLUMN "api_keys"."updated_at" IS '更新时间'""",
+    """COMMENT ON COLUMN "api_keys"."id" IS '密钥ID'""",
+    """COMMENT ON COLUMN "api_keys"."name" IS '密钥名称'""",
+    """COMMENT ON COLUMN "api_keys"."prefix" IS '密钥前缀（用于查找）'""",
+    """COMMENT ON COLUMN "api_keys"."key_hash" IS '密钥哈希 (HMAC-SHA256)'""",
+    """COMMENT ON COLUMN "api_keys"."scopes" IS '权限范围（逗号分隔）'""",
+    """COMMENT ON COLUMN "api_keys"."is_active" IS '是否启用'""",
+    """COMMENT ON COLUMN "api_keys"."expires_at" IS '过期时间'""",
+    """COMMENT ON COLUMN "api_keys"."last_used_at" IS '最后使用时间'""",
+    """COMMENT ON TABLE "api_keys" IS 'API密钥表'""",
+    """CREATE TABLE IF NOT EXISTS "celery_crontab_schedule" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "minute" VARCHAR(240) NOT NULL,
+    "hour" VARCHAR(96) NOT NULL,
+    "day_of_week" VARCHAR(64) NOT NULL,
+    "day_of_month" VARCHAR(124) NOT NULL,
+    "month_of_year" VARCHAR(64) NOT NULL,
+    "timezone" VARCHAR(64) NOT NULL
+)""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."minute" IS '分钟 (0-59)'""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."hour" IS '小时 (0-23)'""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."day_of_week" IS '星期几 (0-6, 0是周日)'""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."day_of_month" IS '日期 (1-31)'""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."month_of_year" IS '月份 (1-12)'""",
+    """COMMENT ON COLUMN "celery_crontab_schedule"."timezone" IS '时区'""",
+    """COMMENT ON TABLE "celery_crontab_schedule" IS 'Crontab调度表'""",
+    """CREATE TABLE IF NOT EXISTS "celery_interval_schedule" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "every" INT NOT NULL,
+    "period" VARCHAR(24) NOT NULL,
+    CONSTRAINT "uid_celery_inte_every_bbdee8" UNIQUE ("every", "period")
+)""",
+    """COMMENT ON COLUMN "celery_interval_schedule"."every" IS '间隔数量'""",
+    """COMMENT ON COLUMN "celery_interval_schedule"."period" IS '间隔类型(days/hours/minutes/seconds)'""",
+    """COMMENT ON TABLE "celery_interval_schedule" IS '间隔调度表'""",
+    """CREATE TABLE IF NOT EXISTS "celery_periodic_task" (
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(200) NOT NULL UNIQUE,
+    "task" VARCHAR(200) NOT NULL,
+    "args" TEXT NOT NULL,
+    "kwargs" TEXT NOT NULL,
+    "queue" VARCHAR(200),
+    "exchange" VARCHAR(200),
+    "routing_key" VARCHAR(200),
+    "priority" INT,
+    "expires" TIMESTAMPTZ,
+    "expire_seconds" INT,
+    "one_off" BOOL NOT NULL,
+    "start_time" TIMESTAMPTZ,
+    "enabled" BOOL NOT NULL,
+    "last_run_at" TIMESTAMPTZ,
+    "total_run_count" INT NOT NULL,
+    "date_changed" TIMESTAMPTZ NOT NULL,
+    "description" TEXT,
+    "crontab_id" INT REFERENCES "celery_crontab_schedule" ("id") ON DELETE SET NULL,
+    "interval_id" INT REFERENCES "celery_interval_schedule" ("id") ON DELETE SET NULL
+)""",
+    """COMMENT ON COLUMN "celery_periodic_task"."created_at" IS '创建时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."updated_at" IS '更新时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."name" IS '任务名称'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."task" IS '任务路径 (如: celery_app.tasks.general_tasks.test_periodic_task)'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."args" IS '位置参数 (JSON格式)'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."kwargs" IS '关键字参数 (JSON格式)'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."queue" IS '队列名称'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."exchange" IS '交换机'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."routing_key" IS '路由键'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."priority" IS '优先级 (0-9)'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."expires" IS '过期时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."expire_seconds" IS '过期秒数'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."one_off" IS '是否只执行一次'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."start_time" IS '开始时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."enabled" IS '是否启用'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."last_run_at" IS '上次运行时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."total_run_count" IS '总运行次数'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."date_changed" IS '修改时间'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."description" IS '任务描述'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."crontab_id" IS 'Crontab调度'""",
+    """COMMENT ON COLUMN "celery_periodic_task"."interval_id" IS '间隔调度'""",
+    """COMMENT ON TABLE "celery_periodic_task" IS '定时任务表'""",
+    """CREATE TABLE IF NOT EXISTS "celery_periodic_task_changed" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "last_update" TIMESTAMPTZ NOT NULL
+)""",
+    """COMMENT ON COLUMN "celery_periodic_task_changed"."last_update" IS '最后更新时间'""",
+    """COMMENT ON TABLE "celery_periodic_task_changed" IS '定时任务变更标记表'""",
+    """CREATE TABLE IF NOT EXISTS "celery_task_result" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "task_id" VARCHAR(255) NOT NULL UNIQUE,
+    "task_name" VARCHAR(255),
+    "task_args" TEXT,
+    "task_kwargs" TEXT,
+    "status" VARCHAR(50) NOT NULL,
+    "result" TEXT,
+    "traceback" TEXT,
+    "date_created" TIMESTAMPTZ NOT NULL,
+    "date_done" TIMESTAMPTZ,
+    "worker" VARCHAR(100)
+)""",
+    """CREATE INDEX IF NOT EXISTS "idx_celery_task_task_na_b50810" ON "celery_task_result" ("task_name")""",
+    """CREATE INDEX IF NOT EXISTS "idx_celery_task_status_2bfff6" ON "celery_task_result" ("status")""",
+    """COMMENT ON COLUMN "celery_task_result"."task_id" IS '任务ID'""",
+    """COMMENT ON COLUMN "celery_task_result"."task_name" IS '任务名称'""",
+    """COMMENT ON COLUMN "celery_task_result"."task_args" IS '任务参数'""",
+    """COMMENT ON COLUMN "celery_task_result"."task_kwargs" IS '任务关键字参数'""",
+    """COMMENT ON COLUMN "celery_task_result"."status" IS '状态'""",
+    """COMMENT ON COLUMN "celery_task_result"."result" IS '执行结果'""",
+    """COMMENT ON COLUMN "celery_task_result"."traceback" IS '错误堆栈'""",
+    """COMMENT ON COLUMN "celery_task_result"."date_created" IS '创建时间'""",
+    """COMMENT ON COLUMN "celery_task_result"."date_done" IS '完成时间'""",
+    """COMMENT ON COLUMN "celery_task_result"."worker" IS '执行的Worker'""",
+    """COMMENT ON TABLE "celery_task_result" IS '任务执行结果表'""",
+    """CREATE TABLE IF NOT EXISTS "users" (
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "username" VARCHAR(50) NOT NULL UNIQUE,
+    "email" VARCHAR(100) NOT NULL UNIQUE,
+    "hashed_password" VARCHAR(255) NOT NULL,
+    "is_active" BOOL NOT NULL,
+    "is_superuser" BOOL NOT NULL,
+    "is_staff" BOOL NOT NULL,
+    "last_login" TIMESTAMPTZ
+)""",
+    """COMMENT ON COLUMN "users"."created_at" IS '创建时间'""",
+    """COMMENT ON COLUMN "users"."updated_at" IS '更新时间'""",
+    """COMMENT ON COLUMN "users"."id" IS '用户ID'""",
+    """COMMENT ON COLUMN "users"."username" IS '用户名'""",
+    """COMMENT ON COLUMN "users"."email" IS '邮箱'""",
+    """COMMENT ON COLUMN "users"."hashed_password" IS '密码哈希'""",
+    """COMMENT ON COLUMN "users"."is_active" IS '是否激活'""",
+    """COMMENT ON COLUMN "users"."is_superuser" IS '是否为超级管理员'""",
+    """COMMENT ON COLUMN "users"."is_staff" IS '是否为管理员'""",
+    """COMMENT ON COLUMN "users"."last_login" IS '最后登录时间'""",
+    """COMMENT ON TABLE "users" IS '用户表'""",
+    """CREATE TABLE IF NOT EXISTS "user_profiles" (
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "first_name" VARCHAR(50),
+    "last_name" VARCHAR(50),
+    "phone" VARCHAR(20),
+    "avatar" VARCHAR(255),
+    "bio" TEXT,
+    "user_id" INT NOT NULL UNIQUE REFERENCES "users" ("id") ON DELETE CASCADE
+)""",
+    """COMMENT ON COLUMN "user_profiles"."created_at" IS '创建时间'""",
+    """COMMENT ON COLUMN "user_profiles"."updated_at" IS '更新时间'""",
+    """COMMENT ON COLUMN "user_profiles"."id" IS '资料ID'""",
+    """COMMENT ON COLUMN "user_profiles"."first_name" IS '名'""",
+    """COMMENT ON COLUMN "user_profiles"."last_name" IS '姓'""",
+    """COMMENT ON COLUMN "user_profiles"."phone" IS '电话'""",
+    """COMMENT ON COLUMN "user_profiles"."avatar" IS '头像URL'""",
+    """COMMENT ON COLUMN "user_profiles"."bio" IS '个人简介'""",
+    """COMMENT ON COLUMN "user_profiles"."user_id" IS '用户'""",
+    """COMMENT ON TABLE "user_profiles" IS '用户资料表'""",
+]
+
+SQL = {
+    "sqlite": SQLITE,
+    "postgres": POSTGRES,
+}
@@ -0,0 +1,16 @@
+"""
+列表查询的排序索引：用户与 API 密钥按创建时间倒序，任务结果按任务名称/状态筛选后按创建时间倒序
+"""
+
+INDEXES = [
+    """CREATE INDEX IF NOT EXISTS "idx_users_created_at" ON "users" ("created_at")""",
+    """CREATE INDEX IF NOT EXISTS "idx_api_keys_created_at" ON "api_keys" ("created_at")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_date_created" ON "celery_task_result" ("date_created")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_name_created" ON "celery_task_result" ("task_name", "date_created")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_status_created" ON "celery_task_result" ("status", "date_created")""",
+]
+
+SQL = {
+    "sqlite": INDEXES,
+    "postgres": INDEXES,
+}
@@ -0,0 +1,20 @@
+"""
+游标分页的复合索引：排序字段之后加上 id，(created_at, id) 与 (date_created, id) 的比较可以直接按索引范围扫描，
+替换 v0002 中只包含排序字段的索引
+"""
+
+STATEMENTS = [
+    'DROP INDEX IF EXISTS "idx_users_created_at"',
+    'DROP INDEX IF EXISTS "idx_task_result_date_created"',
+    'DROP INDEX IF EXISTS "idx_task_result_name_created"',
+    'DROP INDEX IF EXISTS "idx_task_result_status_created"',
+    """CREATE INDEX IF NOT EXISTS "idx_users_created_id" ON "users" ("created_at", "id")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_created_id" ON "celery_task_result" ("date_created", "id")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_name_created_id" ON "celery_task_result" ("task_name", "date_created", "id")""",
+    """CREATE INDEX IF NOT EXISTS "idx_task_result_status_created_id" ON "celery_task_result" ("status", "date_created", "id")""",
+]
+
+SQL = {
+    "sqlite": STATEMENTS,
+    "postgres": STATEMENTS,
+}
@@ -0,0 +1,54 @@
+"""
+管理后台用户搜索的索引（由 app.services.user_search 使用，模型中无法声明，测试比较表结构时排除）
+- SQLite: users_search 为 FTS5 trigram 外部内容表（只保存索引，不复制数据），由触发器与 users 表同步；
+  lower(username)、lower(email) 表达式索引用于短关键词的前缀查找
+- PostgreSQL: pg_trgm GIN 索引支持 ILIKE '%关键词%'；lower(...) text_pattern_ops 索引用于前缀查找
+FTS5 trigram 分词器需要 SQLite 3.34 以上版本，执行前检查版本，不满足时给出明确的错误
+"""
+from app.utils.migrations import MigrationError
+
+
+# trigram 分词器需要的最低 SQLite 版本
+MIN_SQLITE_VERSION = (3, 34, 0)
+
+
+async def check(connection, dialect: str):
+    if dialect != "sqlite":
+        return
+    _, rows = await connection.execute_query("SELECT sqlite_version()")
+    version = rows[0][0]
+    if tuple(int(part) for part in version.split(".")[:3]) < MIN_SQLITE_VERSION:
+        raise MigrationError(
+            f"用户搜索索引需要 SQLite 3.34 以上版本（FTS5 trigram 分词器），当前版本为 {version}"
+        )
+
+
+SQL = {
+    "sqlite": [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS "users_search" USING fts5(
+    "username", "email", content='users', content_rowid='id', tokenize='trigram'
+)""",
+        """CREATE TRIGGER IF NOT EXISTS "users_search_ai" AFTER INSERT ON "users" BEGIN
+    INSERT INTO "users_search" ("rowid", "username", "email") VALUES (new."id", new."username", new."email");
+END""",
+        """CREATE TRIGGER IF NOT EXISTS "users_search_ad" AFTER DELETE ON "users" BEGIN
+    INSERT INTO "users_search" ("users_search", "rowid", "username", "email")
+    VALUES ('delete', old."id", old."username", old."email");
+END""",
+        """CREATE TRIGGER IF NOT EXISTS "users_search_au" AFTER UPDATE OF "username", "email" ON "users" BEGIN
+    INSERT INTO "users_search" ("users_search", "rowid", "username", "email")
+    VALUES ('delete', old."id", old."username", old."email");
+    INSERT INTO "users_search" ("rowid", "username", "email") VALUES (new."id", new."username", new."email");
+END""",
+        """INSERT INTO "users_search" ("users_search") VALUES ('rebuild')""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_username_lower" ON "users" (lower("username"))""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_email_lower" ON "users" (lower("email"))""",
+    ],
+    "postgres": [
+        """CREATE EXTENSION IF NOT EXISTS pg_trgm""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_username_trgm" ON "users" USING gin ("username" gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_email_trgm" ON "users" USING gin ("email" gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_username_lower" ON "users" (lower("username") text_pattern_ops)""",
+        """CREATE INDEX IF NOT EXISTS "idx_users_email_lower" ON "users" (lower("email") text_pattern_ops)""",
+    ],
+}
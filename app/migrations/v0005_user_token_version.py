@@ -0,0 +1,15 @@
+"""
+用户令牌版本列：吊销令牌时递增，Redis 中的版本号只作为缓存（键不存在时按数据库校验）
+由 generate_schemas 创建的已有数据库中已经存在该列，因此先检查列是否存在
+"""
+
+
+async def upgrade(connection, dialect: str):
+    if dialect == "postgres":
+        await connection.execute_query(
+            'ALTER TABLE "users" ADD COLUMN IF NOT EXISTS "token_version" INT NOT NULL DEFAULT 0'
+        )
+        return
+    _, rows = await connection.execute_query('PRAGMA table_info("users")')
+    if "token_version" not in [row[1] for row in rows]:
+        await connection.execute_query('ALTER TABLE "users" ADD COLUMN "token_version" INT NOT NULL DEFAULT 0')
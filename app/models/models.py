@@ -1,6 +1,7 @@
 from datetime import datetime
 from tortoise.models import Model
 from tortoise import fields
+from tortoise.indexes import Index
 import json
 
 
@@ -21,10 +22,12 @@ class User(Model, TimestampMixin):
     is_superuser = fields.BooleanField(default=False, description="是否为超级管理员")
     is_staff = fields.BooleanField(default=False, description="是否为管理员")
     last_login = fields.DatetimeField(null=True, description="最后登录时间")
+    token_version = fields.IntField(default=0, description="令牌版本")
     
     class Meta:
         table = "users"
         table_description = "用户表"
+        indexes = [Index(fields=("created_at", "id"), name="idx_users_created_id")]
     
     def __str__(self):
         return self.username
@@ -46,6 +49,33 @@ class UserProfile(Model, TimestampMixin):
         table_description = "用户资料表"
 
 
+class ApiKey(Model, TimestampMixin):
+    """
+    API 密钥模型
+    供服务间调用使用，数据库只保存密钥的 HMAC-SHA256 哈希
+    """
+    id = fields.IntField(pk=True, description="密钥ID")
+    name = fields.CharField(max_length=100, description="密钥名称")
+    prefix = fields.CharField(max_length=16, unique=True, description="密钥前缀（用于查找）")
+    key_hash = fields.CharField(max_length=64, description="密钥哈希 (HMAC-SHA256)")
+    scopes = fields.CharField(max_length=255, default="", description="权限范围（逗号分隔）")
+    is_active = fields.BooleanField(default=True, description="是否启用")
+    expires_at = fields.DatetimeField(null=True, description="过期时间")
+    last_used_at = fields.DatetimeField(null=True, description="最后使用时间")
+    
+    class Meta:
+        table = "api_keys"
+        table_description = "API密钥表"
+        indexes = [Index(fields=("created_at",), name="idx_api_keys_created_at")]
+    
+    def __str__(self):
+        return self.name
+    
+    def get_scopes(self):
+        """获取权限范围列表"""
+        return [scope for scope in self.scopes.split(",") if scope]
+
+
 # ============================================================================
 # Celery Beat 定时任务模型 (类似 django-celery-beat)
 # ============================================================================
@@ -73,7 +103,12 @@ class IntervalSchedule(Model):
         unique_together = (("every", "period"),)
     
     def __str__(self):
-        return f"每 {self.every} {self.period}"
+        return self.describe(self.every, self.period)
+    
+    @staticmethod
+    def describe(every: int, period: str) -> str:
+        """调度的显示文本（列表查询只读取列值时使用）"""
+        return f"每 {every} {period}"
     
     @property
     def schedule(self):
@@ -101,7 +136,12 @@ class CrontabSchedule(Model):
         table_description = "Crontab调度表"
     
     def __str__(self):
-        return f"{self.minute} {self.hour} {self.day_of_month} {self.month_of_year} {self.day_of_week}"
+        return self.describe(self.minute, self.hour, self.day_of_month, self.month_of_year, self.day_of_week)
+    
+    @staticmethod
+    def describe(minute: str, hour: str, day_of_month: str, month_of_year: str, day_of_week: str) -> str:
+        """调度的显示文本（列表查询只读取列值时使用）"""
+        return f"{minute} {hour} {day_of_month} {month_of_year} {day_of_week}"
     
     @property
     def schedule(self):
@@ -248,6 +288,11 @@ class TaskResult(Model):
     class Meta:
         table = "celery_task_result"
         table_description = "任务执行结果表"
+        indexes = [
+            Index(fields=("date_created", "id"), name="idx_task_result_created_id"),
+            Index(fields=("task_name", "date_created", "id"), name="idx_task_result_name_created_id"),
+            Index(fields=("status", "date_created", "id"), name="idx_task_result_status_created_id"),
+        ]
     
     def __str__(self):
         return f"{self.task_name}[{self.task_id}] - {self.status}"
\ No newline at end of file
@@ -2,5 +2,7 @@
 服务层模块
 """
 from .task_scheduler import TaskSchedulerService
+from .last_login import LastLoginBuffer, last_login_buffer
+from .user_search import search_users
 
-__all__ = ["TaskSchedulerService"]
+__all__ = ["TaskSchedulerService", "LastLoginBuffer", "last_login_buffer", "search_users"]
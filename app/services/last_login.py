@@ -0,0 +1,121 @@
+"""
+最后登录时间写缓冲
+登录时只在内存中记录时间，由后台任务定期合并为一条只更新 last_login 列的批量 UPDATE
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from config.settings import settings
+from config.logging import get_logger
+from app.models.models import User
+
+
+logger = get_logger(__name__)
+
+
+class LastLoginBuffer:
+    """最后登录时间写缓冲"""
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        batch_size: int = 500
+    ):
+        self.flush_interval = flush_interval or settings.LAST_LOGIN_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.LAST_LOGIN_MAX_PENDING
+        self.batch_size = batch_size
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        # 缓冲区满时在后台触发的刷新任务（保留引用，关闭时等待完成）
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.flushed_rows = 0
+        self.flush_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """启动后台刷新任务（在 lifespan 启动阶段调用）"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台刷新任务并写入剩余数据（在 lifespan 关闭阶段调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+    async def record(self, user_id: int, login_time: Optional[datetime] = None):
+        """记录用户登录时间"""
+        login_time = login_time or datetime.utcnow()
+
+        if not self.running:
+            # 未启动后台任务时（如测试环境）直接更新单列
+            await User.filter(id=user_id).update(last_login=login_time)
+            return
+
+        previous = self._pending.get(user_id)
+        if previous is None or login_time > previous:
+            self._pending[user_id] = login_time
+
+        if len(self._pending) >= self.max_pending and not self._flush_tasks:
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> int:
+        """将缓冲区中的登录时间批量写入数据库"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            users = [User(id=user_id, last_login=login_time) for user_id, login_time in pending.items()]
+            try:
+                await User.bulk_update(users, fields=["last_login"], batch_size=self.batch_size)
+            except Exception as e:
+                # 写入失败时放回缓冲区，等待下次刷新（保留较新的时间）
+                for user_id, login_time in pending.items():
+                    current = self._pending.get(user_id)
+                    if current is None or login_time > current:
+                        self._pending[user_id] = login_time
+                logger.error(f"批量更新最后登录时间失败: {e}")
+                return 0
+
+            self.flushed_rows += len(users)
+            self.flush_count += 1
+            return len(users)
+
+    async def _run(self):
+        """后台定期刷新"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"刷新最后登录时间失败: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓冲区统计信息"""
+        return {
+            "pending": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flush_count": self.flush_count,
+        }
+
+
+# 全局最后登录时间写缓冲实例
+last_login_buffer = LastLoginBuffer()
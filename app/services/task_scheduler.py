@@ -4,9 +4,26 @@
 """
 import json
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+from tortoise import connections
 from tortoise.exceptions import DoesNotExist
+from tortoise.functions import Count
 
+from app.core.cache_tags import (
+    TASK_RESULTS_NAMESPACE,
+    TASKS_NAMESPACE,
+    invalidate_task_results,
+    invalidate_tasks,
+)
+from app.core.db_router import use_replica
+from app.core.task_counters import (
+    RESULTS_TOTAL,
+    TASKS_ENABLED,
+    TASKS_TOTAL,
+    result_field,
+    task_counters,
+)
+from app.utils.pagination import CursorPage, count_total, paginate_cursor
 from app.models.models import (
     IntervalSchedule,
     CrontabSchedule,
@@ -16,6 +33,11 @@ from app.models.models import (
 )
 
 
+# 列表排序（游标分页的排序字段，与 app/migrations 中的复合索引对应）
+PERIODIC_TASK_ORDERING = ("id",)
+TASK_RESULT_ORDERING = ("-date_created", "-id")
+
+
 class TaskSchedulerService:
     """定时任务调度服务"""
     
@@ -31,9 +53,12 @@ class TaskSchedulerService:
             every=every,
             period=period
         )
+        if created:
+            await invalidate_tasks()
         return schedule
     
     @staticmethod
+    @use_replica
     async def get_interval(interval_id: int) -> Optional[IntervalSchedule]:
         """获取间隔调度"""
         try:
@@ -42,6 +67,7 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
+    @use_replica
     async def list_intervals() -> List[IntervalSchedule]:
         """列出所有间隔调度"""
         return await IntervalSchedule.all()
@@ -50,6 +76,8 @@ class TaskSchedulerService:
     async def delete_interval(interval_id: int) -> bool:
         """删除间隔调度"""
         deleted_count = await IntervalSchedule.filter(id=interval_id).delete()
+        if deleted_count > 0:
+            await invalidate_tasks()
         return deleted_count > 0
     
     # ==================== Crontab调度管理 ====================
@@ -72,9 +100,11 @@ class TaskSchedulerService:
             month_of_year=month_of_year,
             timezone=timezone
         )
+        await invalidate_tasks()
         return schedule
     
     @staticmethod
+    @use_replica
     async def get_crontab(crontab_id: int) -> Optional[CrontabSchedule]:
         """获取 Crontab 调度"""
         try:
@@ -83,6 +113,7 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
+    @use_replica
     async def list_crontabs() -> List[CrontabSchedule]:
         """列出所有 Crontab 调度"""
         return await CrontabSchedule.all()
@@ -91,6 +122,8 @@ class TaskSchedulerService:
     async def delete_crontab(crontab_id: int) -> bool:
         """删除 Crontab 调度"""
         deleted_count = await CrontabSchedule.filter(id=crontab_id).delete()
+        if deleted_count > 0:
+            await invalidate_tasks()
         return deleted_count > 0
     
     # ==================== 定时任务管理 ====================
@@ -136,10 +169,13 @@ class TaskSchedulerService:
         
         # 标记任务已变更
         await PeriodicTaskChanged.update_changed()
+        await invalidate_tasks()
+        await task_counters.increment({TASKS_TOTAL: 1, TASKS_ENABLED: int(periodic_task.enabled)})
         
         return periodic_task
     
     @staticmethod
+    @use_replica
     async def get_periodic_task(task_id: int) -> Optional[PeriodicTask]:
         """获取定时任务"""
         try:
@@ -148,6 +184,7 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
+    @use_replica
     async def get_periodic_task_by_name(name: str) -> Optional[PeriodicTask]:
         """根据名称获取定时任务"""
         try:
@@ -156,18 +193,59 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
+    @use_replica
     async def list_periodic_tasks(
         enabled: Optional[bool] = None,
         limit: int = 100,
         offset: int = 0
     ) -> List[PeriodicTask]:
         """列出定时任务"""
+        page = await TaskSchedulerService.page_periodic_tasks(enabled=enabled, limit=limit, offset=offset)
+        return page.items
+    
+    @staticmethod
+    @use_replica
+    async def page_periodic_tasks(
+        enabled: Optional[bool] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> CursorPage:
+        """分页列出定时任务（按 id 游标分页，fields 不为空时只查询这些列，可包含 interval__every 等关联列）"""
+        query = TaskSchedulerService.periodic_task_query(enabled)
+        if not fields:
+            query = query.prefetch_related("interval", "crontab")
+        
+        return await paginate_cursor(
+            query,
+            PERIODIC_TASK_ORDERING,
+            limit,
+            cursor=cursor,
+            offset=offset,
+            fields=fields
+        )
+    
+    @staticmethod
+    def periodic_task_query(enabled: Optional[bool] = None):
+        """定时任务列表的过滤条件（分页与计数共用）"""
         query = PeriodicTask.all()
         
         if enabled is not None:
             query = query.filter(enabled=enabled)
         
-        return await query.offset(offset).limit(limit).prefetch_related("interval", "crontab")
+        return query
+    
+    @staticmethod
+    @use_replica
+    async def count_periodic_tasks(
+        enabled: Optional[bool] = None,
+        with_total: bool = True
+    ) -> Tuple[Optional[int], bool]:
+        """定时任务总数，返回 (总数, 是否为估算值)"""
+        return await count_total(
+            TaskSchedulerService.periodic_task_query(enabled), TASKS_NAMESPACE, with_total
+        )
     
     @staticmethod
     async def update_periodic_task(
@@ -186,26 +264,48 @@ class TaskSchedulerService:
         if "kwargs" in kwargs and isinstance(kwargs["kwargs"], dict):
             kwargs["kwargs"] = json.dumps(kwargs["kwargs"])
         
+        # 启用状态单独写入（见下方条件更新），保存其他字段时不覆盖并发的启用/禁用
+        enabled = kwargs.pop("enabled", None)
+        
         # 更新字段
         for key, value in kwargs.items():
             if hasattr(task, key):
                 setattr(task, key, value)
         
-        await task.save()
+        await task.save(update_fields=[
+            name for name in task._meta.fields_db_projection if name not in ("id", "enabled")
+        ])
+        
+        # 条件更新：只有状态确实被本请求切换（影响 1 行）时才计入增量，并发切换同一任务时计数器不会重复变化
+        deltas = {}
+        if enabled is not None:
+            enabled = bool(enabled)
+            if await PeriodicTask.filter(id=task_id, enabled=not enabled).update(enabled=enabled):
+                deltas[TASKS_ENABLED] = 1 if enabled else -1
+            task.enabled = enabled
         
         # 标记任务已变更
         await PeriodicTaskChanged.update_changed()
+        await invalidate_tasks()
+        await task_counters.increment(deltas)
         
         return task
     
     @staticmethod
     async def delete_periodic_task(task_id: int) -> bool:
         """删除定时任务"""
-        deleted_count = await PeriodicTask.filter(id=task_id).delete()
-        if deleted_count > 0:
-            await PeriodicTaskChanged.update_changed()
-            return True
-        return False
+        # 按读取到的启用状态条件删除，状态被并发修改时重新读取，计数器增量与实际删除的行一致
+        while True:
+            enabled = await PeriodicTask.filter(id=task_id).first().values_list("enabled", flat=True)
+            if enabled is None:
+                return False
+            if await PeriodicTask.filter(id=task_id, enabled=enabled).delete():
+                break
+        
+        await PeriodicTaskChanged.update_changed()
+        await invalidate_tasks()
+        await task_counters.increment({TASKS_TOTAL: -1, TASKS_ENABLED: -int(bool(enabled))})
+        return True
     
     @staticmethod
     async def enable_task(task_id: int) -> bool:
@@ -266,17 +366,36 @@ class TaskSchedulerService:
             }
         )
         
+        # 统计计数器的增量：新建（只有实际插入的请求 created 为 True），或状态发生变化
+        deltas = {RESULTS_TOTAL: 1, result_field(status): 1} if created else {}
+        
         if not created:
-            task_result.status = status
-            task_result.result = json.dumps(result) if result else None
-            task_result.traceback = traceback
+            values = {
+                "status": status,
+                "result": json.dumps(result) if result else None,
+                "traceback": traceback,
+            }
             if status in [TaskResult.SUCCESS, TaskResult.FAILURE]:
-                task_result.date_done = datetime.utcnow()
-            await task_result.save()
+                values["date_done"] = datetime.utcnow()
+            
+            # 条件更新：状态仍为读取时的值才写入，并发更新同一任务时旧状态只会被扣减一次；
+            # 状态已被其他请求修改时重新读取后重试
+            while task_result is not None:
+                old_status = task_result.status
+                if await TaskResult.filter(id=task_result.id, status=old_status).update(**values):
+                    for key, value in values.items():
+                        setattr(task_result, key, value)
+                    if old_status != status:
+                        deltas = {result_field(old_status): -1, result_field(status): 1}
+                    break
+                task_result = await TaskResult.get_or_none(id=task_result.id)
         
+        await invalidate_task_results()
+        await task_counters.increment(deltas)
         return task_result
     
     @staticmethod
+    @use_replica
     async def get_task_result(task_id: str) -> Optional[TaskResult]:
         """获取任务执行结果"""
         try:
@@ -285,6 +404,7 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
+    @use_replica
     async def list_task_results(
         task_name: Optional[str] = None,
         status: Optional[str] = None,
@@ -292,6 +412,31 @@ class TaskSchedulerService:
         offset: int = 0
     ) -> List[TaskResult]:
         """列出任务执行结果"""
+        page = await TaskSchedulerService.page_task_results(
+            task_name=task_name, status=status, limit=limit, offset=offset
+        )
+        return page.items
+    
+    @staticmethod
+    @use_replica
+    async def page_task_results(
+        task_name: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> CursorPage:
+        """分页列出任务执行结果（按 date_created, id 倒序游标分页，fields 不为空时只查询这些列）"""
+        query = TaskSchedulerService.task_result_query(task_name, status)
+        
+        return await paginate_cursor(
+            query, TASK_RESULT_ORDERING, limit, cursor=cursor, offset=offset, fields=fields
+        )
+    
+    @staticmethod
+    def task_result_query(task_name: Optional[str] = None, status: Optional[str] = None):
+        """任务执行结果列表的过滤条件（分页与计数共用）"""
         query = TaskResult.all()
         
         if task_name:
@@ -299,18 +444,35 @@ class TaskSchedulerService:
         if status:
             query = query.filter(status=status)
         
-        return await query.order_by("-date_created").offset(offset).limit(limit)
+        return query
+    
+    @staticmethod
+    @use_replica
+    async def count_task_results(
+        task_name: Optional[str] = None,
+        status: Optional[str] = None,
+        with_total: bool = True
+    ) -> Tuple[Optional[int], bool]:
+        """任务执行结果总数，返回 (总数, 是否为估算值)"""
+        return await count_total(
+            TaskSchedulerService.task_result_query(task_name, status), TASK_RESULTS_NAMESPACE, with_total
+        )
     
     @staticmethod
     async def cleanup_old_results(days: int = 30) -> int:
         """清理旧的任务结果"""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         deleted_count = await TaskResult.filter(date_created__lt=cutoff_date).delete()
+        if deleted_count > 0:
+            await invalidate_task_results()
+            # 批量删除后不逐个状态扣减，下一次读取统计时重新聚合
+            await task_counters.reset()
         return deleted_count
     
     # ==================== 调度信息获取 ====================
     
     @staticmethod
+    @use_replica
     async def get_all_schedules() -> Dict[str, Any]:
         """获取所有启用的调度配置（供 Celery Beat 使用）"""
         tasks = await PeriodicTask.filter(enabled=True).prefetch_related("interval", "crontab")
@@ -340,16 +502,52 @@ class TaskSchedulerService:
         return schedules
     
     @staticmethod
+    async def aggregate_task_statistics(using_db=None) -> Dict[str, int]:
+        """聚合统计计数器的各字段（每张表一条 GROUP BY 查询）"""
+        counts = {TASKS_TOTAL: 0, TASKS_ENABLED: 0, RESULTS_TOTAL: 0}
+        
+        rows = await (
+            PeriodicTask.annotate(count=Count("id"))
+            .group_by("enabled")
+            .using_db(using_db)
+            .values_list("enabled", "count")
+        )
+        for enabled, count in rows:
+            counts[TASKS_TOTAL] += count
+            if enabled:
+                counts[TASKS_ENABLED] += count
+        
+        rows = await (
+            TaskResult.annotate(count=Count("id"))
+            .group_by("status")
+            .using_db(using_db)
+            .values_list("status", "count")
+        )
+        for status, count in rows:
+            counts[RESULTS_TOTAL] += count
+            counts[result_field(status)] = counts.get(result_field(status), 0) + count
+        
+        return counts
+    
+    @staticmethod
+    @use_replica
     async def get_task_statistics() -> Dict[str, Any]:
-        """获取任务统计信息"""
-        total_tasks = await PeriodicTask.all().count()
-        enabled_tasks = await PeriodicTask.filter(enabled=True).count()
-        disabled_tasks = await PeriodicTask.filter(enabled=False).count()
-        
-        total_results = await TaskResult.all().count()
-        success_results = await TaskResult.filter(status=TaskResult.SUCCESS).count()
-        failure_results = await TaskResult.filter(status=TaskResult.FAILURE).count()
-        pending_results = await TaskResult.filter(status=TaskResult.PENDING).count()
+        """获取任务统计信息（读取 Redis 计数器，不存在时聚合并重建）"""
+        counts = await task_counters.get()
+        if counts is None:
+            # 计数器用聚合结果重建后只做增量更新，从主库聚合，避免副本延迟的偏差保留到计数器过期
+            primary = connections.get(TaskResult._meta.default_connection) if task_counters.enabled else None
+            counts = await TaskSchedulerService.aggregate_task_statistics(primary)
+            await task_counters.rebuild(counts)
+        
+        total_tasks = counts.get(TASKS_TOTAL, 0)
+        enabled_tasks = counts.get(TASKS_ENABLED, 0)
+        disabled_tasks = total_tasks - enabled_tasks
+        
+        total_results = counts.get(RESULTS_TOTAL, 0)
+        success_results = counts.get(result_field(TaskResult.SUCCESS), 0)
+        failure_results = counts.get(result_field(TaskResult.FAILURE), 0)
+        pending_results = counts.get(result_field(TaskResult.PENDING), 0)
         
         return {
             "periodic_tasks": {
@@ -0,0 +1,75 @@
+"""
+管理后台用户搜索（用户名、邮箱，不区分大小写）
+- 关键词不少于 3 个字符时按子串匹配：SQLite 查询 FTS5 trigram 表 users_search，PostgreSQL 使用 pg_trgm GIN 索引
+- 1~2 个字符无法组成 trigram，改为前缀匹配，使用 lower(...) 表达式索引
+- 搜索条件为 id IN (子查询)，可以与其他过滤条件、游标分页、计数组合；索引由迁移 v0004 创建
+- 其他数据库回退为 icontains（全表扫描）
+"""
+from typing import Any, Sequence
+
+from pypika_tortoise.context import SqlContext
+from pypika_tortoise.terms import Term, ValueWrapper
+from tortoise.expressions import Q
+from tortoise.filters import escape_like
+from tortoise.queryset import QuerySet
+
+
+# trigram 的长度，短于该长度的关键词按前缀匹配
+MIN_SUBSTRING_LENGTH = 3
+
+SUBSTRING_SQL = {
+    "sqlite": '(SELECT "rowid" FROM "users_search" WHERE "users_search" MATCH {})',
+    "postgres": '(SELECT "id" FROM "users" WHERE "username" ILIKE {} OR "email" ILIKE {})',
+}
+
+# 两个索引分别查找后合并，避免 OR 条件退化为全表扫描
+PREFIX_SQL = {
+    "sqlite": (
+        '(SELECT "id" FROM "users" WHERE lower("username") >= {} AND lower("username") < {} '
+        'UNION ALL SELECT "id" FROM "users" WHERE lower("email") >= {} AND lower("email") < {})'
+    ),
+    "postgres": (
+        '(SELECT "id" FROM "users" WHERE lower("username") LIKE {} '
+        'UNION ALL SELECT "id" FROM "users" WHERE lower("email") LIKE {})'
+    ),
+}
+
+
+class MatchingUserIds(Term):
+    """匹配用户 id 的子查询（参数化，用于 id__in），params 与 sql 中的 {} 依次对应"""
+
+    def __init__(self, sql: str, params: Sequence[Any]) -> None:
+        super().__init__()
+        self.sql = sql
+        self.params = list(params)
+
+    def get_sql(self, ctx: SqlContext) -> str:
+        return self.sql.format(*(ValueWrapper(param).get_sql(ctx) for param in self.params))
+
+
+def matching_user_ids(search: str, dialect: str) -> MatchingUserIds:
+    """搜索关键词对应的子查询"""
+    term = search.strip().lower()
+    if len(term) >= MIN_SUBSTRING_LENGTH:
+        if dialect == "sqlite":
+            # 整个关键词作为一个短语，不解析 FTS5 查询语法
+            return MatchingUserIds(SUBSTRING_SQL[dialect], ['"' + term.replace('"', '""') + '"'])
+        pattern = f"%{escape_like(term)}%"
+        return MatchingUserIds(SUBSTRING_SQL[dialect], [pattern, pattern])
+
+    if dialect == "sqlite":
+        # lower(col) >= 'ab' AND lower(col) < 'ac'：只包含 'ab' 开头的值
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        return MatchingUserIds(PREFIX_SQL[dialect], [term, upper, term, upper])
+    return MatchingUserIds(PREFIX_SQL[dialect], [f"{escape_like(term)}%"] * 2)
+
+
+def search_users(queryset: QuerySet, search: str) -> QuerySet:
+    """在用户查询上添加搜索条件，关键词为空时原样返回"""
+    if not search or not search.strip():
+        return queryset
+
+    dialect = queryset._choose_db().capabilities.dialect
+    if dialect not in SUBSTRING_SQL:
+        return queryset.filter(Q(username__icontains=search) | Q(email__icontains=search))
+    return queryset.filter(id__in=matching_user_ids(search, dialect))
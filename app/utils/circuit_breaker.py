@@ -0,0 +1,122 @@
+"""
+熔断器
+- closed: 正常调用，统计时间窗口内的失败次数，达到阈值后打开
+- open: 直接拒绝调用（快速失败），recovery_timeout 秒后进入半开
+- half_open: 只放行少量探测调用，成功则关闭，失败则重新打开
+"""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from config.settings import settings
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开，调用被拒绝"""
+    pass
+
+
+class CircuitBreaker:
+    """熔断器（仅在事件循环线程中使用）"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        window: Optional[float] = None,
+        recovery_timeout: Optional[float] = None,
+        half_open_max_calls: Optional[int] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.REDIS_BREAKER_FAILURE_THRESHOLD
+        self.window = window or settings.REDIS_BREAKER_WINDOW
+        self.recovery_timeout = recovery_timeout or settings.REDIS_BREAKER_RECOVERY_TIMEOUT
+        self.half_open_max_calls = half_open_max_calls or settings.REDIS_BREAKER_HALF_OPEN_MAX_CALLS
+        self.state = self.CLOSED
+        self._failures: Deque[float] = deque()
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejected = 0
+        self.opened_count = 0
+        self.last_error: Optional[str] = None
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        self.opened_count += 1
+
+    def before_call(self):
+        """调用前检查，熔断时抛出 CircuitOpenError"""
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} 熔断中")
+            self.state = self.HALF_OPEN
+            self._opened_at = time.monotonic()
+            self._half_open_calls = 0
+        elif time.monotonic() - self._opened_at >= self.recovery_timeout:
+            # 探测调用长时间没有结果（如被取消），允许新的探测
+            self._opened_at = time.monotonic()
+            self._half_open_calls = 0
+        if self._half_open_calls >= self.half_open_max_calls:
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} 熔断探测中")
+        self._half_open_calls += 1
+
+    def record_success(self):
+        """记录成功调用"""
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            self._failures.clear()
+            self.last_error = None
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        """记录失败调用"""
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        if self.state == self.OPEN:
+            return
+
+        now = time.monotonic()
+        self._failures.append(now)
+        while self._failures and self._failures[0] <= now - self.window:
+            self._failures.popleft()
+        if len(self._failures) >= self.failure_threshold:
+            self._open()
+
+    def force_open(self, error: Optional[BaseException] = None):
+        """立即打开熔断器（如启动时连接失败）"""
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"
+        if self.state != self.OPEN:
+            self._open()
+
+    def reset(self):
+        """重置为关闭状态"""
+        self.state = self.CLOSED
+        self._failures.clear()
+        self._half_open_calls = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断器状态"""
+        stats = {
+            "state": self.state,
+            "recent_failures": len(self._failures),
+            "failure_threshold": self.failure_threshold,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+        if self.state == self.OPEN:
+            stats["retry_in"] = round(max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)), 3)
+        return stats
@@ -0,0 +1,220 @@
+"""
+服务端辅助的客户端缓存（Redis CLIENT TRACKING）
+- 单独的失效连接订阅 __redis__:invalidate，记下其 CLIENT ID
+- 读取连接建立时执行 CLIENT TRACKING ON REDIRECT <id>（可选 BCAST PREFIX），
+  服务端在被读取过的键（或匹配前缀的键）发生变化时向失效连接推送键名
+- 本地保存原始字节，命中时无需网络往返；收到失效消息后删除本地副本
+
+使用 RESP2 重定向方式而不是 RESP3 推送：redis-py 的 asyncio 客户端不支持在普通连接上处理推送消息，
+重定向方式在 RESP2/RESP3 下行为一致。服务端不支持 CLIENT TRACKING（Redis 6 以下）时自动回退到普通读取。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+import redis.asyncio as redis
+from redis.asyncio.connection import Connection
+from redis.client import NEVER_DECODE
+
+from config.settings import settings
+from config.logging import get_logger
+from app.utils.helpers import cancel_task
+from app.utils.local_cache import LRUTTLCache
+
+
+logger = get_logger(__name__)
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+
+class ClientTrackingCache:
+    """客户端缓存"""
+
+    def __init__(
+        self,
+        prefixes: Optional[List[str]] = None,
+        bcast: Optional[bool] = None,
+        maxsize: Optional[int] = None,
+        pool_size: Optional[int] = None
+    ):
+        if prefixes is None:
+            prefixes = [p.strip() for p in settings.REDIS_TRACKING_PREFIXES.split(",") if p.strip()]
+        self.prefixes = tuple(prefixes)
+        self.bcast = settings.REDIS_TRACKING_BCAST if bcast is None else bcast
+        self.pool_size = pool_size or settings.REDIS_TRACKING_POOL_SIZE
+        # 本地副本的有效性由失效消息保证，不设置 TTL
+        self.local = LRUTTLCache(maxsize=maxsize or settings.REDIS_TRACKING_MAX_KEYS, ttl=0)
+        self.redirect_id: Optional[int] = None
+        self.redis: Optional[redis.Redis] = None
+        self._url: Optional[str] = None
+        self._listener: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        # 正在读取的键 -> 读取令牌；读取期间收到失效消息时令牌被移除，读到的值不写入本地
+        self._pending: Dict[str, Set[object]] = {}
+        self.invalidations = 0
+        self.redirect_breaks = 0
+
+    @property
+    def active(self) -> bool:
+        """失效连接正常时才使用本地副本"""
+        return self.redirect_id is not None
+
+    def tracking_args(self) -> Tuple[Any, ...]:
+        args: List[Any] = ["REDIRECT", self.redirect_id]
+        if self.bcast:
+            args.append("BCAST")
+            for prefix in self.prefixes:
+                args.extend(["PREFIX", prefix])
+        return tuple(args)
+
+    async def _on_connect(self, connection: Connection):
+        """读取连接建立后（完成认证、选择数据库）开启 CLIENT TRACKING"""
+        await connection.on_connect()
+        await connection.send_command("CLIENT", "TRACKING", "ON", *self.tracking_args())
+        response = await connection.read_response()
+        if response not in ("OK", b"OK"):
+            raise redis.ConnectionError(f"开启 CLIENT TRACKING 失败: {response}")
+
+    def accepts(self, key: str) -> bool:
+        """是否通过客户端缓存读取该键（配置了前缀时只缓存匹配的键）"""
+        return not self.prefixes or key.startswith(self.prefixes)
+
+    async def start(
+        self,
+        url: str,
+        pool_kwargs: Dict[str, Any],
+        pool_class: Type[redis.ConnectionPool] = redis.BlockingConnectionPool
+    ) -> bool:
+        """建立失效连接与读取连接池，服务端不支持时返回 False"""
+        self._url = url
+        try:
+            self.redirect_id = await self._connect_listener()
+            pool = pool_class.from_url(
+                url,
+                decode_responses=True,
+                redis_connect_func=self._on_connect,
+                **{**pool_kwargs, "max_connections": self.pool_size}
+            )
+            self.redis = redis.Redis(connection_pool=pool)
+            await self.redis.ping()
+        except Exception as e:
+            logger.warning(f"Redis客户端缓存不可用，使用普通读取: {e}")
+            await self.stop()
+            return False
+
+        self._task = asyncio.create_task(self._listen())
+        return True
+
+    async def stop(self):
+        """停止失效监听并关闭连接"""
+        if self._task is not None:
+            await cancel_task(self._task)
+            self._task = None
+        for client in (self.redis, self._listener):
+            if client is not None:
+                try:
+                    await client.aclose()
+                    await client.connection_pool.disconnect()
+                except Exception:
+                    pass
+        self.redis = None
+        self._listener = None
+        self._reset()
+
+    def _reset(self):
+        self.redirect_id = None
+        self.local.clear()
+        self._pending.clear()
+
+    async def _connect_listener(self) -> int:
+        """建立失效连接（不设置读超时），订阅失效频道，返回其 CLIENT ID"""
+        self._listener = redis.Redis.from_url(
+            self._url,
+            decode_responses=True,
+            socket_timeout=None,
+            socket_keepalive=True,
+            single_connection_client=True
+        )
+        redirect_id = await self._listener.client_id()
+        connection = self._listener.connection
+        await connection.send_command("SUBSCRIBE", INVALIDATE_CHANNEL)
+        await connection.read_response()
+        return redirect_id
+
+    async def _listen(self):
+        """处理失效消息；失效连接断开时清空本地副本，重连后让读取连接以新的 REDIRECT 重新开启跟踪"""
+        delay = 0.5
+        while True:
+            try:
+                if self._listener is None:
+                    redirect_id = await self._connect_listener()
+                    # 旧读取连接的跟踪仍指向已断开的 CLIENT ID，全部重建后再启用本地副本
+                    await self.redis.connection_pool.disconnect()
+                    self.redirect_id = redirect_id
+                    delay = 0.5
+                while True:
+                    message = await self._listener.connection.read_response()
+                    if isinstance(message, list) and len(message) == 3 and message[0] == "message":
+                        self._invalidate(message[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis客户端缓存失效连接断开: {e}")
+                self.redirect_breaks += 1
+                self._reset()
+                if self._listener is not None:
+                    try:
+                        await self._listener.aclose()
+                    except Exception:
+                        pass
+                    self._listener = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _invalidate(self, keys: Optional[List[str]]):
+        self.invalidations += 1
+        if keys is None:
+            # FLUSHALL/FLUSHDB
+            self.local.clear()
+            self._pending.clear()
+            return
+        for key in keys:
+            self.local.delete(key)
+            self._pending.pop(key, None)
+
+    def evict(self, *keys: str):
+        """本进程写入后立即删除本地副本（不等待失效消息）"""
+        for key in keys:
+            self.local.delete(key)
+            self._pending.pop(key, None)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """读取键的原始字节：命中本地副本时不访问网络"""
+        raw = self.local.get(key)
+        if raw is not None:
+            return raw
+
+        token = object()
+        self._pending.setdefault(key, set()).add(token)
+        try:
+            raw = await self.redis.execute_command("GET", key, **{NEVER_DECODE: True})
+        finally:
+            tokens = self._pending.get(key)
+            still_valid = tokens is not None and token in tokens
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    self._pending.pop(key, None)
+
+        if raw is not None and still_valid and self.active:
+            self.local.set(key, raw)
+        return raw
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "mode": "bcast" if self.bcast else "default",
+            "prefixes": list(self.prefixes),
+            "local": self.local.get_stats(),
+            "invalidations": self.invalidations,
+            "redirect_breaks": self.redirect_breaks,
+        }
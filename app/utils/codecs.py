@@ -0,0 +1,197 @@
+"""
+缓存值编解码
+写入 Redis 的值使用带类型标记的二进制信封：
+
+    0xFE | 编解码器 ID (1 字节) | 标志位 (1 字节) | 数据
+
+- 0xFE 在 UTF-8 文本中不会出现，因此可以与旧版本写入的 JSON 文本明确区分
+- 标志位 bit0 表示数据经过 zlib 压缩（超过阈值时才压缩）
+- bytes 值始终使用 raw 编解码器，读取时原样返回 bytes
+"""
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖
+    msgpack = None
+
+
+MAGIC = 0xFE
+FLAG_COMPRESSED = 0x01
+
+
+class CodecError(Exception):
+    """编解码失败"""
+    pass
+
+
+class Codec:
+    """编解码器基类"""
+    id: int = 0
+    name: str = ""
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class RawCodec(Codec):
+    """原始字节（str 按 UTF-8 编码，读取时返回 bytes）"""
+    id = 0
+    name = "raw"
+
+    def encode(self, value: Any) -> bytes:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        raise CodecError(f"raw 编解码器不支持类型 {type(value).__name__}")
+
+    def decode(self, data: bytes) -> Any:
+        return data
+
+
+class JsonCodec(Codec):
+    """标准库 JSON"""
+    id = 1
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """orjson（需要安装 orjson）"""
+    id = 2
+    name = "orjson"
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack（需要安装 msgpack）"""
+    id = 3
+    name = "msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_codecs_by_name: Dict[str, Codec] = {}
+_codecs_by_id: Dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """注册编解码器"""
+    _codecs_by_name[codec.name] = codec
+    _codecs_by_id[codec.id] = codec
+
+
+register_codec(RawCodec())
+register_codec(JsonCodec())
+if orjson is not None:
+    register_codec(OrjsonCodec())
+if msgpack is not None:
+    register_codec(MsgpackCodec())
+
+
+def available_codecs() -> Dict[str, Codec]:
+    """已注册（依赖已安装）的编解码器"""
+    return dict(_codecs_by_name)
+
+
+def get_codec(name: str) -> Codec:
+    """按名称获取编解码器，"fastjson" 表示已安装时使用 orjson，否则使用标准库 JSON"""
+    if name == "fastjson":
+        name = "orjson" if "orjson" in _codecs_by_name else "json"
+    codec = _codecs_by_name.get(name)
+    if codec is None:
+        raise CodecError(f"未知或未安装的编解码器: {name}")
+    return codec
+
+
+def _namespace_codecs() -> Dict[str, str]:
+    return json.loads(settings.REDIS_CODEC_NAMESPACES or "{}")
+
+
+_namespaces: Optional[Dict[str, str]] = None
+
+
+def codec_for_key(key: str) -> Codec:
+    """根据键的命名空间前缀选择编解码器（最长前缀优先），未配置时使用默认编解码器"""
+    global _namespaces
+    if _namespaces is None:
+        _namespaces = dict(sorted(_namespace_codecs().items(), key=lambda item: -len(item[0])))
+    for prefix, name in _namespaces.items():
+        if key.startswith(prefix):
+            return get_codec(name)
+    return get_codec(settings.REDIS_CODEC)
+
+
+def encode_value(
+    value: Any,
+    codec: Optional[Codec] = None,
+    compress_threshold: Optional[int] = None
+) -> bytes:
+    """将值编码为信封格式"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        codec = _codecs_by_name["raw"]
+    elif codec is None:
+        codec = get_codec(settings.REDIS_CODEC)
+
+    data = codec.encode(value)
+    threshold = settings.REDIS_COMPRESS_THRESHOLD if compress_threshold is None else compress_threshold
+    flags = 0
+    if threshold and len(data) >= threshold:
+        compressed = zlib.compress(data, settings.REDIS_COMPRESS_LEVEL)
+        if len(compressed) < len(data):
+            data = compressed
+            flags |= FLAG_COMPRESSED
+    return bytes((MAGIC, codec.id, flags)) + data
+
+
+def decode_value(data: Any) -> Any:
+    """
+    解码信封格式的值
+    不是信封格式时按旧格式处理：尝试解析 JSON，失败时返回字符串
+    """
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if len(data) >= 3 and data[0] == MAGIC:
+        codec = _codecs_by_id.get(data[1])
+        if codec is None:
+            raise CodecError(f"未知或未安装的编解码器 ID: {data[1]}")
+        payload = data[3:]
+        if data[2] & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+        return codec.decode(payload)
+
+    text = data.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return text
@@ -0,0 +1,48 @@
+"""
+数据库连接工具
+- 启动时预热连接：asyncpg 连接池在首次使用时才会创建，预热后 DB_POOL_MIN_SIZE 个连接在接收请求前就已建立；
+  SQLite 预热会打开连接并执行 PRAGMA
+- 连接池统计信息
+"""
+from typing import Any, Dict
+
+from tortoise import connections
+
+
+def _pool(client) -> Any:
+    return getattr(client, "_pool", None)
+
+
+async def warm_up_database(connection_name: str = "default") -> int:
+    """预热数据库连接，返回已建立的连接数"""
+    client = connections.get(connection_name)
+    await client.execute_query("SELECT 1")
+    pool = _pool(client)
+    if pool is not None and hasattr(pool, "get_size"):
+        return pool.get_size()
+    return 1
+
+
+def get_database_stats(connection_name: str = "default") -> Dict[str, Any]:
+    """获取数据库连接池统计信息（尚未建立连接时只返回后端名称）"""
+    try:
+        client = connections.get(connection_name)
+    except Exception:
+        return {"connected": False}
+
+    stats: Dict[str, Any] = {
+        "engine": type(client).__module__.rsplit(".", 1)[0],
+        "connected": False,
+    }
+    pool = _pool(client)
+    if pool is not None and hasattr(pool, "get_size"):
+        stats.update({
+            "connected": True,
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "min_size": pool.get_min_size(),
+            "max_size": pool.get_max_size(),
+        })
+    elif getattr(client, "_connection", None) is not None:
+        stats.update({"connected": True, "size": 1})
+    return stats
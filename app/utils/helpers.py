@@ -4,6 +4,7 @@ FastAPI Base 项目工具模块
 这个模块包含项目中常用的工具函数和类
 """
 
+import asyncio
 import hashlib
 import secrets
 import string
@@ -205,7 +206,7 @@ def mask_sensitive_data(data: str, visible_chars: int = 4, mask_char: str = "*")
 
 
 def paginate_query_result(data: List[Any], page: int = 1, page_size: int = 20) -> Dict[str, Any]:
-    """分页查询结果"""
+    """分页查询结果（只用于已在内存中的列表，数据库查询使用 app.utils.pagination 的游标分页）"""
     total = len(data)
     start_index = (page - 1) * page_size
     end_index = start_index + page_size
@@ -220,4 +221,17 @@ def paginate_query_result(data: List[Any], page: int = 1, page_size: int = 20) -
         "total_pages": (total + page_size - 1) // page_size,
         "has_next": end_index < total,
         "has_prev": page > 1
-    }
\ No newline at end of file
+    }
+
+
+async def cancel_task(task: asyncio.Task, retry_interval: float = 1.0):
+    """
+    取消后台任务并等待其结束
+    Python 3.11 的 asyncio.wait_for 在被等待的操作恰好完成时会吞掉取消请求（redis-py 收发命令时使用），
+    任务因此继续运行时重复取消
+    """
+    while not task.done():
+        task.cancel()
+        await asyncio.wait({task}, timeout=retry_interval)
+    if not task.cancelled():
+        task.exception()
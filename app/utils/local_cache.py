@@ -0,0 +1,71 @@
+"""
+进程内 LRU 缓存
+带 TTL 过期和命中率统计，用于在 Redis/数据库之前做一层本地缓存
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUTTLCache:
+    """进程内 LRU + TTL 缓存（非线程安全，仅在事件循环线程中使用）"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，不存在或已过期时返回 default"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """设置缓存值，ttl 为 None 时使用默认 TTL，ttl <= 0 表示不过期"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl and ttl > 0 else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> bool:
+        """删除缓存值"""
+        return self._data.pop(key, None) is not None
+
+    def clear(self):
+        """清空缓存"""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and (item[1] is None or item[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
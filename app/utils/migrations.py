@@ -0,0 +1,232 @@
+"""
+数据库迁移
+- 迁移文件位于 app/migrations，按版本号顺序执行，已执行的版本记录在 schema_version 表中
+- 执行前获取迁移锁，多个进程同时启动时只有一个进程执行迁移，其余进程等待后发现已是最新版本：
+  PostgreSQL 使用事务级 advisory lock，SQLite 使用数据库写锁
+- 启动检查只查询一次 schema_version 的最大版本号，与代码中最新的迁移版本比较
+"""
+import asyncio
+import hashlib
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from tortoise import connections
+from tortoise.exceptions import OperationalError
+from tortoise.transactions import in_transaction
+
+from config.settings import settings
+from config.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+VERSION_TABLE = "schema_version"
+VERSION_TABLE_SQL = f"""CREATE TABLE IF NOT EXISTS "{VERSION_TABLE}" (
+    "version" INT NOT NULL PRIMARY KEY,
+    "name" VARCHAR(200) NOT NULL,
+    "checksum" VARCHAR(64) NOT NULL,
+    "applied_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)"""
+
+# PostgreSQL advisory lock 的键（同一数据库中的所有进程使用相同的值）
+MIGRATION_LOCK_ID = 20200001
+SUPPORTED_DIALECTS = ("sqlite", "postgres")
+
+_MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+class MigrationError(Exception):
+    """迁移失败或数据库结构版本落后"""
+
+
+@dataclass
+class Migration:
+    """一个迁移文件"""
+    version: int
+    name: str
+    module: ModuleType
+
+    def statements(self, dialect: str) -> List[str]:
+        sql = getattr(self.module, "SQL", {})
+        if dialect not in sql and not hasattr(self.module, "upgrade"):
+            raise MigrationError(f"迁移 {self.version} 不支持 {dialect} 数据库")
+        return list(sql.get(dialect, []))
+
+    def checksum(self, dialect: str) -> str:
+        """SQL 内容的摘要，用于发现已执行后又被修改的迁移"""
+        return hashlib.sha256("\n;\n".join(self.statements(dialect)).encode()).hexdigest()
+
+    async def apply(self, connection, dialect: str):
+        check = getattr(self.module, "check", None)
+        if check is not None:
+            await check(connection, dialect)
+        for statement in self.statements(dialect):
+            await connection.execute_query(statement)
+        upgrade = getattr(self.module, "upgrade", None)
+        if upgrade is not None:
+            await upgrade(connection, dialect)
+
+
+_migrations: Optional[List[Migration]] = None
+
+
+def load_migrations() -> List[Migration]:
+    """加载迁移文件，按版本号排序"""
+    global _migrations
+    if _migrations is not None:
+        return _migrations
+
+    package = "app.migrations"
+    pkg = importlib.import_module(package)
+    migrations: Dict[int, Migration] = {}
+    for info in pkgutil.iter_modules(pkg.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"迁移版本号重复: {version}")
+        module = importlib.import_module(f"{package}.{info.name}")
+        migrations[version] = Migration(version=version, name=match.group(2), module=module)
+
+    _migrations = [migrations[version] for version in sorted(migrations)]
+    return _migrations
+
+
+def latest_version() -> int:
+    """代码中最新的迁移版本号"""
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def _dialect(client) -> str:
+    return client.capabilities.dialect
+
+
+def _param(dialect: str, index: int) -> str:
+    return "?" if dialect == "sqlite" else f"${index}"
+
+
+async def get_schema_version(connection_name: str = "default") -> int:
+    """数据库当前的结构版本（没有 schema_version 表时为 0）"""
+    client = connections.get(connection_name)
+    try:
+        _, rows = await client.execute_query(f'SELECT MAX("version") FROM "{VERSION_TABLE}"')
+    except OperationalError:
+        return 0
+    return rows[0][0] or 0
+
+
+async def check_schema(connection_name: str = "default") -> int:
+    """启动检查：数据库结构版本落后于代码时抛出 MigrationError，返回当前版本"""
+    current = await get_schema_version(connection_name)
+    latest = latest_version()
+    if current < latest:
+        raise MigrationError(f"数据库结构版本 {current} 落后于代码版本 {latest}，请先执行 ./app migrate")
+    if current > latest:
+        logger.warning(f"数据库结构版本 {current} 高于代码版本 {latest}，可能正在运行旧版本代码")
+    return current
+
+
+async def _try_lock(connection, dialect: str) -> bool:
+    """在当前事务中获取迁移锁，事务结束时释放"""
+    try:
+        if dialect == "postgres":
+            _, rows = await connection.execute_query("SELECT pg_try_advisory_xact_lock($1)", [MIGRATION_LOCK_ID])
+            if not rows[0][0]:
+                return False
+            await connection.execute_query(VERSION_TABLE_SQL)
+        else:
+            # SQLite 的事务在第一条写语句时才获取写锁，空删除即可获取；
+            # 其他进程持有写锁时等待 busy_timeout 后失败
+            await connection.execute_query(VERSION_TABLE_SQL)
+            await connection.execute_query(f'DELETE FROM "{VERSION_TABLE}" WHERE 1 = 0')
+    except OperationalError as e:
+        if dialect == "postgres":
+            raise
+        logger.info(f"等待迁移锁: {e}")
+        return False
+    return True
+
+
+async def _applied(connection) -> Dict[int, str]:
+    _, rows = await connection.execute_query(f'SELECT "version", "checksum" FROM "{VERSION_TABLE}"')
+    return {row[0]: row[1] for row in rows}
+
+
+async def _apply_pending(connection, dialect: str, target: int) -> List[Migration]:
+    applied = await _applied(connection)
+    done = []
+    for migration in load_migrations():
+        if migration.version > target:
+            break
+        if migration.version in applied:
+            if applied[migration.version] != migration.checksum(dialect):
+                logger.warning(f"已执行的迁移 {migration.version}_{migration.name} 内容已被修改")
+            continue
+        logger.info(f"执行迁移 {migration.version}_{migration.name}")
+        await migration.apply(connection, dialect)
+        await connection.execute_query(
+            f'INSERT INTO "{VERSION_TABLE}" ("version", "name", "checksum") '
+            f"VALUES ({_param(dialect, 1)}, {_param(dialect, 2)}, {_param(dialect, 3)})",
+            [migration.version, migration.name, migration.checksum(dialect)],
+        )
+        done.append(migration)
+    return done
+
+
+async def migrate(
+    connection_name: str = "default",
+    target: Optional[int] = None,
+    lock_timeout: Optional[float] = None
+) -> List[Migration]:
+    """
+    执行尚未执行的迁移，返回本次执行的迁移
+    数据库已是最新版本时只查询一次版本号；否则获取迁移锁后在同一事务中执行（PostgreSQL 与 SQLite 的 DDL 均支持事务）
+    """
+    target = latest_version() if target is None else target
+    if await get_schema_version(connection_name) >= target:
+        return []
+
+    client = connections.get(connection_name)
+    dialect = _dialect(client)
+    if dialect not in SUPPORTED_DIALECTS:
+        raise MigrationError(f"不支持的数据库类型: {dialect}")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (settings.DATABASE_MIGRATE_LOCK_TIMEOUT if lock_timeout is None else lock_timeout)
+    while True:
+        async with in_transaction(connection_name) as connection:
+            if await _try_lock(connection, dialect):
+                return await _apply_pending(connection, dialect, target)
+        if loop.time() >= deadline:
+            raise MigrationError("等待迁移锁超时，其他进程可能正在执行迁移")
+        await asyncio.sleep(0.5)
+
+
+async def migration_status(connection_name: str = "default") -> List[Dict[str, Any]]:
+    """各迁移的执行状态"""
+    client = connections.get(connection_name)
+    dialect = _dialect(client)
+    try:
+        _, rows = await client.execute_query(
+            f'SELECT "version", "checksum", "applied_at" FROM "{VERSION_TABLE}"'
+        )
+    except OperationalError:
+        rows = []
+    applied = {row[0]: (row[1], row[2]) for row in rows}
+
+    status = []
+    for migration in load_migrations():
+        checksum, applied_at = applied.get(migration.version, (None, None))
+        status.append({
+            "version": migration.version,
+            "name": migration.name,
+            "applied": checksum is not None,
+            "applied_at": applied_at,
+            "modified": checksum is not None and checksum != migration.checksum(dialect),
+        })
+    return status
@@ -0,0 +1,212 @@
+"""
+游标分页（keyset pagination）
+- 按排序字段（最后一个字段必须唯一，通常为 id）记录上一页最后一行的值，下一页通过 WHERE 条件定位，
+  配合 (排序字段..., id) 复合索引，任意一页的代价都与第一页相同；OFFSET 分页需要扫描并丢弃前面所有行
+- 游标为不透明的 base64 字符串，包含排序方式与取值，与其他排序方式混用时报错
+- 排序字段不能为空值（NULL 无法参与比较）
+
+列表总数（count_total）
+- 精确计数按过滤条件（计数 SQL）缓存 LIST_COUNT_CACHE_TTL 秒，命名空间失效时立即重新计数
+- PostgreSQL 上先读取规划器估算的行数，超过 LIST_COUNT_ESTIMATE_THRESHOLD 时直接返回估算值（total_is_estimate）
+- with_total=false 时不计数
+"""
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+from tortoise import fields
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+
+from config.settings import settings
+from app.utils.redis_client import redis_client
+
+
+class CursorError(ValueError):
+    """分页游标无效"""
+
+
+@dataclass
+class CursorPage:
+    """一页结果"""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def _fields(ordering: Sequence[str]) -> List[Tuple[str, bool]]:
+    """[(字段名, 是否倒序)]"""
+    return [(field.lstrip("-"), field.startswith("-")) for field in ordering]
+
+
+def encode_cursor(ordering: Sequence[str], values: Sequence[Any]) -> str:
+    """生成游标"""
+    payload = {
+        "o": ",".join(ordering),
+        "v": [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, model, ordering: Sequence[str]) -> List[Any]:
+    """解析游标，按模型字段类型还原取值"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+        matched = payload["o"] == ",".join(ordering) and len(values) == len(ordering)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise CursorError("无效的分页游标")
+    if not matched:
+        raise CursorError("分页游标与当前排序方式不一致")
+
+    result = []
+    for (name, _), value in zip(_fields(ordering), values):
+        field = model._meta.fields_map.get(name)
+        try:
+            if isinstance(field, fields.DatetimeField):
+                value = datetime.fromisoformat(value)
+            elif isinstance(field, fields.DateField):
+                value = date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise CursorError("无效的分页游标")
+        result.append(value)
+    return result
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """
+    位于 values 之后的行：(a, b) 按 a DESC, b DESC 排序时为
+    a <= :a AND (a < :a OR (a = :a AND b < :b))，第一个条件让数据库直接按索引范围扫描
+    """
+    columns = _fields(ordering)
+    conditions = []
+    for i, (name, desc) in enumerate(columns):
+        equal = {prev: value for (prev, _), value in zip(columns[:i], values[:i])}
+        conditions.append(Q(**equal, **{f"{name}__{'lt' if desc else 'gt'}": values[i]}))
+    condition = Q(*conditions, join_type=Q.OR)
+    if len(columns) > 1:
+        first, desc = columns[0]
+        condition = Q(**{f"{first}__{'lte' if desc else 'gte'}": values[0]}) & condition
+    return condition
+
+
+async def paginate_cursor(
+    queryset: QuerySet,
+    ordering: Sequence[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    fields: Optional[Sequence[str]] = None
+) -> CursorPage:
+    """
+    游标分页查询（多读取一行判断是否有下一页）
+    offset 只用于兼容旧的 skip 参数，提供 cursor 时忽略
+    fields 不为空时只查询这些列（.values()），items 为字典，排序字段会自动加入
+    """
+    ordering = tuple(ordering)
+    columns = [name for name, _ in _fields(ordering)]
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, queryset.model, ordering)))
+    elif offset:
+        queryset = queryset.offset(offset)
+
+    queryset = queryset.order_by(*ordering).limit(limit + 1)
+    if fields:
+        rows = await queryset.values(*fields, *(name for name in columns if name not in fields))
+    else:
+        rows = await queryset
+    if len(rows) <= limit:
+        return CursorPage(items=list(rows))
+    rows = rows[:limit]
+    last = rows[-1]
+    values = [last[name] for name in columns] if fields else [getattr(last, name) for name in columns]
+    return CursorPage(items=rows, next_cursor=encode_cursor(ordering, values))
+
+
+async def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """PostgreSQL 规划器估算的行数（其他数据库返回 None）"""
+    db = queryset._choose_db()
+    if db.capabilities.dialect != "postgres":
+        return None
+    _, rows = await db.execute_query(f"EXPLAIN (FORMAT JSON) {queryset.sql(params_inline=True)}")
+    plan = rows[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+    queryset: QuerySet,
+    namespace: str,
+    with_total: bool = True
+) -> Tuple[Optional[int], bool]:
+    """列表总数，返回 (总数, 是否为估算值)；with_total 为 False 时返回 (None, False)"""
+    if not with_total:
+        return None, False
+
+    threshold = settings.LIST_COUNT_ESTIMATE_THRESHOLD
+    if threshold > 0:
+        estimate = await estimate_count(queryset)
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+
+    count = queryset.count()
+    if settings.LIST_COUNT_CACHE_TTL <= 0:
+        return await count, False
+
+    async def exact() -> int:
+        return await count
+
+    # 计数 SQL 即过滤条件的签名
+    digest = hashlib.blake2b(count.sql(params_inline=True).encode("utf-8"), digest_size=16).hexdigest()
+    total = await redis_client.cache_tagged(
+        f"count:{digest}", exact, namespace=namespace, expire=settings.LIST_COUNT_CACHE_TTL
+    )
+    return total, False
+
+
+class CursorPagination:
+    """
+    ModelViewSet 的游标分页（pagination_class）
+    查询参数 cursor、page_size；响应体仍为列表，下一页游标放在 X-Next-Cursor 与 Link 响应头中
+    排序由视图的 cursor_ordering 指定，默认按 id
+    """
+    ordering: Tuple[str, ...] = ("id",)
+    page_size = 20
+    max_page_size = 100
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor: Optional[str] = None
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get("page_size", self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    async def paginate_queryset(self, queryset: QuerySet, request, view=None) -> List[Any]:
+        self.request = request
+        page = await paginate_cursor(
+            queryset,
+            getattr(view, "cursor_ordering", self.ordering),
+            self.get_page_size(request),
+            cursor=request.query_params.get("cursor"),
+        )
+        self.next_cursor = page.next_cursor
+        return page.items
+
+    def get_paginated_response(self, data) -> JSONResponse:
+        response = JSONResponse(content=data)
+        if self.next_cursor:
+            next_url = self.request.url.include_query_params(cursor=self.next_cursor)
+            response.headers["X-Next-Cursor"] = self.next_cursor
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
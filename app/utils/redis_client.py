@@ -1,60 +1,651 @@
+import os
 import json
+import math
+import time
+import uuid
+import random
 import asyncio
-from typing import Any, Optional, Dict, List
+import functools
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional, Dict, Iterable, List, Tuple, Union
 import redis.asyncio as redis
+from redis.client import NEVER_DECODE
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.asyncio.connection import parse_url
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
+from redis.backoff import ExponentialBackoff
 from config.settings import settings
+from config.logging import get_logger
+from app.utils.codecs import codec_for_key, decode_value, encode_value, get_codec
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.client_tracking import ClientTrackingCache
+from app.utils.redis_keys import hash_tag, key_slot, same_slot
+
+
+logger = get_logger(__name__)
+
+
+def _log_error(message: str, error: BaseException):
+    """记录 Redis 操作错误（熔断期间的快速失败不记录，避免刷屏）"""
+    if not isinstance(error, CircuitOpenError):
+        logger.error(f"{message}: {error}")
+
+
+def _is_outage(error: BaseException) -> bool:
+    """是否为 Redis 不可用类错误（连接池等待超时属于本地资源不足，不计入）"""
+    if isinstance(error.__cause__, asyncio.TimeoutError):
+        return False
+    return isinstance(error, (redis.ConnectionError, redis.TimeoutError, OSError))
+
+
+class PoolInstrumentation:
+    """连接池统计与熔断检查（与具体连接池类组合使用）"""
+    
+    def __init__(self, *args, breaker: Optional[CircuitBreaker] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+        self.acquire_count = 0
+        self.acquire_errors = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    async def get_connection(self, *args, **kwargs):
+        # 熔断打开时直接失败，不再等待连接/读写超时
+        if self.breaker is not None:
+            self.breaker.before_call()
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except Exception as e:
+            self.acquire_errors += 1
+            if self.breaker is not None and _is_outage(e):
+                self.breaker.record_failure(e)
+                e.breaker_recorded = True
+            raise
+        else:
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return connection
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            self.acquire_count += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        in_use = getattr(self, "_in_use_connections", None)
+        available = getattr(self, "_available_connections", None)
+        return {
+            "pid": os.getpid(),
+            "max_connections": self.max_connections,
+            "in_use": len(in_use) if in_use is not None else None,
+            "idle": len(available) if available is not None else None,
+            "acquire_count": self.acquire_count,
+            "acquire_errors": self.acquire_errors,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquire_count, 3) if self.acquire_count else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class InstrumentedConnectionPool(PoolInstrumentation, redis.BlockingConnectionPool):
+    """
+    带统计的阻塞式连接池
+    连接数达到上限时等待空闲连接（最多 timeout 秒），并记录获取连接的等待时间
+    """
+    pass
+
+
+class InstrumentedSentinelPool(PoolInstrumentation, SentinelConnectionPool, redis.BlockingConnectionPool):
+    """经哨兵发现主节点的阻塞式连接池（主从切换后自动连接新的主节点）"""
+    pass
+
+
+class GuardedRedis(redis.Redis):
+    """命令执行出现连接/超时错误时计入熔断器"""
+    
+    breaker: Optional[CircuitBreaker] = None
+    
+    async def execute_command(self, *args, **options):
+        try:
+            return await super().execute_command(*args, **options)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            if self.breaker is not None and _is_outage(e) and not getattr(e, "breaker_recorded", False):
+                self.breaker.record_failure(e)
+            raise
+
+
+class GuardedRedisCluster(RedisCluster):
+    """集群客户端：每个节点各有连接池，在命令级别检查熔断器"""
+    
+    breaker: Optional[CircuitBreaker] = None
+    
+    async def execute_command(self, *args, **options):
+        if self.breaker is not None:
+            self.breaker.before_call()
+        try:
+            result = await super().execute_command(*args, **options)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            if self.breaker is not None and _is_outage(e):
+                self.breaker.record_failure(e)
+            raise
+        if self.breaker is not None:
+            self.breaker.record_success()
+        return result
+
+
+def parse_nodes(value: str) -> List[Tuple[str, int]]:
+    """解析 "host:port,host:port" 格式的节点列表"""
+    nodes = []
+    for item in value.split(","):
+        item = item.strip()
+        if item:
+            host, _, port = item.rpartition(":")
+            nodes.append((host, int(port)))
+    return nodes
+
+
+def build_pool_kwargs() -> Dict[str, Any]:
+    """根据配置生成连接池参数"""
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_keepalive": settings.REDIS_SOCKET_KEEPALIVE,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+        "retry_on_timeout": settings.REDIS_RETRY_ON_TIMEOUT,
+        "retry": Retry(
+            ExponentialBackoff(cap=settings.REDIS_RETRY_BACKOFF_CAP, base=settings.REDIS_RETRY_BACKOFF_BASE),
+            settings.REDIS_RETRY_ATTEMPTS
+        ),
+    }
+
+
+def _encode(value: Any) -> Any:
+    """编码哈希字段值（dict/list 序列化为 JSON 文本）"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """解码哈希字段值（尝试解析 JSON）"""
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return value
+
+
+class RedisPipeline:
+    """
+    管道命令收集器
+    命令先在本地排队，execute 时一次性发送；读取类命令的结果按 get_value 的规则解码。
+    未封装的命令可直接调用（如 pipe.zadd(...)），结果原样返回。
+    事务模式下 EXEC 的响应整体按文本解码，因此不支持 get_value（请在事务外读取）。
+    集群模式下事务涉及的键必须位于同一槽位（使用相同的 hash_tag）
+    """
+    
+    def __init__(self, client: "RedisClient", transaction: bool = False):
+        self._client = client
+        self._transaction = transaction
+        self._commands: List[Tuple[str, tuple, dict, Optional[Callable]]] = []
+        self.results: List[Any] = []
+    
+    def __len__(self) -> int:
+        return len(self._commands)
+    
+    def _queue(self, command: str, *args, decoder: Optional[Callable] = None, **kwargs) -> "RedisPipeline":
+        self._commands.append((command, args, kwargs, decoder))
+        return self
+    
+    def __getattr__(self, command: str):
+        if command.startswith("_"):
+            raise AttributeError(command)
+        return lambda *args, **kwargs: self._queue(command, *args, **kwargs)
+    
+    def set_value(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None,
+        codec: Optional[str] = None
+    ) -> "RedisPipeline":
+        return self._queue("set", key, self._client.pack(key, value, codec), ex=expire or None)
+    
+    def get_value(self, key: str) -> "RedisPipeline":
+        if self._transaction:
+            raise ValueError("事务管道不支持 get_value")
+        return self._queue("execute_command", "GET", key, decoder=decode_value, **{NEVER_DECODE: True})
+    
+    def delete_key(self, key: str) -> "RedisPipeline":
+        return self._queue("delete", key, decoder=bool)
+    
+    def expire_key(self, key: str, seconds: int) -> "RedisPipeline":
+        return self._queue("expire", key, seconds, decoder=bool)
+    
+    def incr(self, key: str, amount: int = 1) -> "RedisPipeline":
+        return self._queue("incrby", key, amount)
+    
+    def hset(self, key: str, field: str, value: Any) -> "RedisPipeline":
+        return self._queue("hset", key, field, _encode(value))
+    
+    def hget(self, key: str, field: str) -> "RedisPipeline":
+        return self._queue("hget", key, field, decoder=_decode)
+    
+    async def execute(self) -> List[Any]:
+        """发送所有排队的命令，返回解码后的结果列表（失败时对应位置为 None）"""
+        commands, self._commands = self._commands, []
+        if not commands:
+            self.results = []
+            return self.results
+        
+        try:
+            async with self._client.redis.pipeline(transaction=self._transaction) as pipe:
+                for command, args, kwargs, _ in commands:
+                    getattr(pipe, command)(*args, **kwargs)
+                raw_results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            _log_error("Redis管道执行失败", e)
+            self.results = [None] * len(commands)
+            return self.results
+        
+        self._client._evict_local(*(args[0] for command, args, _, _ in commands if command in ("set", "delete")))
+        
+        results = []
+        for (command, _, _, decoder), value in zip(commands, raw_results):
+            if isinstance(value, Exception):
+                _log_error(f"Redis管道命令 {command} 失败", value)
+                results.append(None)
+                continue
+            try:
+                results.append(decoder(value) if decoder else value)
+            except Exception as e:
+                _log_error("Redis管道结果解码失败", e)
+                results.append(None)
+        self.results = results
+        return results
+
+
+class GetBatcher:
+    """
+    get_value 自动合并器（类似 DataLoader）
+    同一事件循环轮次内发起的 get_value 调用合并为一条 MGET
+    """
+    
+    def __init__(self, client: "RedisClient", max_batch_size: int = 500):
+        self._client = client
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._scheduled = False
+        self.requested = 0
+        self.batches = 0
+        self.keys = 0
+    
+    def load(self, key: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        self.requested += 1
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+    
+    def _dispatch(self):
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        for i in range(0, len(items), self.max_batch_size):
+            asyncio.ensure_future(self._flush(dict(items[i:i + self.max_batch_size])))
+    
+    async def _flush(self, batch: Dict[str, List[asyncio.Future]]):
+        self.batches += 1
+        self.keys += len(batch)
+        values = await self._client.get_many(list(batch))
+        for key, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(values.get(key))
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "requested": self.requested,
+            "batches": self.batches,
+            "keys": self.keys,
+        }
 
 
 class RedisClient:
     """Redis客户端工具类"""
     
     def __init__(self):
-        self.redis: Optional[redis.Redis] = None
+        self.redis: Optional[Union[redis.Redis, RedisCluster]] = None
+        self.pool: Optional[PoolInstrumentation] = None
+        self.mode = settings.REDIS_MODE
+        self._url: Optional[str] = None
+        self._sentinel: Optional[Sentinel] = None
+        # 集群模式下订阅使用的单节点客户端，首次订阅时创建，断开连接时关闭
+        self._pubsub_client: Optional[redis.Redis] = None
+        self.breaker = CircuitBreaker("redis")
+        self.tracking: Optional[ClientTrackingCache] = None
+        self._scripts: Dict[str, Any] = {}
+        self.batcher: Optional[GetBatcher] = GetBatcher(self) if settings.REDIS_AUTO_BATCH else None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.cache_stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "early_refreshes": 0,
+            "computes": 0,
+            "coalesced": 0,
+            "lock_waits": 0,
+        }
         
-    async def connect(self):
-        """连接Redis"""
+    async def connect(self, url: Optional[str] = None, mode: Optional[str] = None):
+        """
+        连接Redis（按 REDIS_MODE 连接单节点、哨兵或集群）
+        连接失败时保留客户端并打开熔断器：调用快速失败（降级模式），
+        恢复超时后自动探测，Redis 恢复即退出降级模式
+        """
+        url = url or settings.REDIS_URL
+        self.mode = mode or settings.REDIS_MODE
+        self._url = url
+        if self.mode == "standalone":
+            self.pool = InstrumentedConnectionPool.from_url(
+                url,
+                decode_responses=True,
+                breaker=self.breaker,
+                **build_pool_kwargs()
+            )
+            self.redis = GuardedRedis(connection_pool=self.pool)
+        elif self.mode == "sentinel":
+            self.redis = self._master_for_sentinel(url)
+            self.pool = self.redis.connection_pool
+        elif self.mode == "cluster":
+            self.redis = self._cluster_client(url)
+            self.pool = None
+        else:
+            raise ValueError(f"未知的 REDIS_MODE: {self.mode}")
+        self.redis.breaker = self.breaker
+        self._scripts.clear()
+        self.breaker.reset()
         try:
-            self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
             await self.redis.ping()
-            print("Redis连接成功")
+            logger.info("Redis连接成功")
         except Exception as e:
-            print(f"Redis连接失败: {e}")
+            self.breaker.force_open(e)
+            logger.error(f"Redis连接失败: {e}")
             raise
+        
+        if settings.REDIS_CLIENT_TRACKING:
+            await self.enable_client_tracking(url)
+    
+    def _master_for_sentinel(self, url: str) -> GuardedRedis:
+        """经哨兵连接主节点（REDIS_URL 只提供用户名、密码与数据库编号）"""
+        params = parse_url(url)
+        pool_kwargs = build_pool_kwargs()
+        sentinel_kwargs = {key: value for key, value in pool_kwargs.items() if key.startswith("socket_")}
+        if settings.REDIS_SENTINEL_PASSWORD:
+            sentinel_kwargs["password"] = settings.REDIS_SENTINEL_PASSWORD
+        self._sentinel = Sentinel(parse_nodes(settings.REDIS_SENTINELS), sentinel_kwargs=sentinel_kwargs)
+        return self._sentinel.master_for(
+            settings.REDIS_SENTINEL_MASTER,
+            redis_class=GuardedRedis,
+            connection_pool_class=InstrumentedSentinelPool,
+            decode_responses=True,
+            breaker=self.breaker,
+            **{key: params[key] for key in ("username", "password", "db") if key in params},
+            **pool_kwargs
+        )
+    
+    def _cluster_client(self, url: str) -> GuardedRedisCluster:
+        """连接集群（每个节点一个连接池，max_connections 为单个节点的上限）"""
+        pool_kwargs = build_pool_kwargs()
+        # 集群节点连接池不支持等待空闲连接
+        pool_kwargs.pop("timeout")
+        pool_kwargs.pop("retry_on_timeout")
+        return GuardedRedisCluster.from_url(
+            url,
+            decode_responses=True,
+            startup_nodes=[ClusterNode(host, port) for host, port in parse_nodes(settings.REDIS_CLUSTER_NODES)],
+            **pool_kwargs
+        )
+    
+    async def enable_client_tracking(self, url: Optional[str] = None, **options) -> bool:
+        """
+        开启服务端辅助的客户端缓存，服务端不支持时保持普通读取并返回 False
+        失效重定向要求读取连接与失效连接在同一个节点上，因此只支持单节点模式
+        """
+        await self.disable_client_tracking()
+        if self.mode != "standalone":
+            logger.warning(f"客户端缓存不支持 {self.mode} 模式，使用普通读取")
+            return False
+        tracking = ClientTrackingCache(**options)
+        started = await tracking.start(
+            url or settings.REDIS_URL,
+            {**build_pool_kwargs(), "breaker": self.breaker},
+            pool_class=InstrumentedConnectionPool
+        )
+        self.tracking = tracking if started else None
+        return started
+    
+    async def disable_client_tracking(self):
+        """关闭客户端缓存"""
+        if self.tracking is not None:
+            await self.tracking.stop()
+            self.tracking = None
+    
+    def _evict_local(self, *keys: str):
+        if self.tracking is not None:
+            self.tracking.evict(*keys)
+    
+    @property
+    def degraded(self) -> bool:
+        """是否处于降级模式（未连接或熔断器未关闭）"""
+        return self.redis is None or self.breaker.state != CircuitBreaker.CLOSED
+    
+    def get_health(self) -> Dict[str, Any]:
+        """获取健康状态（供 /health 使用）"""
+        return {
+            "mode": self.mode,
+            "connected": self.redis is not None,
+            "degraded": self.degraded,
+            "circuit": self.breaker.get_stats(),
+        }
+    
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """预热连接池：并发执行 PING，提前建立指定数量的连接"""
+        connections = settings.REDIS_POOL_WARMUP if connections is None else connections
+        connections = min(connections, settings.REDIS_MAX_CONNECTIONS)
+        if not self.redis or connections <= 0:
+            return 0
+        results = await asyncio.gather(
+            *(self.redis.ping() for _ in range(connections)),
+            return_exceptions=True
+        )
+        return sum(1 for r in results if r is True)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        if self.redis is None:
+            return {"connected": False}
+        if self.pool is not None:
+            stats = {"connected": True, "mode": self.mode, **self.pool.get_stats()}
+        else:
+            # 集群模式：每个节点各自的连接池
+            stats = {
+                "connected": True,
+                "mode": self.mode,
+                "pid": os.getpid(),
+                "nodes": [node.name for node in self.redis.get_nodes()],
+            }
+        if self.batcher is not None:
+            stats["auto_batch"] = self.batcher.get_stats()
+        if self.tracking is not None:
+            stats["client_tracking"] = self.tracking.get_stats()
+        return stats
     
     async def disconnect(self):
         """断开Redis连接"""
+        await self.disable_client_tracking()
+        if self._pubsub_client is not None:
+            await self._pubsub_client.aclose()
+            self._pubsub_client = None
         if self.redis:
-            await self.redis.close()
-            print("Redis连接已断开")
+            await self.redis.aclose()
+            if self.pool is not None:
+                await self.pool.disconnect()
+            if self._sentinel is not None:
+                for sentinel in self._sentinel.sentinels:
+                    await sentinel.aclose()
+                self._sentinel = None
+            self.redis = None
+            self.pool = None
+            logger.info("Redis连接已断开")
+    
+    def pack(self, key: str, value: Any, codec: Optional[str] = None) -> bytes:
+        """按调用指定或键命名空间配置的编解码器编码值"""
+        return encode_value(value, get_codec(codec) if codec else codec_for_key(key))
     
-    async def set_value(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
-        """设置键值对"""
+    async def set_value(self, key: str, value: Any, expire: Optional[int] = None, codec: Optional[str] = None) -> bool:
+        """设置键值对（codec 为空时按键命名空间选择编解码器）"""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
+            value = self.pack(key, value, codec)
             
             if expire:
                 return await self.redis.setex(key, expire, value)
             else:
                 return await self.redis.set(key, value)
         except Exception as e:
-            print(f"设置Redis键值失败: {e}")
+            _log_error("设置Redis键值失败", e)
             return False
+        finally:
+            self._evict_local(key)
     
     async def get_value(self, key: str) -> Optional[Any]:
-        """获取值"""
-        try:
-            value = await self.redis.get(key)
-            if value is None:
-                return None
-                
-            # 尝试解析JSON
+        """
+        获取值
+        开启客户端缓存时优先读取本地副本；开启自动合并时，同一轮次的调用合并为一条 MGET
+        """
+        if self.tracking is not None and self.tracking.active and self.tracking.accepts(key):
             try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+                return decode_value(await self.tracking.get(key))
+            except Exception as e:
+                _log_error("获取Redis值失败", e)
+                return None
+        if self.batcher is not None:
+            return await self.batcher.load(key)
+        try:
+            return decode_value(await self.redis.execute_command("GET", key, **{NEVER_DECODE: True}))
+        except Exception as e:
+            _log_error("获取Redis值失败", e)
+            return None
+    
+    def enable_auto_batching(self, enabled: bool = True, max_batch_size: int = 500):
+        """开启/关闭 get_value 自动合并"""
+        self.batcher = GetBatcher(self, max_batch_size=max_batch_size) if enabled else None
+    
+    # 批量操作
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """批量获取（一次 MGET），返回存在的键及其值"""
+        if not keys:
+            return {}
+        try:
+            values = await self._mget(keys)
+            return {key: decode_value(value) for key, value in zip(keys, values) if value is not None}
         except Exception as e:
-            print(f"获取Redis值失败: {e}")
+            _log_error("批量获取Redis值失败", e)
+            return {}
+    
+    async def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """MGET（原始字节）；集群模式下按槽位拆分后并发执行"""
+        if self.mode != "cluster" or same_slot(keys):
+            return await self.redis.execute_command("MGET", *keys, **{NEVER_DECODE: True})
+        groups: Dict[int, List[str]] = {}
+        for key in keys:
+            groups.setdefault(key_slot(key), []).append(key)
+        results = await asyncio.gather(*(
+            self.redis.execute_command("MGET", *group, **{NEVER_DECODE: True}) for group in groups.values()
+        ))
+        values: Dict[str, Optional[bytes]] = {}
+        for group, raw in zip(groups.values(), results):
+            values.update(zip(group, raw))
+        return [values[key] for key in keys]
+    
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        expire: Union[int, Dict[str, int], None] = None,
+        codec: Optional[str] = None
+    ) -> bool:
+        """
+        批量设置（一次往返）
+        expire 可以是统一的过期秒数，也可以是按键指定的过期秒数字典（未列出的键不过期）
+        """
+        if not mapping:
+            return True
+        try:
+            if not expire:
+                packed = {key: self.pack(key, value, codec) for key, value in mapping.items()}
+                if self.mode == "cluster":
+                    # 集群中 MSET 的键必须位于同一槽位，按槽位拆分执行（非原子）
+                    return all(await self.redis.mset_nonatomic(packed))
+                return bool(await self.redis.mset(packed))
+            
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    ttl = expire.get(key) if isinstance(expire, dict) else expire
+                    pipe.set(key, self.pack(key, value, codec), ex=ttl or None)
+                results = await pipe.execute()
+            return all(results)
+        except Exception as e:
+            _log_error("批量设置Redis值失败", e)
+            return False
+        finally:
+            self._evict_local(*mapping)
+    
+    async def delete_many(self, keys: List[str]) -> int:
+        """批量删除"""
+        if not keys:
+            return 0
+        try:
+            return await self.redis.delete(*keys)
+        except Exception as e:
+            _log_error("批量删除Redis键失败", e)
+            return 0
+        finally:
+            self._evict_local(*keys)
+    
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False):
+        """
+        管道上下文（退出时一次性发送排队的命令）
+        
+        async with redis_client.pipeline() as pipe:
+            pipe.set_value("a", {"x": 1}, expire=60)
+            pipe.get_value("b")
+        print(pipe.results)
+        """
+        pipe = RedisPipeline(self, transaction=transaction)
+        yield pipe
+        if len(pipe):
+            await pipe.execute()
+    
+    async def transaction(self, func: Callable, *watch_keys: str) -> Optional[Any]:
+        """
+        乐观锁事务（WATCH/MULTI/EXEC，被监视的键变化时自动重试）
+        func 接收 redis-py 管道（原始命令，不经过编解码）：先读取被监视的键，
+        再调用 pipe.multi() 排队写命令，返回值作为事务结果
+        """
+        try:
+            return await self.redis.transaction(func, *watch_keys, value_from_callable=True)
+        except Exception as e:
+            _log_error("Redis事务执行失败", e)
             return None
     
     async def delete_key(self, key: str) -> bool:
@@ -62,15 +653,17 @@ class RedisClient:
         try:
             return bool(await self.redis.delete(key))
         except Exception as e:
-            print(f"删除Redis键失败: {e}")
+            _log_error("删除Redis键失败", e)
             return False
+        finally:
+            self._evict_local(key)
     
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
         try:
             return bool(await self.redis.exists(key))
         except Exception as e:
-            print(f"检查Redis键存在性失败: {e}")
+            _log_error("检查Redis键存在性失败", e)
             return False
     
     async def expire_key(self, key: str, seconds: int) -> bool:
@@ -78,15 +671,23 @@ class RedisClient:
         try:
             return bool(await self.redis.expire(key, seconds))
         except Exception as e:
-            print(f"设置Redis键过期时间失败: {e}")
+            _log_error("设置Redis键过期时间失败", e)
             return False
     
+    async def incr(self, key: str, amount: int = 1) -> Optional[int]:
+        """自增计数器"""
+        try:
+            return await self.redis.incrby(key, amount)
+        except Exception as e:
+            _log_error("Redis INCR操作失败", e)
+            return None
+    
     async def get_ttl(self, key: str) -> int:
         """获取键的剩余过期时间"""
         try:
             return await self.redis.ttl(key)
         except Exception as e:
-            print(f"获取Redis键TTL失败: {e}")
+            _log_error("获取Redis键TTL失败", e)
             return -1
     
     # 列表操作
@@ -95,7 +696,7 @@ class RedisClient:
         try:
             return await self.redis.lpush(key, *values)
         except Exception as e:
-            print(f"Redis LPUSH操作失败: {e}")
+            _log_error("Redis LPUSH操作失败", e)
             return 0
     
     async def rpush(self, key: str, *values) -> int:
@@ -103,7 +704,7 @@ class RedisClient:
         try:
             return await self.redis.rpush(key, *values)
         except Exception as e:
-            print(f"Redis RPUSH操作失败: {e}")
+            _log_error("Redis RPUSH操作失败", e)
             return 0
     
     async def lpop(self, key: str) -> Optional[str]:
@@ -111,7 +712,7 @@ class RedisClient:
         try:
             return await self.redis.lpop(key)
         except Exception as e:
-            print(f"Redis LPOP操作失败: {e}")
+            _log_error("Redis LPOP操作失败", e)
             return None
     
     async def rpop(self, key: str) -> Optional[str]:
@@ -119,7 +720,7 @@ class RedisClient:
         try:
             return await self.redis.rpop(key)
         except Exception as e:
-            print(f"Redis RPOP操作失败: {e}")
+            _log_error("Redis RPOP操作失败", e)
             return None
     
     async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[str]:
@@ -127,7 +728,7 @@ class RedisClient:
         try:
             return await self.redis.lrange(key, start, end)
         except Exception as e:
-            print(f"Redis LRANGE操作失败: {e}")
+            _log_error("Redis LRANGE操作失败", e)
             return []
     
     # 集合操作
@@ -136,7 +737,7 @@ class RedisClient:
         try:
             return await self.redis.sadd(key, *values)
         except Exception as e:
-            print(f"Redis SADD操作失败: {e}")
+            _log_error("Redis SADD操作失败", e)
             return 0
     
     async def srem(self, key: str, *values) -> int:
@@ -144,7 +745,7 @@ class RedisClient:
         try:
             return await self.redis.srem(key, *values)
         except Exception as e:
-            print(f"Redis SREM操作失败: {e}")
+            _log_error("Redis SREM操作失败", e)
             return 0
     
     async def smembers(self, key: str) -> set:
@@ -152,7 +753,7 @@ class RedisClient:
         try:
             return await self.redis.smembers(key)
         except Exception as e:
-            print(f"Redis SMEMBERS操作失败: {e}")
+            _log_error("Redis SMEMBERS操作失败", e)
             return set()
     
     async def sismember(self, key: str, value: str) -> bool:
@@ -160,33 +761,24 @@ class RedisClient:
         try:
             return bool(await self.redis.sismember(key, value))
         except Exception as e:
-            print(f"Redis SISMEMBER操作失败: {e}")
+            _log_error("Redis SISMEMBER操作失败", e)
             return False
     
     # 哈希操作
     async def hset(self, key: str, field: str, value: Any) -> int:
         """设置哈希字段值"""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
-            return await self.redis.hset(key, field, value)
+            return await self.redis.hset(key, field, _encode(value))
         except Exception as e:
-            print(f"Redis HSET操作失败: {e}")
+            _log_error("Redis HSET操作失败", e)
             return 0
     
     async def hget(self, key: str, field: str) -> Optional[Any]:
         """获取哈希字段值"""
         try:
-            value = await self.redis.hget(key, field)
-            if value is None:
-                return None
-            
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return _decode(await self.redis.hget(key, field))
         except Exception as e:
-            print(f"Redis HGET操作失败: {e}")
+            _log_error("Redis HGET操作失败", e)
             return None
     
     async def hdel(self, key: str, *fields) -> int:
@@ -194,7 +786,7 @@ class RedisClient:
         try:
             return await self.redis.hdel(key, *fields)
         except Exception as e:
-            print(f"Redis HDEL操作失败: {e}")
+            _log_error("Redis HDEL操作失败", e)
             return 0
     
     async def hgetall(self, key: str) -> Dict[str, Any]:
@@ -202,44 +794,368 @@ class RedisClient:
         try:
             result = await self.redis.hgetall(key)
             # 尝试解析JSON值
-            parsed_result = {}
-            for field, value in result.items():
-                try:
-                    parsed_result[field] = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    parsed_result[field] = value
-            return parsed_result
-        except Exception as e:
-            print(f"Redis HGETALL操作失败: {e}")
+            return {field: _decode(value) for field, value in result.items()}
+        except Exception as e:
+            _log_error("Redis HGETALL操作失败", e)
             return {}
     
-    # 缓存装饰器相关方法
-    async def cache_get_or_set(self, key: str, func, *args, expire: int = 3600, **kwargs) -> Any:
-        """获取缓存或设置缓存"""
+    # 发布/订阅
+    def pubsub(self, **kwargs):
+        """
+        创建订阅对象
+        集群中发布的消息会广播到所有节点，订阅时连接任一节点即可
+        """
+        if self.mode != "cluster":
+            return self.redis.pubsub(**kwargs)
+        if self._pubsub_client is None:
+            node = self.redis.get_random_node()
+            params = parse_url(self._url)
+            self._pubsub_client = redis.Redis(
+                host=node.host,
+                port=node.port,
+                username=params.get("username"),
+                password=params.get("password"),
+                decode_responses=True,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE
+            )
+        return self._pubsub_client.pubsub(**kwargs)
+    
+    async def publish(self, channel: str, message: str) -> int:
+        """发布消息，返回收到消息的订阅者数量（集群模式下只统计接收节点上的订阅者）"""
+        return await self.redis.execute_command("PUBLISH", channel, message)
+    
+    # Lua 脚本
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Optional[Any]:
+        """执行 Lua 脚本（首次使用时注册，之后通过 EVALSHA 执行），失败时返回 None"""
         try:
-            # 先尝试从缓存获取
-            cached_value = await self.get_value(key)
-            if cached_value is not None:
-                return cached_value
-            
-            # 如果缓存不存在，执行函数获取值
-            if asyncio.iscoroutinefunction(func):
-                value = await func(*args, **kwargs)
-            else:
-                value = func(*args, **kwargs)
+            registered = self._scripts.get(script)
+            if registered is None:
+                registered = self.redis.register_script(script)
+                self._scripts[script] = registered
+            return await registered(keys=keys, args=args)
+        except Exception as e:
+            _log_error("Redis脚本执行失败", e)
+            return None
+    
+    # 读穿透缓存
+    async def _call(self, func, *args, **kwargs) -> Any:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return func(*args, **kwargs)
+    
+    def _single_flight(self, key: str, factory: Callable) -> asyncio.Future:
+        """同一进程内同一个键同时只执行一次 factory，其余调用等待同一个结果"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.cache_stats["coalesced"] += 1
+            return future
+        
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        
+        def done(f):
+            if self._inflight.get(key) is f:
+                del self._inflight[key]
+            if not f.cancelled() and f.exception() is not None:
+                logger.error(f"缓存计算失败 {key}: {f.exception()}")
+        
+        future.add_done_callback(done)
+        return future
+    
+    async def _acquire_lock(self, lock_key: str, token: str, timeout: float) -> bool:
+        try:
+            return bool(await self.redis.set(lock_key, token, nx=True, px=int(timeout * 1000)))
+        except Exception as e:
+            _log_error("获取Redis锁失败", e)
+            # Redis 不可用时不阻塞计算
+            return True
+    
+    async def _release_lock(self, lock_key: str, token: str):
+        await self.run_script(RELEASE_LOCK_SCRIPT, keys=[lock_key], args=[token])
+    
+    async def _compute_and_store(
+        self,
+        key: str,
+        func,
+        args: tuple,
+        kwargs: dict,
+        expire: int,
+        stale_ttl: int,
+        negative_ttl: int,
+        lock: bool,
+        lock_timeout: float
+    ) -> Any:
+        """计算并写入缓存（可选地持有分布式锁，锁被占用时等待其他进程写入的结果）"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        locked = False
+        if lock:
+            locked = await self._acquire_lock(lock_key, token, lock_timeout)
+            if not locked:
+                self.cache_stats["lock_waits"] += 1
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    entry = _unwrap_entry(await self.get_value(key))
+                    if entry is not None and entry[1] > time.time():
+                        return entry[0]
+                # 等待超时，自行计算
+        
+        try:
+            start = time.time()
+            value = await self._call(func, *args, **kwargs)
+            self.cache_stats["computes"] += 1
+            delta = time.time() - start
             
-            # 设置缓存
-            await self.set_value(key, value, expire)
+            if value is None and not negative_ttl:
+                return None
+            ttl = negative_ttl if value is None else expire
+            entry = {ENTRY_VALUE: value, ENTRY_EXPIRES: time.time() + ttl, ENTRY_DELTA: round(delta, 6)}
+            physical_ttl = ttl if value is None else ttl + stale_ttl
+            await self.set_value(key, entry, math.ceil(physical_ttl))
             return value
-            
+        finally:
+            if locked:
+                await self._release_lock(lock_key, token)
+    
+    async def cache_get_or_set(
+        self,
+        key: str,
+        func,
+        *args,
+        expire: int = 3600,
+        stale_ttl: int = 0,
+        negative_ttl: int = 0,
+        lock: bool = False,
+        lock_timeout: float = 10.0,
+        beta: float = 1.0,
+        **kwargs
+    ) -> Any:
+        """
+        获取缓存或设置缓存（防击穿的读穿透缓存）
+        
+        - 同一进程内并发未命中时只执行一次 func（single-flight）
+        - lock=True 时使用 Redis SET NX 锁，多个进程中只有一个执行 func，其余等待其结果
+        - 临近过期时按 XFetch 算法概率性地提前在后台刷新（beta 越大越早，0 表示关闭）
+        - stale_ttl > 0 时，过期后的 stale_ttl 秒内先返回旧值并在后台刷新
+        - negative_ttl > 0 时缓存 func 返回的 None
+        - func 抛出的异常会直接抛给调用方；Redis 出错时不会重复执行 func
+        - expire、stale_ttl 等为本方法的参数，不会传给 func
+        """
+        options = dict(
+            expire=expire,
+            stale_ttl=stale_ttl,
+            negative_ttl=negative_ttl,
+            lock=lock,
+            lock_timeout=lock_timeout
+        )
+        
+        def compute():
+            return self._compute_and_store(key, func, args, kwargs, **options)
+        
+        entry = _unwrap_entry(await self.get_value(key))
+        if entry is not None:
+            value, expires_at, delta = entry
+            now = time.time()
+            if now < expires_at:
+                self.cache_stats["hits"] += 1
+                # XFetch：剩余时间越短、计算越慢，越可能提前刷新
+                if beta > 0 and delta > 0 and now - delta * beta * math.log(random.random()) >= expires_at:
+                    if key not in self._inflight:
+                        self.cache_stats["early_refreshes"] += 1
+                        self._single_flight(key, compute)
+                return value
+            if stale_ttl > 0:
+                self.cache_stats["stale_served"] += 1
+                self._single_flight(key, compute)
+                return value
+        
+        self.cache_stats["misses"] += 1
+        return await asyncio.shield(self._single_flight(key, compute))
+    
+    # 标签与命名空间失效
+    # 每个标签（命名空间视为名为 ns:<namespace> 的标签）对应一个版本计数器，缓存项写入时记录各标签的版本；
+    # 读取时在同一个管道中取回缓存项与当前版本，版本不一致即视为未命中。
+    # 失效只需 INCR 版本计数器，与依赖该标签的键数量无关（旧缓存项在过期后由 Redis 回收）。
+    # 版本计数器共用一个哈希标签，集群中也位于同一槽位：读取是一条 MGET，失效是一个 MULTI/EXEC 事务
+    @staticmethod
+    def tag_version_key(tag: str) -> str:
+        return f"{TAG_VERSION_PREFIX}{tag}"
+    
+    @staticmethod
+    def _tag_list(tags: Iterable[str], namespace: Optional[str]) -> List[str]:
+        tags = set(tags)
+        if namespace:
+            tags.add(f"ns:{namespace}")
+        return sorted(tags)
+    
+    @staticmethod
+    def _tagged_key(key: str, namespace: Optional[str]) -> str:
+        return f"{namespace}:{key}" if namespace else key
+    
+    async def get_tag_versions(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """获取标签当前版本（一次往返），失败时返回 None"""
+        tags = list(tags)
+        if not tags:
+            return {}
+        try:
+            values = await self.redis.mget([self.tag_version_key(tag) for tag in tags])
+            return {tag: int(value or 0) for tag, value in zip(tags, values)}
         except Exception as e:
-            print(f"缓存操作失败: {e}")
-            # 如果缓存操作失败，直接返回函数结果
-            if asyncio.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
+            _log_error("获取缓存标签版本失败", e)
+            return None
+    
+    async def lookup_tagged(
+        self,
+        key: str,
+        tags: Iterable[str],
+        namespace: Optional[str]
+    ) -> Tuple[bool, Any, Optional[Dict[str, int]]]:
+        """读取标签缓存项，返回 (是否命中, 值, 当前标签版本)"""
+        tags = self._tag_list(tags, namespace)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.execute_command("GET", self._tagged_key(key, namespace), **{NEVER_DECODE: True})
+                pipe.execute_command("MGET", *(self.tag_version_key(tag) for tag in tags))
+                raw, values = await pipe.execute()
+            versions = {tag: int(value or 0) for tag, value in zip(tags, values)}
+            entry = decode_value(raw)
+        except Exception as e:
+            _log_error("获取Redis标签缓存失败", e)
+            return False, None, None
+        
+        if isinstance(entry, dict) and TAGGED_VERSIONS in entry and entry[TAGGED_VERSIONS] == versions:
+            return True, entry.get(TAGGED_VALUE), versions
+        return False, None, versions
+    
+    async def get_tagged(self, key: str, tags: Iterable[str] = (), namespace: Optional[str] = None) -> Optional[Any]:
+        """读取标签缓存（一次往返），任一标签或命名空间已失效时返回 None"""
+        _, value, _ = await self.lookup_tagged(key, tags, namespace)
+        return value
+    
+    async def set_tagged(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        namespace: Optional[str] = None,
+        expire: Optional[int] = 3600,
+        versions: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        写入标签缓存
+        versions 为计算值之前读取的标签版本（如 lookup_tagged 返回的版本），
+        这样计算期间发生的失效会使本次写入的缓存项直接失效
+        """
+        if versions is None:
+            versions = await self.get_tag_versions(self._tag_list(tags, namespace))
+            if versions is None:
+                return False
+        entry = {TAGGED_VALUE: value, TAGGED_VERSIONS: versions}
+        return await self.set_value(self._tagged_key(key, namespace), entry, expire)
+    
+    async def invalidate_tags(self, *tags: str) -> bool:
+        """使带有任一指定标签的缓存项全部失效（每个标签一次 INCR，在一个事务中一次往返完成）"""
+        if not tags:
+            return True
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for tag in tags:
+                    pipe.incr(self.tag_version_key(tag))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            _log_error("Redis标签失效失败", e)
+            return False
+    
+    async def invalidate_namespace(self, namespace: str) -> bool:
+        """使命名空间下的缓存项全部失效"""
+        return await self.invalidate_tags(f"ns:{namespace}")
+    
+    async def cache_tagged(
+        self,
+        key: str,
+        func,
+        *args,
+        tags: Iterable[str] = (),
+        namespace: Optional[str] = None,
+        expire: int = 3600,
+        **kwargs
+    ) -> Any:
+        """标签缓存的读穿透（未连接 Redis 时直接执行 func）"""
+        if self.redis is None:
+            return await self._call(func, *args, **kwargs)
+        
+        hit, value, versions = await self.lookup_tagged(key, tags, namespace)
+        if hit:
+            self.cache_stats["hits"] += 1
+            return value
+        
+        self.cache_stats["misses"] += 1
+        value = await self._call(func, *args, **kwargs)
+        if versions is not None and value is not None:
+            await self.set_tagged(key, value, tags, namespace, expire=expire, versions=versions)
+        return value
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """获取读穿透缓存统计信息"""
+        return dict(self.cache_stats)
+
+
+ENTRY_VALUE = "__v"
+ENTRY_EXPIRES = "__exp"
+ENTRY_DELTA = "__delta"
+
+TAG_VERSION_PREFIX = f"cache:{hash_tag('tagver')}:"
+TAGGED_VALUE = "__v"
+# 版本计数器的键布局变化后旧版本号不再可比，使用新的字段名让旧缓存项全部视为未命中
+TAGGED_VERSIONS = "__tagv"
+
+# 仅当锁仍由自己持有时才删除
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _unwrap_entry(entry: Any) -> Optional[Tuple[Any, float, float]]:
+    """解析 cache_get_or_set 写入的缓存项，返回 (值, 逻辑过期时间, 计算耗时)；旧格式的值视为未过期"""
+    if entry is None:
+        return None
+    if isinstance(entry, dict) and ENTRY_EXPIRES in entry:
+        return entry.get(ENTRY_VALUE), entry[ENTRY_EXPIRES], entry.get(ENTRY_DELTA, 0)
+    return entry, float("inf"), 0
 
 
 # 全局Redis客户端实例
-redis_client = RedisClient()
\ No newline at end of file
+redis_client = RedisClient()
+
+
+def cached(key: Union[str, Callable[..., str]], expire: int = 3600, **options):
+    """
+    读穿透缓存装饰器（用于异步服务函数）
+    key 可以是格式化模板（按参数名填充，如 "user:{user_id}"）或根据参数生成键的函数，
+    其余参数同 RedisClient.cache_get_or_set
+    
+    @cached("stats:user:{user_id}", expire=300, stale_ttl=60)
+    async def get_user_stats(user_id: int): ...
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if callable(key):
+                cache_key = key(*args, **kwargs)
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                cache_key = key.format(**bound.arguments)
+            return await redis_client.cache_get_or_set(cache_key, func, *args, expire=expire, **options, **kwargs)
+        
+        wrapper.cache_key = key
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+"""
+Redis 键布局（集群哈希标签）
+集群按键名的 CRC16 分配槽位，键名包含 {...} 时只对花括号内的部分计算槽位。
+需要在同一条命令、事务或 Lua 脚本中访问的多个键应使用相同的哈希标签，保证落在同一个槽位；
+单节点与哨兵模式下哈希标签只是键名的一部分，没有额外开销
+"""
+from typing import Iterable, Union
+
+from redis.crc import key_slot as _key_slot
+
+
+def hash_tag(value: Union[str, int]) -> str:
+    """生成哈希标签，如 hash_tag("user:1") -> "{user:1}" """
+    return "{" + str(value) + "}"
+
+
+def key_slot(key: Union[str, bytes]) -> int:
+    """计算键所在的集群槽位（0-16383）"""
+    return _key_slot(key.encode("utf-8") if isinstance(key, str) else key)
+
+
+def same_slot(keys: Iterable[Union[str, bytes]]) -> bool:
+    """多个键是否落在同一个槽位"""
+    return len({key_slot(key) for key in keys}) <= 1
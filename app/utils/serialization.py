@@ -0,0 +1,46 @@
+"""
+列表接口的快速序列化
+- 查询只选择响应模型中的列（.values()），不创建 ORM 模型实例，也不读取响应中没有的列（如 hashed_password）
+- 整页数据在一次 TypeAdapter 校验中完成（在 pydantic-core 中执行，不逐行调用 model_validate）
+- 直接序列化为 JSON 字节返回，FastAPI 不再按 response_model 重新校验、转换一遍
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def response_fields(schema: Type[BaseModel], exclude: Iterable[str] = ()) -> Tuple[str, ...]:
+    """响应模型中需要从数据库读取的列（exclude 为计算得到的字段）"""
+    exclude = set(exclude)
+    return tuple(name for name in schema.model_fields if name not in exclude)
+
+
+@lru_cache(maxsize=None)
+def _items_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+@lru_cache(maxsize=None)
+def _envelope_adapter(envelope: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(envelope)
+
+
+def render_page(
+    envelope: Type[BaseModel],
+    schema: Type[BaseModel],
+    rows: Sequence[Dict[str, Any]],
+    **fields: Any
+) -> bytes:
+    """
+    把一页查询结果（字典）序列化为列表响应的 JSON 字节
+    envelope 为列表响应模型（items 以外的字段通过 fields 传入，构造时不再校验）
+    """
+    items = _items_adapter(schema).validate_python(rows)
+    return _envelope_adapter(envelope).dump_json(envelope.model_construct(items=items, **fields))
+
+
+def json_bytes_response(content: bytes) -> Response:
+    """已序列化的 JSON 响应"""
+    return Response(content=content, media_type="application/json")
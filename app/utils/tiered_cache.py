@@ -0,0 +1,213 @@
+"""
+两级缓存
+进程内 LRU/TTL（L1）+ Redis（L2）：
+- 读取依次查询 L1、L2，L2 命中时回填 L1
+- 删除或更新时通过 Redis 发布/订阅广播失效消息，其他 worker 进程收到后清除各自的 L1
+- 失效消息订阅断开期间可能漏掉消息，重新订阅时清空所有 L1
+"""
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from config.settings import settings
+from config.logging import get_logger
+from app.utils.helpers import cancel_task
+from app.utils.local_cache import LRUTTLCache
+from app.utils.redis_client import redis_client
+
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+
+class CacheInvalidationBus:
+    """缓存失效消息总线（每个进程一个订阅连接，按命名空间分发给各个两级缓存）"""
+
+    def __init__(self, channel: Optional[str] = None):
+        self.channel = channel or settings.CACHE_INVALIDATION_CHANNEL
+        self.origin = uuid.uuid4().hex
+        self._caches: Dict[str, "TwoTierCache"] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(self, cache: "TwoTierCache"):
+        """注册接收失效消息的缓存（只需提供 namespace 与 local 属性）"""
+        self._caches[cache.namespace] = cache
+
+    def start(self):
+        """启动订阅任务（在 lifespan 启动阶段、Redis 连接之后调用）"""
+        if not self.running and redis_client.redis is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止订阅任务"""
+        if self._task is not None:
+            await cancel_task(self._task)
+            self._task = None
+
+    async def publish(self, namespace: str, keys: Optional[Iterable[str]] = None):
+        """广播失效消息，keys 为 None 表示清空整个命名空间"""
+        if redis_client.redis is None:
+            return
+        message = json.dumps({
+            "origin": self.origin,
+            "ns": namespace,
+            "keys": list(keys) if keys is not None else None,
+        }, ensure_ascii=False)
+        try:
+            await redis_client.publish(self.channel, message)
+            self.published += 1
+        except Exception as e:
+            logger.error(f"发布缓存失效消息失败: {e}")
+
+    def _handle(self, data: str):
+        try:
+            message = json.loads(data)
+        except (json.JSONDecodeError, TypeError):
+            return
+        if message.get("origin") == self.origin:
+            return
+        cache = self._caches.get(message.get("ns"))
+        if cache is None:
+            return
+        self.received += 1
+        keys = message.get("keys")
+        if keys is None:
+            cache.local.clear()
+        else:
+            for key in keys:
+                cache.local.delete(key)
+
+    def _clear_all(self):
+        for cache in self._caches.values():
+            cache.local.clear()
+
+    async def _run(self):
+        """订阅失效频道，连接断开时退避重连"""
+        delay = 0.5
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # 订阅建立前可能漏掉了消息，清空本地缓存
+                self._clear_all()
+                delay = 0.5
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"缓存失效订阅断开: {e}")
+                self.reconnects += 1
+                self._clear_all()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+# 全局缓存失效消息总线实例
+cache_invalidation_bus = CacheInvalidationBus()
+
+
+class TwoTierCache:
+    """两级缓存"""
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        redis_ttl: Optional[int] = None,
+        bus: Optional[CacheInvalidationBus] = None
+    ):
+        self.namespace = namespace
+        self.local = LRUTTLCache(
+            maxsize=maxsize or settings.TIERED_CACHE_LOCAL_SIZE,
+            ttl=settings.TIERED_CACHE_LOCAL_TTL if local_ttl is None else local_ttl
+        )
+        self.redis_ttl = settings.TIERED_CACHE_REDIS_TTL if redis_ttl is None else redis_ttl
+        self.bus = bus or cache_invalidation_bus
+        self.bus.register(self)
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    def redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """读取缓存，依次查询 L1、L2"""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        if redis_client.redis is None:
+            return default
+
+        value = await redis_client.get_value(self.redis_key(key))
+        if value is None:
+            self.redis_misses += 1
+            return default
+
+        self.redis_hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None, broadcast: bool = True):
+        """
+        写入缓存
+        broadcast 为 True 时通知其他进程清除旧值；从数据源回填未命中的缓存时可设为 False
+        """
+        self.local.set(key, value)
+        if redis_client.redis is None:
+            return
+        await redis_client.set_value(self.redis_key(key), value, expire=expire or self.redis_ttl)
+        if broadcast:
+            await self.bus.publish(self.namespace, [key])
+
+    async def delete(self, *keys: str):
+        """删除缓存并通知其他进程"""
+        for key in keys:
+            self.local.delete(key)
+        if redis_client.redis is None:
+            return
+        await redis_client.delete_many([self.redis_key(key) for key in keys])
+        await self.bus.publish(self.namespace, keys)
+
+    async def clear_local(self, broadcast: bool = True):
+        """清空所有进程的 L1（不删除 Redis 中的数据）"""
+        self.local.clear()
+        if broadcast:
+            await self.bus.publish(self.namespace, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各级缓存统计信息"""
+        redis_total = self.redis_hits + self.redis_misses
+        return {
+            "l1": self.local.get_stats(),
+            "l2": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_ratio": round(self.redis_hits / redis_total, 4) if redis_total else 0.0,
+            },
+        }
@@ -9,9 +9,15 @@ from fastapi_cbv import APIView, ModelViewSet, cbv, CBVRouter
 from datetime import datetime
 
 from app.core.deps import get_current_active_user, get_current_superuser
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import hash_password_async, verify_password_async, create_user_access_token
+from app.core.password_hasher import PasswordHasherBusy
+from app.core.principal_cache import principal_cache
+from app.core.cache_tags import invalidate_profiles, invalidate_users
+from app.core.token_versions import token_versions
 from app.models.models import User, UserProfile
+from app.services.last_login import last_login_buffer
 from app.serializers import UserSerializer, UserProfileSerializer
+from app.utils.pagination import CursorPagination
 from app.schemas.schemas import (
     UserCreate,
     Token,
@@ -45,7 +51,7 @@ class AuthViewSet(APIView):
                 )
             
             # 创建新用户
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await hash_password_async(user_data.password)
             user = await User.create(
                 username=user_data.username,
                 email=user_data.email,
@@ -55,12 +61,15 @@ class AuthViewSet(APIView):
             
             # 创建用户资料
             await UserProfile.create(user=user)
+            await invalidate_users(user.id)
             
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={"message": "User created successfully", "user_id": user.id}
             )
         
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,7 +92,7 @@ async def login(username: str = Body(...), password: str = Body(...)) -> Token:
     """用户登录"""
     user = await User.get_or_none(username=username)
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -96,17 +105,18 @@ async def login(username: str = Body(...), password: str = Body(...)) -> Token:
             detail="Inactive user"
         )
     
-    # 更新最后登录时间
-    user.last_login = datetime.utcnow()
-    await user.save()
+    # 更新最后登录时间（写缓冲，定期批量写入）
+    await last_login_buffer.record(user.id, datetime.utcnow())
     
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_user_access_token(user, user.token_version)
     return Token(access_token=access_token, token_type="bearer")
 
 
 class UserViewSet(ModelViewSet):
     """用户视图集 - 使用 ModelViewSet 自动生成 CRUD"""
     serializer_class = UserSerializer
+    pagination_class = CursorPagination
+    cursor_ordering = ("-created_at", "-id")
     # 默认配置（无需重复定义）:
     # lookup_field = "id"
     # datetime_format = "%Y-%m-%d %H:%M:%S"
@@ -114,13 +124,52 @@ class UserViewSet(ModelViewSet):
     def get_queryset(self):
         """获取查询集 - 延迟到实际使用时才调用"""
         return User.all()
+    
+    async def perform_create(self, validated_data):
+        """创建用户后使用户列表缓存失效"""
+        instance = await super().perform_create(validated_data)
+        await invalidate_users(instance.id)
+        return instance
+    
+    async def perform_update(self, instance, validated_data):
+        """更新用户后使认证用户缓存失效并吊销已签发的令牌"""
+        old_username = instance.username
+        instance = await super().perform_update(instance, validated_data)
+        await principal_cache.invalidate(old_username)
+        await token_versions.bump(instance.id)
+        await invalidate_users(instance.id)
+        return instance
+    
+    async def perform_destroy(self, instance):
+        """删除用户后使认证用户缓存失效并吊销已签发的令牌"""
+        await super().perform_destroy(instance)
+        await principal_cache.invalidate(instance.username)
+        await token_versions.bump(instance.id)
+        await invalidate_users(instance.id)
 
 
 class UserProfileViewSet(ModelViewSet):
     """用户资料视图集 - 使用 ModelViewSet 自动生成 CRUD"""
     serializer_class = UserProfileSerializer
-    # 使用默认配置
+    pagination_class = CursorPagination  # 按 id 游标分页
     
     def get_queryset(self):
         """获取查询集"""
         return UserProfile.all()
+    
+    async def perform_create(self, validated_data):
+        """创建资料后使资料列表缓存失效"""
+        instance = await super().perform_create(validated_data)
+        await invalidate_profiles()
+        return instance
+    
+    async def perform_update(self, instance, validated_data):
+        """更新资料后使资料列表缓存失效"""
+        instance = await super().perform_update(instance, validated_data)
+        await invalidate_profiles()
+        return instance
+    
+    async def perform_destroy(self, instance):
+        """删除资料后使资料列表缓存失效"""
+        await super().perform_destroy(instance)
+        await invalidate_profiles()
@@ -9,6 +9,7 @@ FastAPI 吞吐性能测试脚本
     python benchmark.py                           # 默认测试
     python benchmark.py --requests 5000 --concurrency 100
     python benchmark.py --url http://192.168.1.100:8000
+    python benchmark.py --scenario me             # 只测试 /auth/me，可对比 TOKEN_CACHE_ENABLED 开关前后的差异
 """
 
 import argparse
@@ -44,10 +45,19 @@ class BenchmarkResult:
 
 
 class Benchmark:
-    def __init__(self, base_url: str, total_requests: int, concurrency: int):
+    def __init__(
+        self,
+        base_url: str,
+        total_requests: int,
+        concurrency: int,
+        username: str = "admin",
+        password: str = "admin123"
+    ):
         self.base_url = base_url.rstrip('/')
         self.total_requests = total_requests
         self.concurrency = concurrency
+        self.username = username
+        self.password = password
         self.token: str = None
     
     async def login(self, session: aiohttp.ClientSession) -> bool:
@@ -55,7 +65,7 @@ class Benchmark:
         try:
             async with session.post(
                 f"{self.base_url}/auth/login",
-                data={"username": "admin@example.com", "password": "admin123"}
+                json={"username": self.username, "password": self.password}
             ) as resp:
                 if resp.status == 200:
                     data = await resp.json()
@@ -181,6 +191,12 @@ async def main():
     parser.add_argument("--url", default="http://localhost:8000", help="服务地址")
     parser.add_argument("--requests", "-n", type=int, default=1000, help="总请求数")
     parser.add_argument("--concurrency", "-c", type=int, default=50, help="并发数")
+    parser.add_argument("--username", default="admin", help="登录用户名")
+    parser.add_argument("--password", default="admin123", help="登录密码")
+    parser.add_argument(
+        "--scenario", default="all", choices=["all", "health", "root", "login", "me"],
+        help="只运行指定场景"
+    )
     args = parser.parse_args()
     
     print(f"""
@@ -193,35 +209,25 @@ async def main():
 ╚══════════════════════════════════════════════════════════════╝
 """)
     
-    benchmark = Benchmark(args.url, args.requests, args.concurrency)
+    benchmark = Benchmark(args.url, args.requests, args.concurrency, args.username, args.password)
     results = []
     
-    # 测试 1: 健康检查（最简单的接口）
-    print("\n[1/4] 测试健康检查接口 GET /health")
-    result = await benchmark.run_benchmark("健康检查", "GET", "/health")
-    benchmark.print_result(result)
-    results.append(result)
-    
-    # 测试 2: API 根路径
-    print("\n[2/4] 测试根路径 GET /")
-    result = await benchmark.run_benchmark("根路径", "GET", "/")
-    benchmark.print_result(result)
-    results.append(result)
-    
-    # 测试 3: 登录接口
-    print("\n[3/4] 测试登录接口 POST /auth/login")
-    result = await benchmark.run_benchmark(
-        "登录", "POST", "/auth/login",
-        data={"username": "admin@example.com", "password": "admin123"}
-    )
-    benchmark.print_result(result)
-    results.append(result)
+    scenarios = [
+        ("health", "健康检查", "GET", "/health", {}),
+        ("root", "根路径", "GET", "/", {}),
+        ("login", "登录", "POST", "/auth/login",
+         {"json": {"username": args.username, "password": args.password}}),
+        # 同一令牌重复请求，可用于观察已验证令牌缓存的效果
+        ("me", "获取当前用户", "GET", "/auth/me", {"auth": True}),
+    ]
+    if args.scenario != "all":
+        scenarios = [s for s in scenarios if s[0] == args.scenario]
     
-    # 测试 4: 需要认证的接口
-    print("\n[4/4] 测试认证接口 GET /auth/me")
-    result = await benchmark.run_benchmark("获取当前用户", "GET", "/auth/me", auth=True)
-    benchmark.print_result(result)
-    results.append(result)
+    for index, (_, name, method, endpoint, kwargs) in enumerate(scenarios, 1):
+        print(f"\n[{index}/{len(scenarios)}] 测试{name}接口 {method} {endpoint}")
+        result = await benchmark.run_benchmark(name, method, endpoint, **kwargs)
+        benchmark.print_result(result)
+        results.append(result)
     
     # 汇总
     print(f"\n{'='*60}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+缓存值编解码性能测试脚本
+
+对比各编解码器在典型缓存数据上的编码/解码耗时与编码后大小（不连接 Redis）
+
+使用方法:
+    python benchmark_codecs.py [--iterations N] [--compress-threshold BYTES]
+
+示例:
+    python benchmark_codecs.py
+    python benchmark_codecs.py --iterations 20000 --compress-threshold 0   # 关闭压缩
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from app.utils.codecs import available_codecs, decode_value, encode_value
+
+
+def build_payloads() -> Dict[str, Any]:
+    """构造典型的缓存数据"""
+    now = datetime.utcnow().isoformat()
+    user = {
+        "id": 1024,
+        "username": "zhangsan",
+        "email": "zhangsan@example.com",
+        "full_name": "张三",
+        "is_active": True,
+        "is_staff": False,
+        "is_superuser": False,
+        "last_login": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    page = {
+        "items": [dict(user, id=i, username=f"user{i}") for i in range(20)],
+        "total": 12345,
+        "page": 1,
+        "size": 20,
+    }
+    task_result = {
+        "task_id": "5f0c3f52-1b1c-4bd3-9f5e-8e0b7c1f2a11",
+        "status": "SUCCESS",
+        "result": {"rows": [[i, f"value-{i}", i * 1.5] for i in range(500)]},
+        "date_done": now,
+    }
+    return {
+        "user (principal)": user,
+        "page (20 users)": page,
+        "task result (500 rows)": task_result,
+    }
+
+
+def bench(value: Any, codec, iterations: int, threshold: int) -> Dict[str, float]:
+    data = encode_value(value, codec, compress_threshold=threshold)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode_value(value, codec, compress_threshold=threshold)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_value(data)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return {"size": len(data), "encode_us": encode_us, "decode_us": decode_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存值编解码性能测试")
+    parser.add_argument("--iterations", "-n", type=int, default=5000, help="每项测试的迭代次数")
+    parser.add_argument("--compress-threshold", type=int, default=1024, help="压缩阈值（字节），0 表示不压缩")
+    args = parser.parse_args()
+
+    codecs = {name: codec for name, codec in available_codecs().items() if name != "raw"}
+    print(f"可用编解码器: {', '.join(codecs)}（压缩阈值: {args.compress_threshold}）")
+
+    for label, payload in build_payloads().items():
+        print(f"\n{label}")
+        print(f"  {'codec':<10}{'size(B)':>10}{'encode(us)':>14}{'decode(us)':>14}")
+        for name, codec in codecs.items():
+            result = bench(payload, codec, args.iterations, args.compress_threshold)
+            print(f"  {name:<10}{result['size']:>10}{result['encode_us']:>14.2f}{result['decode_us']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+管理后台用户搜索性能测试脚本
+
+在临时 SQLite 数据库中逐步写入用户（执行迁移，包含 FTS5 trigram 索引），
+对每个数据量比较原 icontains（LIKE '%关键词%'，全表扫描）与索引搜索的耗时（第一页 + 总数）
+
+使用方法:
+    python benchmark_search.py [--sizes N,N,...] [--repeat N] [--skip-like]
+
+示例:
+    python benchmark_search.py
+    python benchmark_search.py --sizes 1000,100000,1000000
+    python benchmark_search.py --sizes 1000,1000000,10000000 --skip-like   # 千万级只测索引搜索（写入耗时较长）
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from tortoise import Tortoise
+from tortoise.expressions import Q
+
+from app.models.models import User
+from app.services.user_search import search_users
+from app.utils.migrations import migrate
+
+
+USER_ORDERING = ("-created_at", "-id")
+PAGE_SIZE = 20
+
+
+def insert_users(path: str, start: int, end: int, batch: int = 50000):
+    """直接用 sqlite3 批量写入用户（触发器同步维护搜索索引）"""
+    conn = sqlite3.connect(path)
+    base = datetime(2024, 1, 1)
+    try:
+        for offset in range(start, end, batch):
+            rows = []
+            for i in range(offset, min(offset + batch, end)):
+                token = secrets.token_hex(6)
+                created = (base + timedelta(seconds=i)).isoformat()
+                rows.append((f"user{i}_{token}", f"{token}.{i}@example.com", "x", created, created))
+            conn.executemany(
+                'INSERT INTO "users" ("username", "email", "hashed_password", "is_active", "is_staff", '
+                '"is_superuser", "created_at", "updated_at") VALUES (?, ?, ?, 1, 0, 0, ?, ?)',
+                rows,
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+
+async def timed(build: Callable, repeat: int) -> float:
+    """第一页与总数的耗时中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        query = build()
+        start = time.perf_counter()
+        await query.order_by(*USER_ORDERING).limit(PAGE_SIZE + 1)
+        await query.count()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def like_search(term: str):
+    """原实现：LIKE '%关键词%'"""
+    return User.filter(Q(username__icontains=term) | Q(email__icontains=term))
+
+
+async def run(path: str, sizes: List[int], repeat: int, skip_like: bool):
+    await Tortoise.init(config={
+        "connections": {"default": f"sqlite://{path}"},
+        "apps": {"models": {"models": ["app.models.models"], "default_connection": "default"}},
+    })
+    try:
+        await migrate()
+        print(f"{'用户数':>10}  {'关键词':<14}{'匹配数':>8}  {'LIKE (ms)':>10}  {'索引 (ms)':>10}")
+
+        written = 0
+        for size in sorted(sizes):
+            start = time.perf_counter()
+            insert_users(path, written, size)
+            written = size
+            print(f"-- 写入至 {size} 个用户，耗时 {time.perf_counter() - start:.1f}s")
+
+            # 取中间一个用户的随机部分作为子串关键词，邮箱的前 2 个字符作为前缀关键词（约匹配 1/256 的用户）
+            sample = await User.filter(id=size // 2).first()
+            terms = [sample.username.split("_")[1][2:9], sample.email[:2]]
+            for term in terms:
+                matches = await search_users(User.all(), term).count()
+                indexed = await timed(lambda: search_users(User.all(), term), repeat)
+                like = "-" if skip_like else f"{await timed(lambda: like_search(term), repeat):.2f}"
+                print(f"{size:>10}  {term:<14}{matches:>8}  {like:>10}  {indexed:>10.2f}")
+    finally:
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用户搜索性能测试")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="逐步写入的用户数，逗号分隔")
+    parser.add_argument("--repeat", "-n", type=int, default=5, help="每项测试的重复次数")
+    parser.add_argument("--skip-like", action="store_true", help="不测试 LIKE 全表扫描（数据量很大时）")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory(prefix="search_bench_") as tmp:
+        asyncio.run(run(os.path.join(tmp, "bench.sqlite3"), sizes, args.repeat, args.skip_like))
+    print("\n说明: 子串关键词的匹配数固定，索引搜索耗时不随用户数增长；"
+          "前缀关键词（1~2 个字符）的匹配数随数据量增长，耗时与匹配数成正比")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,43 @@
+from urllib.parse import urlsplit
+
 from celery import Celery
 from celery.signals import setup_logging as celery_setup_logging
 from config.settings import settings
+from app.utils.redis_client import parse_nodes
+
+
+def sentinel_url(url: str) -> str:
+    """
+    将 redis:// 地址转换为经哨兵连接的地址（每个哨兵一段，用分号分隔），保留密码与数据库编号
+    如 redis://:pwd@localhost:6379/1 -> sentinel://:pwd@s1:26379/1;sentinel://:pwd@s2:26379/1
+    """
+    if not url.startswith("redis://"):
+        return url
+    parts = urlsplit(url)
+    auth = parts.netloc.rpartition("@")[0]
+    prefix = f"{auth}@" if auth else ""
+    return ";".join(
+        f"sentinel://{prefix}{host}:{port}{parts.path}"
+        for host, port in parse_nodes(settings.REDIS_SENTINELS)
+    )
+
+
+def sentinel_transport_options() -> dict:
+    """哨兵连接参数（broker 与结果后端共用）"""
+    options = {"master_name": settings.REDIS_SENTINEL_MASTER}
+    if settings.REDIS_SENTINEL_PASSWORD:
+        options["sentinel_kwargs"] = {"password": settings.REDIS_SENTINEL_PASSWORD}
+    return options
+
+
+# Celery 不支持 Redis 集群，cluster 模式下 broker 与结果后端仍按配置的地址连接
+use_sentinel = settings.REDIS_MODE == "sentinel"
 
 # 创建Celery应用
 celery_app = Celery(
     "fastapi-base",
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND,
+    broker=sentinel_url(settings.CELERY_BROKER_URL) if use_sentinel else settings.CELERY_BROKER_URL,
+    backend=sentinel_url(settings.CELERY_RESULT_BACKEND) if use_sentinel else settings.CELERY_RESULT_BACKEND,
     include=["celery_app.tasks.test_tasks"]
 )
 
@@ -46,5 +77,11 @@ celery_app.conf.update(
     beat_schedule={},
 )
 
+if use_sentinel:
+    celery_app.conf.update(
+        broker_transport_options=sentinel_transport_options(),
+        result_backend_transport_options=sentinel_transport_options(),
+    )
+
 # 自动发现任务
 celery_app.autodiscover_tasks(["celery_app.tasks"])
\ No newline at end of file
@@ -21,13 +21,16 @@ FastAPI Base - 命令行工具
   server          启动 FastAPI Web 服务
   worker          启动 Celery Worker
   beat            启动 Celery Beat 定时任务调度
-  init-db         初始化数据库（创建表结构）
+  migrate         执行数据库迁移（创建/更新表结构）
+  init-db         初始化数据库（同 migrate）
   
 选项:
   --host HOST     Web 服务监听地址 (默认: 0.0.0.0)
   --port PORT     Web 服务端口 (默认: 8000)
   --workers NUM   Worker 进程数 (默认: 4)
   --reload        启用热重载 (仅开发环境，使用 uvicorn)
+  --status        migrate: 只显示各迁移的执行状态
+  --target VER    migrate: 迁移到指定版本 (默认: 最新版本)
   
 示例:
   ./app server                    # 启动 Web 服务 (gunicorn + uvicorn)
@@ -35,7 +38,8 @@ FastAPI Base - 命令行工具
   ./app server --workers 8        # 指定 worker 数量
   ./app worker                    # 启动 Celery Worker
   ./app beat                      # 启动定时任务调度
-  ./app init-db                   # 初始化数据库
+  ./app migrate                   # 执行数据库迁移
+  ./app migrate --status          # 查看迁移状态
 """)
 
 
@@ -119,25 +123,42 @@ def run_beat():
     ])
 
 
-def init_database():
-    """初始化数据库"""
+def run_migrate(status: bool = False, target: int = None):
+    """执行数据库迁移"""
     import asyncio
     from tortoise import Tortoise
     from config.database import DATABASE_CONFIG
-    from config.logging import setup_logging, get_logger
+    from config.logging import setup_logging
+    from app.utils.migrations import MigrationError, migrate, migration_status
     
     setup_logging()
-    logger = get_logger(__name__)
     
-    async def _init():
-        logger.info("初始化数据库...")
+    async def _status():
+        for item in await migration_status():
+            if item["modified"]:
+                state = f"已执行 {item['applied_at']}（内容已修改）"
+            elif item["applied"]:
+                state = f"已执行 {item['applied_at']}"
+            else:
+                state = "未执行"
+            print(f"  {item['version']:04d}_{item['name']:<30} {state}")
+    
+    async def _migrate():
+        applied = await migrate(target=target)
+        print(f"数据库迁移完成，本次执行 {len(applied)} 个迁移")
+    
+    async def _run():
         await Tortoise.init(config=DATABASE_CONFIG)
-        await Tortoise.generate_schemas()
-        logger.info("数据库表结构创建完成")
-        await Tortoise.close_connections()
+        try:
+            await (_status() if status else _migrate())
+        finally:
+            await Tortoise.close_connections()
     
-    asyncio.run(_init())
-    print("数据库初始化完成!")
+    try:
+        asyncio.run(_run())
+    except MigrationError as e:
+        print(f"数据库迁移失败: {e}")
+        sys.exit(1)
 
 
 def main():
@@ -153,6 +174,8 @@ def main():
     port = 8000
     workers = 4
     reload = False
+    status = False
+    target = None
     
     i = 2
     while i < len(sys.argv):
@@ -169,6 +192,12 @@ def main():
         elif arg == "--reload":
             reload = True
             i += 1
+        elif arg == "--status":
+            status = True
+            i += 1
+        elif arg == "--target" and i + 1 < len(sys.argv):
+            target = int(sys.argv[i + 1])
+            i += 2
         else:
             i += 1
     
@@ -179,8 +208,8 @@ def main():
         run_worker()
     elif command == "beat":
         run_beat()
-    elif command == "init-db":
-        init_database()
+    elif command in ["migrate", "init-db"]:
+        run_migrate(status=status, target=target)
     elif command in ["-h", "--help", "help"]:
         print_usage()
     else:
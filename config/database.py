@@ -1,10 +1,83 @@
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+
+from tortoise.backends.base.config_generator import expand_db_url
+
 from config.settings import settings
 
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """SQLite 连接参数（Tortoise 会对每一项执行 PRAGMA key=value）"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "foreign_keys": "ON",
+    }
+
+
+def asyncpg_pool_options() -> Dict[str, Any]:
+    """asyncpg 连接池参数（minsize/maxsize 由 Tortoise 处理，其余参数传给 asyncpg.create_pool）"""
+    return {
+        "minsize": settings.DB_POOL_MIN_SIZE,
+        "maxsize": settings.DB_POOL_MAX_SIZE,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        "timeout": settings.DB_CONNECT_TIMEOUT,
+        "max_inactive_connection_lifetime": settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+        "max_queries": settings.DB_MAX_QUERIES,
+        "application_name": settings.DB_APPLICATION_NAME,
+    }
+
+
+def build_connection(db_url: str) -> Dict[str, Any]:
+    """
+    将数据库地址转换为 Tortoise 连接配置，并按后端补充连接池/PRAGMA 参数
+    地址中的查询参数优先于配置项，如 postgres://...?minsize=2
+    """
+    config = expand_db_url(db_url)
+    engine = config["engine"]
+    if engine == "tortoise.backends.sqlite":
+        tuned = sqlite_pragmas()
+    elif engine == "tortoise.backends.asyncpg":
+        tuned = asyncpg_pool_options()
+    elif engine in ("tortoise.backends.psycopg", "tortoise.backends.mysql"):
+        tuned = {"minsize": settings.DB_POOL_MIN_SIZE, "maxsize": settings.DB_POOL_MAX_SIZE}
+    else:
+        tuned = {}
+
+    credentials = dict(config["credentials"])
+    if engine == "tortoise.backends.sqlite":
+        # expand_db_url 为 SQLite 填入的默认 journal_mode 不视为显式配置
+        if "journal_mode" not in parse_qs(urlparse(db_url).query):
+            credentials.pop("journal_mode", None)
+    config["credentials"] = {**tuned, **credentials}
+    return config
+
+
+def replica_connections() -> Dict[str, Any]:
+    """只读副本连接配置（连接名称与 app.core.db_router.replica_connection_names 一致）"""
+    urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    return {
+        ("replica" if i == 0 else f"replica_{i}"): build_connection(url)
+        for i, url in enumerate(urls)
+    }
+
+
+REPLICA_CONNECTIONS = replica_connections()
+# 配置了只读副本时启用读写分离路由
+ROUTERS = ["app.core.db_router.ReplicaRouter"] if REPLICA_CONNECTIONS else []
+
 # Tortoise ORM配置
 TORTOISE_ORM = {
     "connections": {
-        "default": settings.DATABASE_URL,
+        "default": build_connection(settings.DATABASE_URL),
+        **REPLICA_CONNECTIONS,
     },
+    "routers": ROUTERS,
     "apps": {
         "models": {
             "models": ["app.models.models"],
@@ -16,8 +89,10 @@ TORTOISE_ORM = {
 # 数据库初始化配置
 DATABASE_CONFIG = {
     "connections": {
-        "default": settings.DATABASE_URL,
+        "default": build_connection(settings.DATABASE_URL),
+        **REPLICA_CONNECTIONS,
     },
+    "routers": ROUTERS,
     "apps": {
         "models": {
             "models": ["app.models.models"],
@@ -26,4 +101,4 @@ DATABASE_CONFIG = {
     },
     "use_tz": False,
     "timezone": "UTC",
-}
\ No newline at end of file
+}
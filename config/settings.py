@@ -14,11 +14,91 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite://./default_db.sqlite3"
+    DATABASE_REPLICA_URLS: str = ""  # 只读副本地址，逗号分隔；标记为只读的查询分发到副本，为空时全部使用主库
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0  # 授权主体写入后该时间内的读取使用主库（秒），0 表示关闭
+    DATABASE_WARMUP: bool = True  # 启动时预先建立连接（PostgreSQL 建立 DB_POOL_MIN_SIZE 个连接）
+    DATABASE_AUTO_MIGRATE: bool = True  # 启动时执行未执行的迁移（持有迁移锁的进程执行）；关闭时只检查版本，落后则拒绝启动，需先执行 ./app migrate
+    DATABASE_MIGRATE_LOCK_TIMEOUT: float = 300.0  # 等待其他进程完成迁移的最长时间（秒）
+    
+    # PostgreSQL连接池配置（asyncpg，每个 worker 进程一个连接池；DATABASE_URL 中的查询参数优先）
+    DB_POOL_MIN_SIZE: int = 5  # 常驻连接数
+    DB_POOL_MAX_SIZE: int = 20  # 连接数上限，worker 数 × 上限不应超过数据库的 max_connections
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # 每个连接缓存的预编译语句数，经 PgBouncer 事务模式连接时设为 0
+    DB_COMMAND_TIMEOUT: float = 30.0  # 单条语句超时（秒）
+    DB_CONNECT_TIMEOUT: float = 10.0  # 建立连接超时（秒）
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0  # 空闲连接超过该时间后关闭（秒），0 表示不关闭
+    DB_MAX_QUERIES: int = 50000  # 连接执行该数量的查询后重建
+    DB_APPLICATION_NAME: str = "fastapi-base"  # 显示在 pg_stat_activity 中的应用名称
+    
+    # SQLite连接配置（每次建立连接时执行的 PRAGMA）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # 读写并发
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 不会损坏数据库，只在断电时可能丢失最近的提交
+    SQLITE_BUSY_TIMEOUT: int = 5000  # 数据库被锁定时的等待时间（毫秒）
+    SQLITE_CACHE_SIZE: int = -64000  # 页缓存大小，负数表示 KiB（约 64MB）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的字节数（256MB），0 表示不使用
+    SQLITE_TEMP_STORE: str = "MEMORY"  # 临时表与索引保存在内存中
     
     # Redis配置
     REDIS_URL: str = "redis://:123456@localhost:16380/0"
     
+    # Redis部署模式：standalone 单节点、sentinel 哨兵（主从自动切换）、cluster 集群
+    # sentinel 模式下 REDIS_URL 只提供密码与数据库编号，主节点地址由哨兵发现；
+    # cluster 模式下 REDIS_URL 为任一启动节点（集群只有 0 号数据库）
+    REDIS_MODE: str = "standalone"
+    REDIS_SENTINELS: str = ""  # 哨兵地址，逗号分隔，如 "10.0.0.1:26379,10.0.0.2:26379"
+    REDIS_SENTINEL_MASTER: str = "mymaster"  # 哨兵监控的主节点名称
+    REDIS_SENTINEL_PASSWORD: Optional[str] = None  # 哨兵自身的密码（与数据节点密码不同时设置）
+    REDIS_CLUSTER_NODES: str = ""  # 集群的其他启动节点，逗号分隔，为空时只使用 REDIS_URL
+    
+    # Redis连接池配置（每个 worker 进程一个连接池）
+    REDIS_MAX_CONNECTIONS: int = 50  # 连接数上限
+    REDIS_POOL_TIMEOUT: float = 5.0  # 连接耗尽时等待空闲连接的最长时间（秒）
+    REDIS_SOCKET_TIMEOUT: float = 5.0  # 读写超时（秒）
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0  # 建立连接超时（秒）
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # 空闲连接复用前的健康检查间隔（秒）
+    REDIS_RETRY_ON_TIMEOUT: bool = True
+    REDIS_RETRY_ATTEMPTS: int = 3  # 超时/连接错误的重试次数
+    REDIS_RETRY_BACKOFF_BASE: float = 0.05  # 指数退避基数（秒）
+    REDIS_RETRY_BACKOFF_CAP: float = 1.0  # 指数退避上限（秒）
+    REDIS_POOL_WARMUP: int = 5  # 启动时预先建立的连接数
+    REDIS_AUTO_BATCH: bool = False  # 将同一事件循环轮次内的 get_value 调用合并为一条 MGET
+    
+    # Redis客户端缓存（服务端辅助，CLIENT TRACKING，需要 Redis 6+）
+    REDIS_CLIENT_TRACKING: bool = False
+    REDIS_TRACKING_PREFIXES: str = ""  # 只缓存这些前缀的键（逗号分隔），为空表示全部
+    REDIS_TRACKING_BCAST: bool = False  # 广播模式：按前缀接收失效消息，服务端无需记录每个客户端读过的键
+    REDIS_TRACKING_MAX_KEYS: int = 10000  # 本地副本最大条目数
+    REDIS_TRACKING_POOL_SIZE: int = 10  # 开启跟踪的读取连接数
+    
+    # Redis熔断配置（不可用时快速失败，进入降级模式）
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5  # 时间窗口内失败次数达到该值时熔断
+    REDIS_BREAKER_WINDOW: float = 10.0  # 失败计数时间窗口（秒）
+    REDIS_BREAKER_RECOVERY_TIMEOUT: float = 5.0  # 熔断后多久开始探测恢复（秒）
+    REDIS_BREAKER_HALF_OPEN_MAX_CALLS: int = 1  # 半开状态下同时放行的探测调用数
+    
+    # 两级缓存配置（进程内 L1 + Redis L2）
+    TIERED_CACHE_LOCAL_SIZE: int = 10000  # L1 最大条目数
+    TIERED_CACHE_LOCAL_TTL: int = 30  # L1 过期时间（秒），作为漏收失效消息时的兜底
+    TIERED_CACHE_REDIS_TTL: int = 3600  # L2 过期时间（秒）
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"  # 失效消息发布/订阅频道
+    
+    # 列表总数配置（请求参数 with_total=false 时不计数）
+    LIST_COUNT_CACHE_TTL: int = 30  # 精确计数按过滤条件缓存的时间（秒），写操作通过命名空间立即失效，0 表示不缓存
+    LIST_COUNT_ESTIMATE_THRESHOLD: int = 100000  # PostgreSQL 规划器估算的行数超过该值时返回估算值，0 表示总是精确计数
+    
+    # 任务统计计数器（Redis 哈希）过期时间（秒），过期后重新聚合，0 表示每次查询都聚合
+    TASK_STATS_COUNTER_TTL: int = 3600
+    
+    # Redis缓存值编解码配置
+    REDIS_CODEC: str = "json"  # 默认编解码器：json、fastjson（已安装 orjson 时使用）、orjson、msgpack、raw
+    REDIS_CODEC_NAMESPACES: str = "{}"  # 按键前缀指定编解码器（JSON），如 {"auth:principal:": "msgpack"}
+    REDIS_COMPRESS_THRESHOLD: int = 1024  # 编码后超过该字节数时使用 zlib 压缩，0 表示不压缩
+    REDIS_COMPRESS_LEVEL: int = 6
+    
     # Celery配置
+    # REDIS_MODE 为 sentinel 时，redis:// 地址会转换为经哨兵连接的 sentinel:// 地址（保留密码与数据库编号）；
+    # Celery 不支持 Redis 集群，cluster 模式下这两个地址仍需指向单节点或哨兵部署
     CELERY_BROKER_URL: str = "redis://:123456@localhost:16380/1"
     CELERY_RESULT_BACKEND: str = "redis://:123456@localhost:16380/2"
     
@@ -26,6 +106,42 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here-please-change-this"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_ENABLED: bool = True  # 缓存已验证的令牌，跳过重复的签名校验
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_VERSION_CACHE_TTL: int = 300  # Redis 中令牌版本缓存的过期时间（秒），版本以数据库为准
+    
+    # API 密钥配置
+    API_KEY_SECRET: str = ""  # HMAC 密钥，留空时使用 SECRET_KEY
+    API_KEY_PREFIX: str = "fbk"
+    API_KEY_CACHE_TTL: int = 60  # 密钥记录的进程内缓存时间（秒）
+    
+    # 密码哈希工作池配置
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread / process
+    PASSWORD_HASH_WORKERS: int = 0  # 0 表示使用 CPU 核数
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 允许排队的最大任务数
+    
+    # 认证用户缓存配置
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_SIZE: int = 10000  # 进程内最多缓存的用户数
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 30  # 进程内缓存过期时间（秒）
+    PRINCIPAL_CACHE_REDIS_TTL: int = 300  # Redis 缓存过期时间（秒）
+    
+    # 最后登录时间写缓冲配置
+    LAST_LOGIN_FLUSH_INTERVAL: float = 5.0  # 刷新间隔（秒）
+    LAST_LOGIN_MAX_PENDING: int = 1000  # 缓冲条数达到该值时立即刷新
+    
+    # 限流配置（格式：次数/秒数）
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "600/60"  # 默认每个用户/IP 的请求预算
+    RATE_LIMIT_BCRYPT: str = "10/60"  # 登录、注册等 bcrypt 接口每个 IP 的请求预算
+    RATE_LIMIT_ROUTES: str = ""  # 自定义路由策略(JSON)，如 {"reports": {"path": "/api/v1/reports", "rate": "30/60"}}
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # 是否信任 X-Forwarded-For（位于反向代理之后时开启）
+    
+    # HTTP响应缓存（按路由配置的 GET 接口，Redis 存储，支持 ETag/If-None-Match）
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 30  # 默认过期时间（秒），写操作通过标签立即失效；Celery Beat 与最后登录时间的写入最多延迟该时间可见
+    RESPONSE_CACHE_MAX_BODY: int = 1048576  # 超过该字节数的响应不缓存
+    RESPONSE_CACHE_ROUTES: str = ""  # 自定义路由配置(JSON)，如 {"intervals": {"path": "/api/v1/admin/schedules/intervals", "ttl": 60, "tags": ["ns:tasks"]}}
     
     # 管理员配置
     ADMIN_EMAIL: str = "admin@example.com"
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
@@ -10,7 +10,16 @@ from contextlib import asynccontextmanager
 from config.settings import settings
 from config.database import DATABASE_CONFIG
 from config.logging import setup_logging, get_logger
+from app.utils.database import warm_up_database
+from app.utils.migrations import check_schema, migrate
+from app.utils.pagination import CursorError
 from app.utils.redis_client import redis_client
+from app.utils.tiered_cache import cache_invalidation_bus
+from app.core.deps import require_scopes
+from app.core.password_hasher import password_hasher, PasswordHasherBusy
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.response_cache import ResponseCacheMiddleware
+from app.services.last_login import last_login_buffer
 from app.views.user_views import router as user_router, UserViewSet, UserProfileViewSet
 from app.admin import admin_router
 from fastapi_cbv import viewset_routes
@@ -30,15 +39,27 @@ async def lifespan(app: FastAPI):
     # 初始化 Tortoise ORM
     from tortoise import Tortoise
     await Tortoise.init(config=DATABASE_CONFIG)
-    await Tortoise.generate_schemas()
-    logger.info("数据库连接成功")
+    
+    # 数据库结构版本检查（已是最新版本时只查询一次版本号）
+    if settings.DATABASE_AUTO_MIGRATE:
+        applied = await migrate()
+        if applied:
+            logger.info(f"已执行数据库迁移: {', '.join(f'{m.version}_{m.name}' for m in applied)}")
+    version = await check_schema()
+    logger.info(f"数据库结构版本: {version}")
+    if settings.DATABASE_WARMUP:
+        warmed = await warm_up_database()
+        logger.info(f"数据库连接成功，已预热 {warmed} 个连接")
+    else:
+        logger.info("数据库连接成功")
     
     # 连接Redis
     try:
         await redis_client.connect()
-        logger.info("Redis连接成功")
+        warmed = await redis_client.warm_up()
+        logger.info(f"Redis连接成功，已预热 {warmed} 个连接")
     except Exception as e:
-        logger.error(f"Redis连接失败: {e}")
+        logger.error(f"Redis连接失败，以降级模式运行（Redis 恢复后自动退出）: {e}")
     
     # 创建超级管理员账户
     try:
@@ -46,11 +67,26 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"创建超级管理员失败: {e}")
     
+    # 启动最后登录时间写缓冲
+    last_login_buffer.start()
+    
+    # 订阅两级缓存失效消息
+    cache_invalidation_bus.start()
+    
     yield
     
     # 关闭时执行
     logger.info("FastAPI应用关闭中...")
     
+    # 停止缓存失效消息订阅
+    await cache_invalidation_bus.stop()
+    
+    # 写入缓冲中的最后登录时间
+    try:
+        await last_login_buffer.stop()
+    except Exception as e:
+        logger.error(f"写入最后登录时间失败: {e}")
+    
     # 断开Redis连接
     try:
         await redis_client.disconnect()
@@ -58,6 +94,9 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Redis断开连接失败: {e}")
     
+    # 关闭密码哈希工作池
+    password_hasher.shutdown()
+    
     # 关闭数据库连接
     await Tortoise.close_connections()
     logger.info("数据库连接已断开")
@@ -72,7 +111,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# 添加中间件
+# 添加中间件（后添加的在外层）
+# 响应缓存（最内层，命中缓存的响应同样经过 CORS 等中间件处理）
+if settings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware)
+
+# 限流中间件（位于 CORS 之内，429 响应同样携带 CORS 响应头，浏览器端可以读取；预检请求不计入预算）
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -115,6 +162,33 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """密码哈希队列已满处理"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": True,
+            "message": str(exc),
+            "status_code": 503
+        },
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(CursorError)
+async def cursor_error_handler(request: Request, exc: CursorError):
+    """分页游标无效处理"""
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error": True,
+            "message": str(exc),
+            "status_code": 400
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """通用异常处理"""
@@ -137,7 +211,9 @@ async def health_check():
         "status": "healthy",
         "app_name": settings.APP_NAME,
         "version": settings.VERSION,
-        "debug": settings.DEBUG
+        "debug": settings.DEBUG,
+        "degraded": redis_client.degraded,
+        "redis": redis_client.get_health()
     }
 
 
@@ -171,8 +247,11 @@ def register_routes():
     viewset_routes(app, UserProfileViewSet, prefix="/api/v1/profiles")
 
 
-# Celery任务路由
-@app.post("/api/v1/tasks/send-email")
+# Celery任务路由（需要 tasks 权限范围的 API 密钥或超级管理员令牌）
+tasks_auth = [Depends(require_scopes("tasks"))]
+
+
+@app.post("/api/v1/tasks/send-email", dependencies=tasks_auth)
 async def trigger_send_email(email: str, username: str):
     """触发发送邮件任务"""
     from celery_app.tasks.email_tasks import send_welcome_email
@@ -185,7 +264,7 @@ async def trigger_send_email(email: str, username: str):
     }
 
 
-@app.post("/api/v1/tasks/generate-report")
+@app.post("/api/v1/tasks/generate-report", dependencies=tasks_auth)
 async def trigger_generate_report(report_type: str, filters: dict = None):
     """触发生成报告任务"""
     from celery_app.tasks.general_tasks import generate_report
@@ -198,7 +277,7 @@ async def trigger_generate_report(report_type: str, filters: dict = None):
     }
 
 
-@app.get("/api/v1/tasks/{task_id}/status")
+@app.get("/api/v1/tasks/{task_id}/status", dependencies=tasks_auth)
 async def get_task_status(task_id: str):
     """获取任务状态"""
     from celery_app.celery import celery_app
@@ -260,7 +339,7 @@ async def get_user_stats():
 async def create_superuser():
     """创建超级管理员账户"""
     from app.models.models import User, UserProfile
-    from app.core.security import get_password_hash
+    from app.core.security import hash_password_async
     
     # 检查是否已存在超级管理员
     existing_admin = await User.get_or_none(email=settings.ADMIN_EMAIL)
@@ -269,7 +348,7 @@ async def create_superuser():
         return
     
     # 创建超级管理员
-    hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
+    hashed_password = await hash_password_async(settings.ADMIN_PASSWORD)
     admin_user = await User.create(
         username="admin",
         email=settings.ADMIN_EMAIL,
@@ -42,12 +42,7 @@ mkdir -p uploads logs
 
 # 数据库初始化
 echo "初始化数据库..."
-if [ -f "init_schema.sql" ]; then
-    sqlite3 default_db.sqlite3 < init_schema.sql
-    echo "数据库初始化完成"
-else
-    echo "警告: init_schema.sql 文件不存在，跳过数据库初始化"
-fi
+python cli.py migrate
 
 echo "=== 项目配置完成 ==="
 echo ""
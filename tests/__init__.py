@@ -13,3 +13,4 @@ sys.path.insert(0, str(ROOT_DIR))
 os.environ["DATABASE_URL"] = "sqlite://:memory:"
 os.environ["REDIS_URL"] = "redis://localhost:16380/0"
 os.environ["DEBUG"] = "True"
+os.environ["RATE_LIMIT_ENABLED"] = "False"
@@ -1,6 +1,7 @@
 """
 测试配置和 Fixtures
 """
+import os
 import asyncio
 import pytest
 import pytest_asyncio
@@ -12,6 +13,10 @@ from main import app
 from config.database import DATABASE_CONFIG
 from app.models.models import User, UserProfile
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache
+from app.core.token_versions import token_versions
+from app.utils.migrations import migrate
+from app.utils.redis_client import redis_client
 
 
 # 配置测试数据库
@@ -41,12 +46,33 @@ async def db():
     """初始化测试数据库"""
     # 初始化数据库
     await Tortoise.init(config=TEST_DATABASE_CONFIG)
-    await Tortoise.generate_schemas()
+    await migrate()
     
     yield
     
     # 清理数据库
     await Tortoise.close_connections()
+    
+    # 清理进程内缓存，避免跨测试复用
+    principal_cache.local.clear()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def live_redis():
+    """连接本地 Redis（可通过 TEST_REDIS_URL 指定，不可用时跳过），测试结束后清理测试键"""
+    try:
+        await redis_client.connect(os.environ.get("TEST_REDIS_URL"))
+    except Exception:
+        redis_client.redis = None
+        pytest.skip("Redis 不可用")
+    
+    yield redis_client
+    
+    keys = await redis_client.redis.keys("test:*") + await redis_client.redis.keys("cache:{tagver}:*test:*")
+    # 令牌版本只是数据库的缓存，测试数据库的用户 ID 会重复使用，一并清理
+    keys += await redis_client.redis.keys(f"{token_versions.key_prefix}*")
+    await redis_client.delete_many(keys)
+    await redis_client.disconnect()
 
 
 @pytest_asyncio.fixture(scope="function")
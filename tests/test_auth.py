@@ -2,9 +2,11 @@
 测试认证相关 API
 """
 import pytest
+from datetime import datetime
 from httpx import AsyncClient
 
 from app.models.models import User
+from app.services.last_login import LastLoginBuffer
 
 
 class TestAuthAPI:
@@ -120,3 +122,56 @@ class TestAuthAPI:
         headers = {"Authorization": "Bearer invalid_token"}
         response = await client.get("/auth/me", headers=headers)
         assert response.status_code in [401, 403]
+
+
+class TestLastLoginBuffer:
+    """最后登录时间写缓冲测试"""
+    
+    @pytest.mark.asyncio
+    async def test_login_updates_last_login(self, client: AsyncClient, test_user):
+        """测试登录后更新最后登录时间"""
+        response = await client.post(
+            "/auth/login",
+            json={"username": "testuser", "password": "testpass123"}
+        )
+        assert response.status_code == 200
+        user = await User.get(id=test_user.id)
+        assert user.last_login is not None
+    
+    @pytest.mark.asyncio
+    async def test_buffered_flush(self, test_user, test_superuser):
+        """测试缓冲后批量写入"""
+        buffer = LastLoginBuffer(flush_interval=60)
+        buffer.start()
+        try:
+            earlier = datetime(2024, 1, 1, 12, 0, 0)
+            later = datetime(2024, 1, 2, 12, 0, 0)
+            await buffer.record(test_user.id, later)
+            await buffer.record(test_user.id, earlier)
+            await buffer.record(test_superuser.id, earlier)
+            
+            # 刷新前数据库中尚未更新
+            assert (await User.get(id=test_user.id)).last_login is None
+            assert buffer.get_stats()["pending"] == 2
+        finally:
+            await buffer.stop()
+        
+        assert (await User.get(id=test_user.id)).last_login.replace(tzinfo=None) == later
+        assert (await User.get(id=test_superuser.id)).last_login.replace(tzinfo=None) == earlier
+        assert buffer.get_stats() == {"pending": 0, "flushed_rows": 2, "flush_count": 1}
+    
+    @pytest.mark.asyncio
+    async def test_flush_when_full(self, test_user, test_superuser):
+        """测试缓冲区满时在后台刷新，关闭时等待刷新完成"""
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=2)
+        buffer.start()
+        try:
+            await buffer.record(test_user.id)
+            await buffer.record(test_superuser.id)
+            assert len(buffer._flush_tasks) == 1
+        finally:
+            await buffer.stop()
+        
+        assert not buffer._flush_tasks
+        assert buffer.get_stats() == {"pending": 0, "flushed_rows": 2, "flush_count": 1}
+        assert (await User.get(id=test_superuser.id)).last_login is not None
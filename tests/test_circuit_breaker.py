@@ -0,0 +1,68 @@
+"""
+测试熔断器
+"""
+import time
+
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.redis_client import RedisClient
+
+
+class TestCircuitBreaker:
+    """熔断器测试"""
+
+    def test_opens_after_threshold(self):
+        """测试失败次数达到阈值后熔断"""
+        breaker = CircuitBreaker("test", failure_threshold=3, window=10, recovery_timeout=60)
+        for _ in range(2):
+            breaker.record_failure(ConnectionError("down"))
+        breaker.before_call()
+        breaker.record_failure(ConnectionError("down"))
+        assert breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        stats = breaker.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["last_error"] == "ConnectionError: down"
+
+    def test_half_open_probe(self):
+        """测试半开状态只放行一个探测调用，成功后关闭"""
+        breaker = CircuitBreaker("test", failure_threshold=1, window=10, recovery_timeout=0.05, half_open_max_calls=1)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_half_open_failure_reopens(self):
+        """测试探测失败后重新熔断"""
+        breaker = CircuitBreaker("test", failure_threshold=1, window=10, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened_count == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_client_fails_fast(self):
+        """测试 Redis 不可达时进入降级模式，调用快速失败"""
+        client = RedisClient()
+        with pytest.raises(Exception):
+            await client.connect("redis://localhost:1/0")
+        assert client.degraded
+        assert client.get_health()["circuit"]["state"] == CircuitBreaker.OPEN
+
+        start = time.perf_counter()
+        assert await client.get_value("test:key") is None
+        assert await client.set_value("test:key", 1) is False
+        assert time.perf_counter() - start < 0.05
+        assert client.breaker.rejected == 2
@@ -0,0 +1,125 @@
+"""
+测试服务端辅助的客户端缓存（需要本地 Redis 6+，不可用时跳过）
+"""
+import asyncio
+import os
+
+import pytest
+
+
+async def wait_for(predicate, timeout: float = 1.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+class TestClientTracking:
+    """客户端缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_local_hits_and_invalidation(self, live_redis):
+        """测试本地命中与服务端推送的失效"""
+        assert await live_redis.enable_client_tracking(os.environ.get("TEST_REDIS_URL"))
+        tracking = live_redis.tracking
+
+        await live_redis.set_value("test:ct:a", {"v": 1})
+        assert await live_redis.get_value("test:ct:a") == {"v": 1}
+        assert await live_redis.get_value("test:ct:a") == {"v": 1}
+        assert tracking.local.hits == 1
+
+        # 绕过本进程的写入路径直接修改，依赖服务端推送失效
+        await live_redis.redis.set("test:ct:a", '{"v": 2}')
+
+        async def updated():
+            return await live_redis.get_value("test:ct:a") == {"v": 2}
+
+        assert await wait_for(updated)
+        assert tracking.invalidations >= 1
+
+    @pytest.mark.asyncio
+    async def test_own_write_visible_immediately(self, live_redis):
+        """测试本进程写入后立即读到新值"""
+        assert await live_redis.enable_client_tracking(os.environ.get("TEST_REDIS_URL"))
+        await live_redis.set_value("test:ct:b", 1)
+        assert await live_redis.get_value("test:ct:b") == 1
+        await live_redis.set_value("test:ct:b", 2)
+        assert await live_redis.get_value("test:ct:b") == 2
+        await live_redis.delete_key("test:ct:b")
+        assert await live_redis.get_value("test:ct:b") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_read(self, live_redis):
+        """测试读取期间收到失效消息时不保存读到的值"""
+        assert await live_redis.enable_client_tracking(os.environ.get("TEST_REDIS_URL"))
+        tracking = live_redis.tracking
+        await live_redis.set_value("test:ct:c", "old")
+
+        original = tracking.redis.execute_command
+
+        async def racing_get(*args, **kwargs):
+            value = await original(*args, **kwargs)
+            tracking._invalidate(["test:ct:c"])
+            return value
+
+        tracking.redis.execute_command = racing_get
+        assert await live_redis.get_value("test:ct:c") == "old"
+        assert "test:ct:c" not in tracking.local
+
+    @pytest.mark.asyncio
+    async def test_bcast_prefixes(self, live_redis):
+        """测试广播模式只缓存匹配前缀的键"""
+        assert await live_redis.enable_client_tracking(
+            os.environ.get("TEST_REDIS_URL"), prefixes=["test:ct:hot:"], bcast=True
+        )
+        tracking = live_redis.tracking
+        await live_redis.set_value("test:ct:hot:1", "x")
+        await live_redis.set_value("test:ct:cold:1", "y")
+        assert await live_redis.get_value("test:ct:hot:1") == "x"
+        assert await live_redis.get_value("test:ct:cold:1") == "y"
+        assert "test:ct:hot:1" in tracking.local
+        assert "test:ct:cold:1" not in tracking.local
+
+        await live_redis.redis.set("test:ct:hot:1", '"z"')
+
+        async def updated():
+            return await live_redis.get_value("test:ct:hot:1") == "z"
+
+        assert await wait_for(updated)
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_unavailable(self, live_redis):
+        """测试无法开启跟踪时回退到普通读取"""
+        assert not await live_redis.enable_client_tracking("redis://localhost:1/0")
+        assert live_redis.tracking is None
+        await live_redis.set_value("test:ct:d", 1)
+        assert await live_redis.get_value("test:ct:d") == 1
+
+    @pytest.mark.asyncio
+    async def test_redirect_reconnect(self, live_redis):
+        """测试失效连接断开后清空本地副本，重连后恢复跟踪"""
+        assert await live_redis.enable_client_tracking(os.environ.get("TEST_REDIS_URL"))
+        tracking = live_redis.tracking
+        await live_redis.set_value("test:ct:e", 1)
+        assert await live_redis.get_value("test:ct:e") == 1
+        assert "test:ct:e" in tracking.local
+
+        old_redirect = tracking.redirect_id
+        await live_redis.redis.execute_command("CLIENT", "KILL", "ID", old_redirect)
+
+        async def reconnected():
+            return tracking.active and tracking.redirect_id != old_redirect
+
+        assert await wait_for(reconnected, timeout=3)
+        assert tracking.redirect_breaks == 1
+        assert "test:ct:e" not in tracking.local
+
+        assert await live_redis.get_value("test:ct:e") == 1
+        await live_redis.redis.set("test:ct:e", "2")
+
+        async def updated():
+            return await live_redis.get_value("test:ct:e") == 2
+
+        assert await wait_for(updated)
@@ -0,0 +1,54 @@
+"""
+测试缓存值编解码
+"""
+import json
+
+import pytest
+
+from app.utils.codecs import (
+    CodecError, FLAG_COMPRESSED, MAGIC, available_codecs, decode_value, encode_value, get_codec
+)
+
+
+PAYLOAD = {"id": 1, "username": "张三", "tags": ["a", "b"], "score": 1.5, "active": True, "extra": None}
+
+
+class TestCodecs:
+    """编解码测试"""
+
+    @pytest.mark.parametrize("name", sorted(set(available_codecs()) - {"raw"}))
+    def test_roundtrip(self, name):
+        """测试各编解码器往返一致"""
+        data = encode_value(PAYLOAD, get_codec(name), compress_threshold=0)
+        assert data[0] == MAGIC
+        assert data[1] == get_codec(name).id
+        assert decode_value(data) == PAYLOAD
+
+    def test_bytes_use_raw_codec(self):
+        """测试 bytes 值始终使用 raw 编解码器"""
+        data = encode_value(b"\x00\xffbinary", get_codec("json"))
+        assert data[1] == get_codec("raw").id
+        assert decode_value(data) == b"\x00\xffbinary"
+
+    def test_compression_threshold(self):
+        """测试超过阈值时压缩"""
+        value = {"items": ["x" * 50] * 100}
+        small = encode_value(value, get_codec("json"), compress_threshold=0)
+        compressed = encode_value(value, get_codec("json"), compress_threshold=1024)
+        assert not small[2] & FLAG_COMPRESSED
+        assert compressed[2] & FLAG_COMPRESSED
+        assert len(compressed) < len(small)
+        assert decode_value(compressed) == value
+
+    def test_legacy_values(self):
+        """测试旧格式（JSON 文本或普通字符串）仍可读取"""
+        assert decode_value(json.dumps(PAYLOAD, ensure_ascii=False)) == PAYLOAD
+        assert decode_value("plain text".encode("utf-8")) == "plain text"
+        assert decode_value(b"42") == 42
+
+    def test_unknown_codec(self):
+        """测试未知编解码器"""
+        with pytest.raises(CodecError):
+            get_codec("unknown")
+        with pytest.raises(CodecError):
+            decode_value(bytes((MAGIC, 200, 0)) + b"data")
@@ -0,0 +1,90 @@
+"""
+测试读写分离路由（两个 SQLite 文件分别作为主库与只读副本）
+"""
+import pytest
+import pytest_asyncio
+from tortoise import Tortoise, connections
+from tortoise.router import router as tortoise_router
+from tortoise.transactions import in_transaction
+from tortoise.utils import get_schema_sql
+
+from config.settings import settings
+from app.core import db_router
+from app.core.db_router import RecentWrites, ReplicaRouter, bind_principal, use_replica
+from app.models.models import CrontabSchedule, IntervalSchedule
+from app.services.task_scheduler import TaskSchedulerService
+
+
+@pytest_asyncio.fixture
+async def replica_db(tmp_path, monkeypatch):
+    """主库与副本使用不同的文件，副本中的数据单独写入，用于区分读取来源"""
+    replica_url = f"sqlite://{tmp_path / 'replica.sqlite3'}"
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", replica_url)
+    monkeypatch.setattr(db_router, "recent_writes", RecentWrites(window=0))
+    await Tortoise.init(config={
+        "connections": {
+            "default": f"sqlite://{tmp_path / 'primary.sqlite3'}",
+            "replica": replica_url,
+        },
+        "routers": [ReplicaRouter],
+        "apps": {"models": {"models": ["app.models.models"], "default_connection": "default"}},
+    })
+    await Tortoise.generate_schemas()
+    replica = connections.get("replica")
+    await replica.execute_script(get_schema_sql(connections.get("default"), safe=True))
+
+    await IntervalSchedule.create(every=1, period="seconds", using_db=connections.get("default"))
+    await IntervalSchedule.create(every=2, period="seconds", using_db=replica)
+    await CrontabSchedule.create(minute="2", using_db=replica)
+
+    yield
+
+    await Tortoise.close_connections()
+    tortoise_router.init_routers([])
+
+
+@use_replica
+async def replica_intervals():
+    return [i.every for i in await IntervalSchedule.all()]
+
+
+class TestReplicaRouter:
+    """读写分离路由测试"""
+
+    @pytest.mark.asyncio
+    async def test_read_only_queries_use_replica(self, replica_db):
+        """测试只读标记的查询读取副本，其余读取使用主库"""
+        assert [i.every for i in await TaskSchedulerService.list_intervals()] == [2]
+        assert [i.every for i in await IntervalSchedule.all()] == [1]
+
+        # 事务中的读取使用主库
+        async with in_transaction("default"):
+            assert await replica_intervals() == [1]
+
+        stats = db_router.get_routing_stats()
+        assert stats["enabled"] and stats["replicas"] == ["replica"]
+
+    @pytest.mark.asyncio
+    async def test_write_in_request_pins_primary(self, replica_db):
+        """测试同一请求中写入之后的读取使用主库"""
+        bind_principal("alice")
+        assert await replica_intervals() == [2]
+        await TaskSchedulerService.create_interval(3, "seconds")
+        assert await replica_intervals() == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_window(self, replica_db, monkeypatch):
+        """测试写入后窗口内写入者与被写入的表读取主库"""
+        monkeypatch.setattr(db_router, "recent_writes", RecentWrites(window=60))
+        bind_principal("alice")
+        await IntervalSchedule.create(every=3, period="seconds")
+
+        # 写入者的后续请求全部读取主库
+        bind_principal("alice")
+        assert await replica_intervals() == [1, 3]
+        assert [c.minute for c in await TaskSchedulerService.list_crontabs()] == []
+
+        # 其他主体只有被写入的表读取主库
+        bind_principal("bob")
+        assert await replica_intervals() == [1, 3]
+        assert [c.minute for c in await TaskSchedulerService.list_crontabs()] == ["2"]
@@ -4,6 +4,8 @@
 import pytest
 from httpx import AsyncClient
 
+from app.utils.redis_client import redis_client
+
 
 class TestGeneralEndpoints:
     """通用端点测试"""
@@ -17,6 +19,18 @@ class TestGeneralEndpoints:
         assert data["status"] == "healthy"
         assert "app_name" in data
         assert "version" in data
+        assert isinstance(data["degraded"], bool)
+        assert isinstance(data["redis"]["connected"], bool)
+    
+    @pytest.mark.asyncio
+    async def test_health_check_degraded(self, client: AsyncClient, monkeypatch):
+        """测试未连接 Redis 时健康检查报告降级模式"""
+        monkeypatch.setattr(redis_client, "redis", None)
+        response = await client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["degraded"] is True
+        assert data["redis"]["connected"] is False
     
     @pytest.mark.asyncio
     async def test_root_endpoint(self, client: AsyncClient):
@@ -0,0 +1,140 @@
+"""
+测试数据库迁移
+"""
+import sqlite3
+
+import pytest
+from tortoise import Tortoise, connections
+
+from app.utils.migrations import (
+    MigrationError,
+    check_schema,
+    get_schema_version,
+    latest_version,
+    load_migrations,
+    migrate,
+    migration_status,
+)
+
+
+async def init_db(path, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    await Tortoise.init(config={
+        "connections": {"default": f"sqlite://{path}" + (f"?{query}" if query else "")},
+        "apps": {"models": {"models": ["app.models.models"], "default_connection": "default"}},
+    })
+
+
+def read_schema(path, exclude=()):
+    """表、索引以及各表的列（exclude 为模型中无法声明的对象，按名称前缀排除）"""
+    conn = sqlite3.connect(path)
+    try:
+        objects = [
+            row for row in conn.execute(
+                "SELECT type, name, tbl_name FROM sqlite_master "
+                "WHERE name NOT LIKE 'sqlite_%' AND name != 'schema_version'"
+            )
+            if not row[1].startswith(tuple(exclude))
+        ]
+        columns = {
+            name: [row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')]
+            for kind, name, _ in objects if kind == "table"
+        }
+    finally:
+        conn.close()
+    return set(objects), columns
+
+
+class TestMigrations:
+    """数据库迁移测试"""
+
+    @pytest.mark.asyncio
+    async def test_migrations_match_models(self, tmp_path):
+        """测试迁移得到的表结构与模型生成的表结构一致"""
+        await init_db(tmp_path / "migrated.sqlite3")
+        try:
+            applied = await migrate()
+        finally:
+            await Tortoise.close_connections()
+        assert [m.version for m in applied] == list(range(1, latest_version() + 1))
+
+        await init_db(tmp_path / "models.sqlite3")
+        try:
+            await Tortoise.generate_schemas()
+        finally:
+            await Tortoise.close_connections()
+
+        # 用户搜索的 FTS5 表、触发器与表达式索引（迁移 v0004）
+        search_objects = ("users_search", "idx_users_username_lower", "idx_users_email_lower")
+        assert read_schema(tmp_path / "migrated.sqlite3", search_objects) == read_schema(tmp_path / "models.sqlite3")
+
+    @pytest.mark.asyncio
+    async def test_check_schema_and_idempotent_migrate(self, tmp_path):
+        """测试版本检查，已是最新版本时不再执行迁移"""
+        await init_db(tmp_path / "db.sqlite3")
+        try:
+            assert await get_schema_version() == 0
+            with pytest.raises(MigrationError):
+                await check_schema()
+
+            await migrate(target=1)
+            assert await get_schema_version() == 1
+            status = await migration_status()
+            assert [item["applied"] for item in status][:2] == [True, False]
+
+            assert len(await migrate()) == latest_version() - 1
+            assert await migrate() == []
+            assert await check_schema() == latest_version()
+        finally:
+            await Tortoise.close_connections()
+
+    @pytest.mark.asyncio
+    async def test_migrate_existing_database(self, tmp_path):
+        """测试由 generate_schemas 创建的已有数据库可以直接迁移"""
+        await init_db(tmp_path / "db.sqlite3")
+        try:
+            await Tortoise.generate_schemas()
+            await connections.get("default").execute_query(
+                "INSERT INTO celery_interval_schedule (every, period) VALUES (10, 'seconds')"
+            )
+            await migrate()
+            assert await check_schema() == latest_version()
+            _, rows = await connections.get("default").execute_query("SELECT every FROM celery_interval_schedule")
+            assert [row[0] for row in rows] == [10]
+        finally:
+            await Tortoise.close_connections()
+
+    @pytest.mark.asyncio
+    async def test_migrate_waits_for_lock(self, tmp_path):
+        """测试其他进程持有迁移锁时等待，超时后失败且不执行迁移"""
+        path = tmp_path / "db.sqlite3"
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("PRAGMA journal_mode=WAL")
+        holder.execute("BEGIN IMMEDIATE")
+
+        await init_db(path, busy_timeout=50)
+        try:
+            with pytest.raises(MigrationError):
+                await migrate(lock_timeout=0.2)
+            holder.execute("ROLLBACK")
+            assert await get_schema_version() == 0
+
+            await migrate(lock_timeout=0.2)
+            assert await get_schema_version() == latest_version()
+        finally:
+            holder.close()
+            await Tortoise.close_connections()
+
+    @pytest.mark.asyncio
+    async def test_user_search_requires_sqlite_version(self, tmp_path, monkeypatch):
+        """测试 SQLite 版本不支持 FTS5 trigram 分词器时迁移给出明确的错误且不执行"""
+        search = next(m for m in load_migrations() if m.name == "user_search")
+        monkeypatch.setattr(search.module, "MIN_SQLITE_VERSION", (99, 0, 0))
+
+        await init_db(tmp_path / "db.sqlite3")
+        try:
+            with pytest.raises(MigrationError, match="SQLite 3.34"):
+                await migrate()
+            assert await get_schema_version() == 0
+        finally:
+            await Tortoise.close_connections()
@@ -0,0 +1,104 @@
+"""
+测试游标分页
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache_tags import invalidate_namespaces
+from app.models.models import IntervalSchedule, PeriodicTask, TaskResult, User
+from app.services.task_scheduler import TASK_RESULT_ORDERING, TaskSchedulerService
+from app.utils.pagination import CursorError, count_total, encode_cursor, paginate_cursor
+
+
+class TestCursorPagination:
+    """游标分页测试"""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_rows_in_order(self, db):
+        """测试逐页读取得到完整且不重复的结果（排序字段存在相同值）"""
+        base = datetime(2024, 1, 1)
+        for i in range(8):
+            result = await TaskResult.create(task_id=f"t{i}", task_name="demo", status="SUCCESS" if i % 2 else "FAILURE")
+            # 每两条结果的创建时间相同
+            await TaskResult.filter(id=result.id).update(date_created=base + timedelta(minutes=i // 2))
+
+        expected = [r.id for r in await TaskResult.all().order_by(*TASK_RESULT_ORDERING)]
+        seen, cursor = [], None
+        while True:
+            page = await TaskSchedulerService.page_task_results(limit=3, cursor=cursor)
+            seen.extend(r.id for r in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == expected
+
+        # 过滤条件与游标组合
+        first = await TaskSchedulerService.page_task_results(status="SUCCESS", limit=2)
+        second = await TaskSchedulerService.page_task_results(status="SUCCESS", limit=2, cursor=first.next_cursor)
+        assert [r.task_id for r in first.items + second.items] == ["t7", "t5", "t3", "t1"]
+        assert second.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, db):
+        """测试无效游标与排序方式不一致的游标"""
+        with pytest.raises(CursorError):
+            await paginate_cursor(User.all(), ("-created_at", "-id"), 10, cursor="not-a-cursor")
+        with pytest.raises(CursorError):
+            await paginate_cursor(User.all(), ("-created_at", "-id"), 10, cursor=encode_cursor(("id",), [1]))
+
+    @pytest.mark.asyncio
+    async def test_viewset_cursor_headers(self, client: AsyncClient, test_user, superuser_headers):
+        """测试 ModelViewSet 列表返回列表，下一页游标在响应头中"""
+        response = await client.get("/api/v1/users/?page_size=1", headers=superuser_headers)
+        assert response.status_code == 200
+        first = response.json()
+        assert len(first) == 1
+        cursor = response.headers["X-Next-Cursor"]
+        assert 'rel="next"' in response.headers["Link"]
+
+        response = await client.get(f"/api/v1/users/?page_size=1&cursor={cursor}", headers=superuser_headers)
+        second = response.json()
+        assert len(second) == 1 and second[0]["id"] != first[0]["id"]
+        assert "X-Next-Cursor" not in response.headers
+
+        response = await client.get("/api/v1/users/?cursor=bad", headers=superuser_headers)
+        assert response.status_code == 400
+
+
+class TestListTotals:
+    """列表总数测试"""
+
+    @pytest.mark.asyncio
+    async def test_count_cached_per_filter(self, db, live_redis):
+        """测试精确计数按过滤条件缓存，命名空间失效后重新计数"""
+        for i in range(3):
+            await TaskResult.create(task_id=f"c{i}", task_name="demo", status="SUCCESS" if i else "FAILURE")
+
+        namespace = "test:counts"
+        assert await count_total(TaskResult.all(), namespace) == (3, False)
+        assert await count_total(TaskResult.filter(status="SUCCESS"), namespace) == (2, False)
+        assert await count_total(TaskResult.all(), namespace, with_total=False) == (None, False)
+
+        await TaskResult.create(task_id="c3", task_name="demo", status="SUCCESS")
+        assert await count_total(TaskResult.all(), namespace) == (3, False)
+
+        await invalidate_namespaces(namespace)
+        assert await count_total(TaskResult.all(), namespace) == (4, False)
+        assert await count_total(TaskResult.filter(status="SUCCESS"), namespace) == (3, False)
+
+    @pytest.mark.asyncio
+    async def test_admin_list_totals(self, client: AsyncClient, superuser_headers):
+        """测试定时任务列表的总数使用过滤条件，with_total=false 时不计数"""
+        interval = await IntervalSchedule.create(every=10, period="seconds")
+        for i in range(3):
+            await PeriodicTask.create(name=f"task{i}", task="demo", interval=interval, enabled=i == 0)
+
+        response = await client.get("/api/v1/admin/tasks?enabled=true", headers=superuser_headers)
+        data = response.json()
+        assert data["total"] == 1 and data["total_is_estimate"] is False and len(data["items"]) == 1
+
+        response = await client.get("/api/v1/admin/tasks?with_total=false&limit=2", headers=superuser_headers)
+        data = response.json()
+        assert data["total"] is None and len(data["items"]) == 2 and data["next_cursor"]
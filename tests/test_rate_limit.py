@@ -0,0 +1,88 @@
+"""
+测试限流中间件
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from httpx import AsyncClient, ASGITransport
+
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware, RateLimitPolicy, parse_rate
+
+
+def create_app(policies):
+    """创建挂载限流中间件的测试应用（未连接 Redis，使用进程内令牌桶）"""
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @app.get("/items")
+    async def items():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(), policies=policies)
+    return app
+
+
+class TestRateLimit:
+    """限流测试"""
+
+    def test_parse_rate(self):
+        """测试解析限流配置"""
+        assert parse_rate("10/60") == (10, 60)
+        assert parse_rate("5") == (5, 1)
+
+    def test_policy_matches(self):
+        """测试策略匹配"""
+        policy = RateLimitPolicy(name="login", limit=1, window=60, path="/auth/login", methods=frozenset({"POST"}))
+        assert policy.matches("POST", "/auth/login")
+        assert not policy.matches("GET", "/auth/login")
+        assert not policy.matches("POST", "/auth/loginx")
+
+    @pytest.mark.asyncio
+    async def test_strict_budget_for_bcrypt_route(self):
+        """测试登录接口超出预算后返回 429"""
+        app = create_app([
+            RateLimitPolicy(name="login", limit=2, window=60, path="/auth/login", methods=frozenset({"POST"}), per="ip"),
+            RateLimitPolicy(name="default", limit=100, window=60),
+        ])
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for _ in range(2):
+                response = await client.post("/auth/login")
+                assert response.status_code == 200
+
+            response = await client.post("/auth/login")
+            assert response.status_code == 429
+            assert int(response.headers["retry-after"]) >= 1
+            assert response.json()["status_code"] == 429
+
+            # 其他路由使用默认预算，不受影响
+            response = await client.get("/items")
+            assert response.status_code == 200
+            assert response.headers["x-ratelimit-limit"] == "100"
+
+    @pytest.mark.asyncio
+    async def test_exempt_paths(self):
+        """测试健康检查不受限流影响"""
+        app = create_app([RateLimitPolicy(name="default", limit=1, window=60)])
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for _ in range(3):
+                response = await client.get("/health")
+                assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_rejection_has_cors_headers(self):
+        """测试限流位于 CORS 之内（与 main.py 中的顺序一致）时，429 响应携带 CORS 响应头"""
+        app = create_app([RateLimitPolicy(name="default", limit=1, window=60)])
+        app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"])
+        headers = {"Origin": "http://localhost:3000"}
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items", headers=headers)
+            response = await client.get("/items", headers=headers)
+            assert response.status_code == 429
+            assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
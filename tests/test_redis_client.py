@@ -0,0 +1,282 @@
+"""
+测试 Redis 客户端
+"""
+import pytest
+
+from config.settings import settings
+from app.utils.redis_client import InstrumentedConnectionPool, RedisClient, build_pool_kwargs, cached
+
+
+class TestRedisPool:
+    """Redis 连接池测试"""
+
+    def test_pool_built_from_settings(self):
+        """测试连接池使用配置中的参数"""
+        pool = InstrumentedConnectionPool.from_url(settings.REDIS_URL, decode_responses=True, **build_pool_kwargs())
+        assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+        assert pool.timeout == settings.REDIS_POOL_TIMEOUT
+        assert pool.connection_kwargs["socket_timeout"] == settings.REDIS_SOCKET_TIMEOUT
+        assert pool.connection_kwargs["health_check_interval"] == settings.REDIS_HEALTH_CHECK_INTERVAL
+
+        stats = pool.get_stats()
+        assert stats["in_use"] == 0
+        assert stats["acquire_count"] == 0
+        assert stats["avg_wait_ms"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_not_connected(self):
+        """测试未连接时的统计与预热"""
+        client = RedisClient()
+        assert client.get_pool_stats() == {"connected": False}
+        assert await client.warm_up(3) == 0
+
+
+class TestRedisBatch:
+    """Redis 批量操作测试（需要本地 Redis）"""
+
+    @pytest.mark.asyncio
+    async def test_get_many_set_many(self, live_redis):
+        """测试批量读写与按键过期时间"""
+        assert await live_redis.set_many(
+            {"test:batch:a": {"x": 1}, "test:batch:b": "text"},
+            expire={"test:batch:a": 60}
+        )
+        assert await live_redis.get_many(["test:batch:a", "test:batch:b", "test:batch:missing"]) == {
+            "test:batch:a": {"x": 1},
+            "test:batch:b": "text",
+        }
+        assert 0 < await live_redis.get_ttl("test:batch:a") <= 60
+        assert await live_redis.get_ttl("test:batch:b") == -1
+
+    @pytest.mark.asyncio
+    async def test_pipeline(self, live_redis):
+        """测试管道上下文保持 JSON 编解码"""
+        async with live_redis.pipeline() as pipe:
+            pipe.set_value("test:batch:p", [1, 2], expire=60)
+            pipe.get_value("test:batch:p")
+            pipe.incr("test:batch:n", 2)
+            pipe.hget("test:batch:p", "f")
+        assert pipe.results[0] is True
+        assert pipe.results[1] == [1, 2]
+        assert pipe.results[2] == 2
+        # 对字符串键执行 HGET 会出错，对应结果为 None
+        assert pipe.results[3] is None
+
+    @pytest.mark.asyncio
+    async def test_codecs(self, live_redis):
+        """测试按调用选择编解码器、bytes 值与旧格式值"""
+        await live_redis.set_value("test:batch:bin", b"\x00\xff", expire=60)
+        assert await live_redis.get_value("test:batch:bin") == b"\x00\xff"
+
+        await live_redis.set_value("test:batch:mp", {"a": [1, 2]}, expire=60, codec="fastjson")
+        assert await live_redis.get_value("test:batch:mp") == {"a": [1, 2]}
+
+        # 旧版本写入的 JSON 文本
+        await live_redis.redis.set("test:batch:legacy", '{"a": 1}')
+        assert await live_redis.get_many(["test:batch:legacy", "test:batch:bin"]) == {
+            "test:batch:legacy": {"a": 1},
+            "test:batch:bin": b"\x00\xff",
+        }
+
+    @pytest.mark.asyncio
+    async def test_transaction(self, live_redis):
+        """测试乐观锁事务"""
+        await live_redis.redis.set("test:batch:counter", 1)
+
+        async def double(pipe):
+            value = int(await pipe.get("test:batch:counter"))
+            pipe.multi()
+            pipe.set("test:batch:counter", value * 2)
+            return value * 2
+
+        assert await live_redis.transaction(double, "test:batch:counter") == 2
+        assert await live_redis.redis.get("test:batch:counter") == "2"
+
+    @pytest.mark.asyncio
+    async def test_auto_batching(self, live_redis):
+        """测试同一轮次的 get_value 合并为一条 MGET"""
+        import asyncio
+
+        await live_redis.set_many({f"test:batch:k{i}": i for i in range(5)})
+        live_redis.enable_auto_batching()
+        values = await asyncio.gather(*(live_redis.get_value(f"test:batch:k{i % 6}") for i in range(12)))
+        assert values == [i % 6 if i % 6 < 5 else None for i in range(12)]
+        assert live_redis.batcher.batches == 1
+        assert live_redis.batcher.keys == 6
+
+
+class TestReadThroughCache:
+    """读穿透缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_single_flight_without_redis(self):
+        """测试并发未命中只执行一次（未连接 Redis 时同样生效）"""
+        import asyncio
+
+        client = RedisClient()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"v": calls}
+
+        results = await asyncio.gather(*(client.cache_get_or_set("test:sf", load) for _ in range(10)))
+        assert calls == 1
+        assert all(result == {"v": 1} for result in results)
+        assert client.cache_stats["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_error_not_retried(self):
+        """测试函数异常直接抛出，不会重复执行"""
+        client = RedisClient()
+        calls = 0
+
+        def fail():
+            nonlocal calls
+            calls += 1
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await client.cache_get_or_set("test:error", fail)
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_negative_caching(self, live_redis):
+        """测试缓存 None"""
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            return None
+
+        assert await live_redis.cache_get_or_set("test:neg", load, negative_ttl=60) is None
+        assert await live_redis.cache_get_or_set("test:neg", load, negative_ttl=60) is None
+        assert calls == 1
+
+        # 未开启负缓存时不缓存 None
+        assert await live_redis.cache_get_or_set("test:neg2", load) is None
+        assert await live_redis.cache_get_or_set("test:neg2", load) is None
+        assert calls == 3
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, live_redis):
+        """测试过期后先返回旧值并在后台刷新"""
+        import asyncio
+
+        version = 0
+
+        async def load():
+            nonlocal version
+            version += 1
+            return version
+
+        assert await live_redis.cache_get_or_set("test:swr", load, expire=1, stale_ttl=30, beta=0) == 1
+        await asyncio.sleep(1.1)
+        assert await live_redis.cache_get_or_set("test:swr", load, expire=1, stale_ttl=30, beta=0) == 1
+        await asyncio.sleep(0.05)
+        assert version == 2
+        assert await live_redis.cache_get_or_set("test:swr", load, expire=1, stale_ttl=30, beta=0) == 2
+        assert live_redis.cache_stats["stale_served"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_distributed_lock(self, live_redis):
+        """测试分布式锁：另一个进程等待持锁进程写入的结果"""
+        import asyncio
+        import os
+
+        other = RedisClient()
+        await other.connect(os.environ.get("TEST_REDIS_URL"))
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.2)
+            return "value"
+
+        try:
+            results = await asyncio.gather(
+                live_redis.cache_get_or_set("test:lock", load, lock=True),
+                other.cache_get_or_set("test:lock", load, lock=True),
+            )
+        finally:
+            await other.disconnect()
+        assert results == ["value", "value"]
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_decorator(self, live_redis):
+        """测试缓存装饰器"""
+        calls = 0
+
+        @cached("test:user:{user_id}:{scope}", expire=60)
+        async def get_stats(user_id: int, scope: str = "all"):
+            nonlocal calls
+            calls += 1
+            return {"user_id": user_id, "scope": scope}
+
+        assert await get_stats(1) == {"user_id": 1, "scope": "all"}
+        assert await get_stats(user_id=1) == {"user_id": 1, "scope": "all"}
+        assert await get_stats(2, scope="x") == {"user_id": 2, "scope": "x"}
+        assert calls == 2
+        assert await live_redis.exists("test:user:1:all")
+
+
+class TestTaggedCache:
+    """标签与命名空间失效测试（需要本地 Redis）"""
+
+    @pytest.mark.asyncio
+    async def test_namespace_invalidation(self, live_redis):
+        """测试命名空间版本号递增后所有键失效"""
+        for page in range(50):
+            await live_redis.set_tagged(f"page:{page}", {"page": page}, namespace="test:ns", expire=60)
+        assert await live_redis.get_tagged("page:3", namespace="test:ns") == {"page": 3}
+
+        assert await live_redis.invalidate_namespace("test:ns")
+        assert await live_redis.get_tagged("page:3", namespace="test:ns") is None
+        assert await live_redis.get_tagged("page:49", namespace="test:ns") is None
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation(self, live_redis):
+        """测试只有带有被失效标签的键失效"""
+        await live_redis.set_tagged("test:a", 1, tags=["test:user:1", "test:users"], expire=60)
+        await live_redis.set_tagged("test:b", 2, tags=["test:user:2", "test:users"], expire=60)
+
+        await live_redis.invalidate_tags("test:user:1")
+        assert await live_redis.get_tagged("test:a", tags=["test:user:1", "test:users"]) is None
+        assert await live_redis.get_tagged("test:b", tags=["test:user:2", "test:users"]) == 2
+
+        await live_redis.invalidate_tags("test:users")
+        assert await live_redis.get_tagged("test:b", tags=["test:user:2", "test:users"]) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_compute(self, live_redis):
+        """测试计算期间发生的失效使本次写入的缓存项失效"""
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await live_redis.invalidate_namespace("test:race")
+            return calls
+
+        assert await live_redis.cache_tagged("k", load, namespace="test:race") == 1
+        assert await live_redis.cache_tagged("k", load, namespace="test:race") == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_tagged_hit(self, live_redis):
+        """测试标签缓存读穿透命中"""
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            return {"calls": calls}
+
+        assert await live_redis.cache_tagged("k", load, namespace="test:hit") == {"calls": 1}
+        assert await live_redis.cache_tagged("k", load, namespace="test:hit") == {"calls": 1}
+        await live_redis.invalidate_namespace("test:hit")
+        assert await live_redis.cache_tagged("k", load, namespace="test:hit") == {"calls": 2}
@@ -0,0 +1,128 @@
+"""
+测试 Redis 哨兵/集群模式与哈希标签键布局
+哨兵与集群测试需要本地部署，通过环境变量指定（未设置时跳过）：
+- TEST_REDIS_SENTINELS: 哨兵地址，如 "127.0.0.1:26379"（主节点名称使用 REDIS_SENTINEL_MASTER）
+- TEST_REDIS_SENTINEL_URL: 提供主节点密码与数据库编号的地址，如 "redis://:123456@localhost/3"
+- TEST_REDIS_CLUSTER_URL: 集群任一节点地址，如 "redis://:123456@127.0.0.1:7001/0"
+"""
+import os
+
+import pytest
+import pytest_asyncio
+
+from config.settings import settings
+from app.utils.redis_client import RedisClient, parse_nodes
+from app.utils.redis_keys import hash_tag, key_slot, same_slot
+
+
+class TestHashTags:
+    """哈希标签测试"""
+
+    def test_key_slot(self):
+        """测试哈希标签决定槽位"""
+        assert hash_tag("user:1") == "{user:1}"
+        assert key_slot("a:{user:1}:x") == key_slot("b:{user:1}:y") == key_slot("user:1")
+        assert same_slot(["a:{g}", "b:{g}", "{g}"])
+        assert not same_slot(["a", "b", "c", "d"])
+
+    def test_tag_version_keys_share_slot(self):
+        """测试标签版本计数器位于同一槽位"""
+        keys = [RedisClient.tag_version_key(tag) for tag in ("ns:users", "user:1", "user:2")]
+        assert same_slot(keys)
+
+    def test_parse_nodes(self):
+        """测试节点列表解析"""
+        assert parse_nodes(" 10.0.0.1:26379, 10.0.0.2:26380,") == [("10.0.0.1", 26379), ("10.0.0.2", 26380)]
+        assert parse_nodes("") == []
+
+    def test_celery_sentinel_url(self, monkeypatch):
+        """测试 Celery 地址转换为哨兵地址"""
+        from celery_app.celery import sentinel_url, sentinel_transport_options
+
+        monkeypatch.setattr(settings, "REDIS_SENTINELS", "s1:26379,s2:26379")
+        monkeypatch.setattr(settings, "REDIS_SENTINEL_PASSWORD", "spwd")
+        assert sentinel_url("redis://:pwd@localhost:6379/1") == (
+            "sentinel://:pwd@s1:26379/1;sentinel://:pwd@s2:26379/1"
+        )
+        assert sentinel_url("sentinel://s1:26379/1") == "sentinel://s1:26379/1"
+        assert sentinel_transport_options() == {
+            "master_name": settings.REDIS_SENTINEL_MASTER,
+            "sentinel_kwargs": {"password": "spwd"},
+        }
+
+
+@pytest_asyncio.fixture(params=["sentinel", "cluster"])
+async def topology_redis(request, monkeypatch):
+    """连接哨兵或集群部署（未配置时跳过）"""
+    client = RedisClient()
+    if request.param == "sentinel":
+        sentinels = os.environ.get("TEST_REDIS_SENTINELS")
+        if not sentinels:
+            pytest.skip("未配置 TEST_REDIS_SENTINELS")
+        monkeypatch.setattr(settings, "REDIS_SENTINELS", sentinels)
+        url = os.environ.get("TEST_REDIS_SENTINEL_URL")
+    else:
+        url = os.environ.get("TEST_REDIS_CLUSTER_URL")
+        if not url:
+            pytest.skip("未配置 TEST_REDIS_CLUSTER_URL")
+
+    try:
+        await client.connect(url, mode=request.param)
+    except Exception:
+        pytest.skip(f"Redis {request.param} 不可用")
+
+    yield client
+
+    await client.delete_many([f"test:topo:{i}" for i in range(20)] + ["test:topo:{g}a", "test:topo:{g}b"])
+    await client.delete_many([client.tag_version_key(tag) for tag in ("test:topo", "ns:test:topo")])
+    await client.disconnect()
+
+
+class TestTopology:
+    """哨兵/集群模式测试（需要本地部署）"""
+
+    @pytest.mark.asyncio
+    async def test_multi_key_helpers(self, topology_redis):
+        """测试批量读写跨槽位的键"""
+        keys = [f"test:topo:{i}" for i in range(20)]
+        assert await topology_redis.set_many({key: i for i, key in enumerate(keys)})
+        assert await topology_redis.get_many(keys) == {key: i for i, key in enumerate(keys)}
+        assert await topology_redis.delete_many(keys) == len(keys)
+
+    @pytest.mark.asyncio
+    async def test_transaction_with_hash_tag(self, topology_redis):
+        """测试使用相同哈希标签的键可以在一个事务中写入"""
+        async with topology_redis.pipeline(transaction=True) as pipe:
+            pipe.set_value("test:topo:{g}a", 1)
+            pipe.set_value("test:topo:{g}b", 2)
+        assert pipe.results == [True, True]
+        assert await topology_redis.get_many(["test:topo:{g}a", "test:topo:{g}b"]) == {
+            "test:topo:{g}a": 1,
+            "test:topo:{g}b": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation(self, topology_redis):
+        """测试标签缓存与失效"""
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await topology_redis.cache_tagged("0", load, tags=["test:topo"], namespace="test:topo") == 1
+        assert await topology_redis.cache_tagged("0", load, tags=["test:topo"], namespace="test:topo") == 1
+        assert await topology_redis.invalidate_tags("test:topo")
+        assert await topology_redis.cache_tagged("0", load, tags=["test:topo"], namespace="test:topo") == 2
+
+    @pytest.mark.asyncio
+    async def test_pubsub_reuses_client(self, topology_redis):
+        """测试多次订阅复用同一个客户端的连接池"""
+        first = topology_redis.pubsub()
+        second = topology_redis.pubsub()
+        assert first.connection_pool is second.connection_pool
+        await first.aclose()
+        await second.aclose()
+        if topology_redis.mode == "cluster":
+            assert first.connection_pool is topology_redis._pubsub_client.connection_pool
@@ -0,0 +1,143 @@
+"""
+测试响应缓存中间件
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.core.response_cache import (
+    ResponseCache,
+    ResponseCacheMiddleware,
+    ResponseCachePolicy,
+    etag_matches,
+)
+from app.core.security import create_access_token
+from app.core.token_versions import token_versions
+from app.models.models import User
+
+
+def create_app(cache: ResponseCache):
+    """创建挂载响应缓存中间件的测试应用，calls 记录处理函数执行次数"""
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/items")
+    async def items(page: int = 1):
+        app.state.calls += 1
+        return {"page": page, "items": [1, 2, 3]}
+
+    @app.get("/other")
+    async def other():
+        app.state.calls += 1
+        return {"ok": True}
+
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    return app
+
+
+def token(uid: int = 90001, ver: int = 0, is_superuser: bool = True) -> dict:
+    """生成携带授权声明的令牌请求头"""
+    access_token = create_access_token({
+        "sub": f"user{uid}",
+        "uid": uid,
+        "is_active": True,
+        "is_staff": False,
+        "is_superuser": is_superuser,
+        "ver": ver,
+    })
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def create_cache() -> ResponseCache:
+    return ResponseCache([ResponseCachePolicy(name="test:items", path="/items", ttl=60, tags=("test:items",))])
+
+
+class TestResponseCache:
+    """响应缓存测试"""
+
+    def test_etag_matches(self):
+        """测试 If-None-Match 匹配"""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"a"', '"a"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches("", '"a"')
+        assert not etag_matches('"a"', '"b"')
+
+    def test_cache_key_scope(self):
+        """测试缓存键包含作用域并忽略查询参数顺序"""
+        cache = create_cache()
+        policy = cache.policies[0]
+        key = cache.cache_key(policy, "role:superuser", "/items", b"a=1&b=2")
+        assert key == cache.cache_key(policy, "role:superuser", "/items/", b"b=2&a=1")
+        assert key != cache.cache_key(policy, "role:user", "/items", b"a=1&b=2")
+        assert key != cache.cache_key(policy, "role:superuser", "/items", b"a=1&b=3")
+
+    @pytest.mark.asyncio
+    async def test_etag_without_redis(self):
+        """测试未连接 Redis 时仍返回 ETag 并响应 304"""
+        app = create_app(create_cache())
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/items", headers=token())
+            assert response.status_code == 200
+            assert response.json()["page"] == 1
+            etag = response.headers["etag"]
+
+            response = await client.get("/items", headers={**token(), "If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+            assert response.content == b""
+
+            # 未配置策略的路由与未携带令牌的请求不经过缓存
+            response = await client.get("/other")
+            assert "etag" not in response.headers
+            response = await client.get("/items")
+            assert "etag" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_and_invalidation(self, db, live_redis):
+        """测试命中缓存、304 与标签失效（需要本地 Redis）"""
+        uids = (90001, 90002, 90003)
+        for uid in uids:
+            await User.create(id=uid, username=f"user{uid}", email=f"user{uid}@example.com", hashed_password="x")
+        cache = create_cache()
+        app = create_app(cache)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            try:
+                response = await client.get("/items?page=2", headers=token())
+                assert response.headers["x-cache"] == "MISS"
+                etag = response.headers["etag"]
+
+                response = await client.get("/items?page=2", headers=token(uid=90002))
+                assert response.headers["x-cache"] == "HIT"
+                assert response.json() == {"page": 2, "items": [1, 2, 3]}
+                assert response.headers["etag"] == etag
+                assert app.state.calls == 1
+
+                response = await client.get("/items?page=2", headers={**token(), "If-None-Match": etag})
+                assert response.status_code == 304
+                assert app.state.calls == 1
+
+                # 不同角色使用不同的缓存
+                response = await client.get("/items?page=2", headers=token(uid=90003, is_superuser=False))
+                assert response.headers["x-cache"] == "MISS"
+                assert app.state.calls == 2
+
+                # 标签失效后重新执行处理函数
+                await live_redis.invalidate_tags("test:items")
+                response = await client.get("/items?page=2", headers=token())
+                assert response.headers["x-cache"] == "MISS"
+                assert app.state.calls == 3
+
+                # 已吊销的令牌不读取缓存
+                await token_versions.bump(90001)
+                response = await client.get("/items?page=2", headers=token())
+                assert "x-cache" not in response.headers
+                assert app.state.calls == 4
+                assert cache.get_stats()["hits"] == 2
+                assert cache.get_stats()["not_modified"] == 1
+            finally:
+                await live_redis.delete_many(
+                    await live_redis.redis.keys("respcache:test:items:*")
+                    + [f"{token_versions.key_prefix}{uid}" for uid in uids]
+                    + [live_redis.tag_version_key("test:items")]
+                )
@@ -0,0 +1,305 @@
+"""
+测试安全相关工具
+"""
+import asyncio
+import json
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from tortoise.exceptions import IncompleteInstanceError
+
+from app.models.models import User
+from app.core.password_hasher import PasswordHasherPool, PasswordHasherBusy
+from app.core.deps import get_current_user
+from app.core.principal_cache import principal_cache
+from app.core.token_versions import token_versions
+from app.core.api_keys import api_key_resolver, generate_api_key, hash_api_key, parse_api_key_prefix
+from app.core.security import (
+    create_user_access_token,
+    decode_access_token,
+    token_cache,
+    get_password_hash,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
+from app.utils.tiered_cache import cache_invalidation_bus
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestPasswordHasher:
+    """密码哈希工作池测试"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_async(self):
+        """测试异步哈希与校验"""
+        hashed = await hash_password_async("secret123")
+        assert verify_password("secret123", hashed)
+        assert await verify_password_async("secret123", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+    @pytest.mark.asyncio
+    async def test_async_verify_accepts_sync_hash(self):
+        """测试异步校验兼容同步生成的哈希"""
+        hashed = get_password_hash("secret123")
+        assert await verify_password_async("secret123", hashed)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """测试队列满时拒绝新任务"""
+        pool = PasswordHasherPool(executor_type="thread", max_workers=1, max_pending=0)
+        try:
+            running = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+            await asyncio.sleep(0.05)
+            with pytest.raises(PasswordHasherBusy):
+                await pool.run(time.sleep, 0)
+            await running
+
+            stats = pool.get_stats()
+            assert stats["completed"] == 1
+            assert stats["rejected"] == 1
+            assert stats["in_flight"] == 0
+        finally:
+            pool.shutdown()
+
+
+class TestPrincipalCache:
+    """认证用户缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_cached_user_skips_database(self, test_user):
+        """测试命中缓存时不再查询数据库"""
+        principal_cache.local.clear()
+        loads = principal_cache.db_loads
+
+        first = await principal_cache.get_user("testuser")
+        second = await principal_cache.get_user("testuser")
+
+        assert principal_cache.db_loads == loads + 1
+        assert second.id == first.id == test_user.id
+        assert second.email == "test@example.com"
+        assert second.is_active is True
+        assert second.created_at == first.created_at
+
+    @pytest.mark.asyncio
+    async def test_password_hash_not_cached(self, test_user):
+        """测试缓存中不保存密码哈希，还原的用户对象不能直接保存"""
+        principal_cache.local.clear()
+        await principal_cache.get_user("testuser")
+        assert "hashed_password" not in principal_cache.local.get("testuser")
+
+        user = await principal_cache.get_user("testuser")
+        assert user.username == "testuser"
+        with pytest.raises(IncompleteInstanceError):
+            await user.save()
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, test_user):
+        """测试缓存失效后重新加载"""
+        await principal_cache.get_user("testuser")
+        await User.filter(id=test_user.id).update(is_active=False)
+        await principal_cache.invalidate("testuser")
+
+        user = await principal_cache.get_user("testuser")
+        assert user.is_active is False
+
+
+class TestTokenClaims:
+    """令牌授权声明测试"""
+
+    def test_claims_in_token(self, test_superuser):
+        """测试令牌携带授权声明"""
+        token = create_user_access_token(test_superuser, token_version=3)
+        payload = decode_access_token(token)
+        assert payload["sub"] == "admin"
+        assert payload["uid"] == test_superuser.id
+        assert payload["is_superuser"] is True
+        assert payload["is_staff"] is False
+        assert payload["ver"] == 3
+
+    def test_invalid_token(self):
+        """测试无效令牌"""
+        assert decode_access_token("invalid_token") is None
+
+    def test_verified_token_cached(self, test_superuser):
+        """测试重复验证同一令牌时命中缓存"""
+        token = create_user_access_token(test_superuser, token_version=5)
+        token_cache.clear()
+        hits = token_cache.hits
+
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+
+        assert token_cache.hits == hits + 1
+        assert first == second
+        # 返回副本，调用方修改不影响缓存
+        second["sub"] = "changed"
+        assert decode_access_token(token)["sub"] == "admin"
+
+    @pytest.mark.asyncio
+    async def test_admin_authorized_from_claims(self, client, test_superuser, monkeypatch):
+        """测试管理接口直接使用令牌声明授权"""
+        async def current_version(user_id):
+            return 1
+
+        monkeypatch.setattr(token_versions, "get", current_version)
+        headers = {"Authorization": f"Bearer {create_user_access_token(test_superuser, 1)}"}
+        response = await client.get("/api/v1/admin/statistics", headers=headers)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_revoked_token_rejected(self, client, test_superuser, monkeypatch):
+        """测试版本号递增后旧令牌失效"""
+        async def current_version(user_id):
+            return 2
+
+        monkeypatch.setattr(token_versions, "get", current_version)
+        headers = {"Authorization": f"Bearer {create_user_access_token(test_superuser, 1)}"}
+        response = await client.get("/api/v1/admin/statistics", headers=headers)
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_revoked_token_rejected_without_cached_version(self, client, test_superuser, monkeypatch):
+        """测试 Redis 中未缓存版本（过期、被淘汰或不可用）时按数据库中的版本校验"""
+        async def not_cached(user_id):
+            return None
+
+        async def remember(user_id, version):
+            return True
+
+        monkeypatch.setattr(token_versions, "get", not_cached)
+        monkeypatch.setattr(token_versions, "remember", remember)
+        old = create_user_access_token(test_superuser, 0)
+        assert (await get_current_user(bearer(old))).id == test_superuser.id
+
+        # 认证用户缓存中的用户仍是旧版本，校验时查询数据库
+        assert await token_versions.bump(test_superuser.id) == 1
+        with pytest.raises(HTTPException):
+            await get_current_user(bearer(old))
+        response = await client.get("/api/v1/admin/statistics", headers={"Authorization": f"Bearer {old}"})
+        assert response.status_code == 401
+
+        new = create_user_access_token(test_superuser, 1)
+        assert (await get_current_user(bearer(new))).id == test_superuser.id
+        response = await client.get("/api/v1/admin/statistics", headers={"Authorization": f"Bearer {new}"})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_bump_updates_cached_version(self, db, test_user, live_redis):
+        """测试递增版本后更新 Redis 中的缓存，键被删除后从数据库重新读取"""
+        assert await token_versions.current(test_user.id) == 0
+        assert await token_versions.bump(test_user.id) == 1
+        assert await token_versions.get(test_user.id) == 1
+
+        await live_redis.delete_key(f"{token_versions.key_prefix}{test_user.id}")
+        assert await token_versions.get(test_user.id) is None
+        assert await token_versions.current(test_user.id) == 1
+        # 缓存只增不减
+        await token_versions.remember(test_user.id, 0)
+        assert await token_versions.get(test_user.id) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_bump_during_redis_outage(self, client, test_superuser, live_redis, monkeypatch):
+        """测试递增版本时 Redis 不可用：旧缓存删除前本进程按数据库校验，Redis 恢复后删除旧缓存"""
+        headers = {"Authorization": f"Bearer {create_user_access_token(test_superuser, 0)}"}
+        assert (await client.get("/api/v1/admin/statistics", headers=headers)).status_code == 200
+        assert await token_versions.get(test_superuser.id) == 0
+
+        async def run_script(*args, **kwargs):
+            return None
+
+        async def delete(*keys):
+            raise ConnectionError("Redis 不可用")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(live_redis, "run_script", run_script)
+            patch.setattr(live_redis.redis, "delete", delete)
+            assert await token_versions.bump(test_superuser.id) == 1
+            # 缓存中仍是旧版本
+            assert await live_redis.redis.get(f"{token_versions.key_prefix}{test_superuser.id}") == "0"
+            assert (await client.get("/api/v1/admin/statistics", headers=headers)).status_code == 401
+
+        # Redis 恢复后删除旧缓存，并从数据库回填当前版本
+        assert (await client.get("/api/v1/admin/statistics", headers=headers)).status_code == 401
+        assert await token_versions.get(test_superuser.id) == 1
+        assert not token_versions._stale
+
+class TestApiKeys:
+    """API 密钥测试"""
+
+    def test_generate_and_parse(self):
+        """测试生成与解析密钥"""
+        key, prefix = generate_api_key()
+        assert parse_api_key_prefix(key) == prefix
+        assert parse_api_key_prefix("invalid") is None
+        assert len(hash_api_key(key)) == 64
+        assert hash_api_key(key) != hash_api_key(key + "x")
+
+    @pytest.mark.asyncio
+    async def test_api_key_lifecycle(self, client, superuser_headers):
+        """测试创建、使用、吊销 API 密钥"""
+        response = await client.post(
+            "/api/v1/admin/api-keys",
+            headers=superuser_headers,
+            json={"name": "reporting-service", "scopes": ["admin"]}
+        )
+        assert response.status_code == 201
+        data = response.json()
+        key_headers = {"X-API-Key": data["key"]}
+        assert data["scopes"] == ["admin"]
+
+        # admin 权限范围可以访问管理接口，但不能访问超级管理员接口
+        response = await client.get("/api/v1/admin/statistics", headers=key_headers)
+        assert response.status_code == 200
+        response = await client.get("/api/v1/admin/api-keys", headers=key_headers)
+        assert response.status_code == 403
+
+        # 错误的密钥
+        response = await client.get(
+            "/api/v1/admin/statistics",
+            headers={"X-API-Key": data["key"][:-1] + "x"}
+        )
+        assert response.status_code == 401
+
+        # 吊销后立即失效
+        response = await client.delete(f"/api/v1/admin/api-keys/{data['id']}", headers=superuser_headers)
+        assert response.status_code == 204
+        response = await client.get("/api/v1/admin/statistics", headers=key_headers)
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_task_routes_require_scope(self, client, superuser_headers):
+        """测试任务接口需要 tasks 权限范围"""
+        response = await client.get("/api/v1/tasks/abc/status")
+        assert response.status_code == 401
+
+        response = await client.post(
+            "/api/v1/admin/api-keys",
+            headers=superuser_headers,
+            json={"name": "reporting-service", "scopes": ["admin"]}
+        )
+        response = await client.get("/api/v1/tasks/abc/status", headers={"X-API-Key": response.json()["key"]})
+        assert response.status_code == 403
+
+    def test_invalidate_other_workers(self):
+        """测试其他 worker 吊销密钥的失效消息清除本进程的缓存"""
+        api_key_resolver.local.set("abc123", {"id": 1})
+        cache_invalidation_bus._handle(json.dumps({
+            "origin": "other-worker", "ns": api_key_resolver.namespace, "keys": ["abc123"]
+        }))
+        assert api_key_resolver.local.get("abc123") is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_scope(self, client, superuser_headers):
+        """测试无效的权限范围"""
+        response = await client.post(
+            "/api/v1/admin/api-keys",
+            headers=superuser_headers,
+            json={"name": "bad", "scopes": ["root"]}
+        )
+        assert response.status_code == 400
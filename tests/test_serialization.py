@@ -0,0 +1,85 @@
+"""
+测试列表接口的快速序列化
+"""
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.admin.admin_views import USER_LIST_FIELDS, USER_ORDERING
+from app.admin.schemas import UserAdminResponse, UserListResponse
+from app.core.cache_tags import USERS_NAMESPACE, invalidate_namespaces
+from app.models.models import CrontabSchedule, IntervalSchedule, PeriodicTask, User
+from app.services.task_scheduler import TaskSchedulerService
+from app.utils.pagination import paginate_cursor
+from app.utils.serialization import render_page
+
+
+class TestListSerialization:
+    """列表序列化测试"""
+
+    @pytest.mark.asyncio
+    async def test_render_page_matches_models(self, db, test_user):
+        """测试按列查询并整页序列化的结果与逐行 model_validate 的结果一致"""
+        await User.create(username="other", email="other@example.com", hashed_password="x", is_staff=True)
+
+        projected = await paginate_cursor(User.all(), USER_ORDERING, 10, fields=USER_LIST_FIELDS)
+        assert "hashed_password" not in projected.items[0]
+        content = render_page(UserListResponse, UserAdminResponse, projected.items, total=2, next_cursor=None)
+
+        page = await paginate_cursor(User.all(), USER_ORDERING, 10)
+        expected = UserListResponse(
+            total=2, items=[UserAdminResponse.model_validate(u, from_attributes=True) for u in page.items]
+        )
+        assert json.loads(content) == expected.model_dump(mode="json")
+
+    @pytest.mark.asyncio
+    async def test_projected_cursor(self, db):
+        """测试只查询部分列时仍能生成下一页游标"""
+        for i in range(3):
+            await User.create(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x")
+
+        first = await paginate_cursor(User.all(), USER_ORDERING, 2, fields=("username",))
+        second = await paginate_cursor(User.all(), USER_ORDERING, 2, cursor=first.next_cursor, fields=("username",))
+        assert [row["username"] for row in first.items + second.items] == ["user2", "user1", "user0"]
+
+    @pytest.mark.asyncio
+    async def test_admin_lists(self, client: AsyncClient, superuser_headers):
+        """测试定时任务与任务结果列表（调度显示文本由关联列计算）"""
+        interval = await IntervalSchedule.create(every=5, period="minutes")
+        crontab = await CrontabSchedule.create(minute="0", hour="3")
+        await PeriodicTask.create(name="a", task="demo", interval=interval)
+        await PeriodicTask.create(name="b", task="demo", crontab=crontab)
+        await TaskSchedulerService.save_task_result("r1", "demo", "FAILURE", traceback="boom")
+
+        response = await client.get("/api/v1/admin/tasks", headers=superuser_headers)
+        assert response.headers["content-type"] == "application/json"
+        items = response.json()["items"]
+        assert [(t["interval_display"], t["crontab_display"]) for t in items] == [
+            (str(interval), None), (None, str(crontab))
+        ]
+
+        response = await client.get("/api/v1/admin/results", headers=superuser_headers)
+        data = response.json()
+        assert data["total"] == 1 and data["items"][0]["traceback"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_user_list_etag(self, client: AsyncClient, test_user, superuser_headers, live_redis):
+        """测试用户列表经过响应缓存：命中时返回相同内容，If-None-Match 匹配时返回 304"""
+        await invalidate_namespaces(USERS_NAMESPACE)
+        try:
+            first = await client.get("/api/v1/admin/users?limit=1", headers=superuser_headers)
+            second = await client.get("/api/v1/admin/users?limit=1", headers=superuser_headers)
+            assert first.status_code == second.status_code == 200
+            assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+            assert first.content == second.content
+            assert len(first.json()["items"]) == 1 and first.json()["next_cursor"]
+
+            etag = first.headers["etag"]
+            response = await client.get(
+                "/api/v1/admin/users?limit=1", headers={**superuser_headers, "If-None-Match": etag}
+            )
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+        finally:
+            await live_redis.delete_many(await live_redis.redis.keys("respcache:admin_users:*"))
@@ -0,0 +1,132 @@
+"""
+测试任务统计
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.task_counters import task_counters
+from app.models.models import IntervalSchedule, TaskResult
+from app.services.task_scheduler import TaskSchedulerService
+
+
+async def create_task(name, interval, enabled=True):
+    return await TaskSchedulerService.create_periodic_task(
+        name=name, task="demo", interval_id=interval.id, enabled=enabled
+    )
+
+
+def summary(stats):
+    return stats["periodic_tasks"], stats["task_results"]
+
+
+class TestTaskStatistics:
+    """任务统计测试"""
+
+    @pytest.mark.asyncio
+    async def test_aggregate(self, db):
+        """测试未连接 Redis 时直接聚合"""
+        interval = await IntervalSchedule.create(every=10, period="seconds")
+        await create_task("a", interval)
+        await create_task("b", interval, enabled=False)
+        for i, status in enumerate(["SUCCESS", "SUCCESS", "FAILURE", "STARTED"]):
+            await TaskSchedulerService.save_task_result(f"r{i}", "demo", status)
+
+        tasks, results = summary(await TaskSchedulerService.get_task_statistics())
+        assert tasks == {"total": 2, "enabled": 1, "disabled": 1}
+        assert results == {"total": 4, "success": 2, "failure": 1, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_counters_follow_writes(self, db, live_redis):
+        """测试计数器随创建、启用/禁用、状态变化、删除与清理增量更新，与聚合结果一致"""
+        await task_counters.reset()
+        try:
+            interval = await IntervalSchedule.create(every=10, period="seconds")
+            task = await create_task("a", interval)
+            await TaskSchedulerService.save_task_result("r1", "demo", "PENDING")
+
+            # 首次读取时聚合并重建计数器
+            await TaskSchedulerService.get_task_statistics()
+            assert await task_counters.get() is not None
+
+            other = await create_task("b", interval)
+            await TaskSchedulerService.disable_task(task.id)
+            await TaskSchedulerService.disable_task(task.id)
+            await TaskSchedulerService.delete_periodic_task(other.id)
+            await TaskSchedulerService.save_task_result("r1", "demo", "STARTED")
+            await TaskSchedulerService.save_task_result("r1", "demo", "SUCCESS")
+            await TaskSchedulerService.save_task_result("r1", "demo", "SUCCESS")
+            await TaskSchedulerService.save_task_result("r2", "demo", "FAILURE")
+
+            stats = await TaskSchedulerService.get_task_statistics()
+            tasks, results = summary(stats)
+            assert tasks == {"total": 1, "enabled": 0, "disabled": 1}
+            assert results == {"total": 2, "success": 1, "failure": 1, "pending": 0}
+            # 计数器中减到 0 的字段仍保留，只比较非 0 的字段
+            counts, expected = await task_counters.get(), await TaskSchedulerService.aggregate_task_statistics()
+            assert {k: v for k, v in counts.items() if v} == {k: v for k, v in expected.items() if v}
+
+            # 清理后删除计数器，下一次读取重新聚合
+            await TaskResult.filter(task_id="r2").update(date_created=datetime.utcnow() - timedelta(days=60))
+            assert await TaskSchedulerService.cleanup_old_results(days=30) == 1
+            assert await task_counters.get() is None
+            _, results = summary(await TaskSchedulerService.get_task_statistics())
+            assert results == {"total": 1, "success": 1, "failure": 0, "pending": 0}
+        finally:
+            await task_counters.reset()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_status_updates(self, db, live_redis):
+        """测试并发更新同一任务的状态时计数器不会重复扣减"""
+        await task_counters.reset()
+        try:
+            await TaskSchedulerService.save_task_result("r1", "demo", "STARTED")
+            await TaskSchedulerService.get_task_statistics()
+
+            await asyncio.gather(*[
+                TaskSchedulerService.save_task_result("r1", "demo", status)
+                for status in ["SUCCESS", "FAILURE", "SUCCESS", "RETRY"]
+            ])
+            counts, expected = await task_counters.get(), await TaskSchedulerService.aggregate_task_statistics()
+            assert {k: v for k, v in counts.items() if v} == {k: v for k, v in expected.items() if v}
+            assert all(v >= 0 for v in counts.values())
+        finally:
+            await task_counters.reset()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_toggles_and_delete(self, db, live_redis):
+        """测试并发启用/禁用、删除同一定时任务时计数器与聚合结果一致"""
+        await task_counters.reset()
+        try:
+            interval = await IntervalSchedule.create(every=10, period="seconds")
+            task = await create_task("a", interval)
+            other = await create_task("b", interval, enabled=False)
+            await TaskSchedulerService.get_task_statistics()
+
+            await asyncio.gather(*[
+                TaskSchedulerService.disable_task(task.id),
+                TaskSchedulerService.disable_task(task.id),
+                TaskSchedulerService.enable_task(other.id),
+                TaskSchedulerService.enable_task(other.id),
+            ])
+            await asyncio.gather(
+                TaskSchedulerService.enable_task(task.id),
+                TaskSchedulerService.delete_periodic_task(task.id),
+                TaskSchedulerService.delete_periodic_task(task.id),
+            )
+            counts, expected = await task_counters.get(), await TaskSchedulerService.aggregate_task_statistics()
+            assert {k: v for k, v in counts.items() if v} == {k: v for k, v in expected.items() if v}
+            assert expected["tasks:total"] == expected["tasks:enabled"] == 1
+        finally:
+            await task_counters.reset()
+
+    @pytest.mark.asyncio
+    async def test_statistics_endpoint(self, client: AsyncClient, superuser_headers):
+        """测试统计接口"""
+        await TaskSchedulerService.save_task_result("r1", "demo", "SUCCESS")
+
+        response = await client.get("/api/v1/admin/statistics", headers=superuser_headers)
+        assert response.status_code == 200
+        assert response.json()["task_results"]["success"] == 1
@@ -0,0 +1,69 @@
+"""
+测试两级缓存
+"""
+import asyncio
+
+import pytest
+
+from app.utils.helpers import cancel_task
+from app.utils.tiered_cache import CacheInvalidationBus, TwoTierCache
+
+
+class TestTwoTierCache:
+    """两级缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_local_only_without_redis(self):
+        """测试未连接 Redis 时仅使用 L1"""
+        cache = TwoTierCache("test:tiered", bus=CacheInvalidationBus())
+        await cache.set("a", {"v": 1})
+        assert await cache.get("a") == {"v": 1}
+        await cache.delete("a")
+        assert await cache.get("a") is None
+        assert cache.get_stats()["l1"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cross_worker_invalidation(self, live_redis):
+        """测试失效消息清除其他进程的 L1（两个总线模拟两个 worker）"""
+        bus1, bus2 = CacheInvalidationBus(), CacheInvalidationBus()
+        worker1 = TwoTierCache("test:tiered", bus=bus1)
+        worker2 = TwoTierCache("test:tiered", bus=bus2)
+        bus1.start()
+        bus2.start()
+        try:
+            await asyncio.sleep(0.1)
+            await worker1.set("k", {"v": 1})
+            assert await worker2.get("k") == {"v": 1}
+            stats = worker2.get_stats()
+            assert stats["l1"]["misses"] == 1
+            assert stats["l2"]["hits"] == 1
+
+            # worker1 更新后，worker2 的 L1 被清除并从 L2 读到新值
+            await worker1.set("k", {"v": 2})
+            await asyncio.sleep(0.1)
+            assert "k" not in worker2.local
+            assert await worker2.get("k") == {"v": 2}
+
+            await worker2.delete("k")
+            await asyncio.sleep(0.1)
+            assert "k" not in worker1.local
+            assert await worker1.get("k") is None
+            assert bus1.received >= 1
+        finally:
+            await bus1.stop()
+            await bus2.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_task_retries_swallowed_cancel(self):
+        """测试取消请求被吞掉后重复取消，后台任务仍能结束"""
+        async def stubborn():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                pass
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(stubborn())
+        await asyncio.sleep(0)
+        await asyncio.wait_for(cancel_task(task, retry_interval=0.05), 1)
+        assert task.cancelled()
@@ -0,0 +1,71 @@
+"""
+测试管理后台用户搜索
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.models.models import User
+from app.services.user_search import search_users
+
+
+async def create_users(*names):
+    for name in names:
+        await User.create(username=name, email=f"{name.lower()}@example.com", hashed_password="x")
+
+
+async def search(term, queryset=None):
+    users = await search_users(queryset if queryset is not None else User.all(), term).order_by("id")
+    return [u.username for u in users]
+
+
+class TestUserSearch:
+    """用户搜索测试"""
+
+    @pytest.mark.asyncio
+    async def test_substring_and_prefix(self, db):
+        """测试子串匹配（不区分大小写，包含邮箱）与短关键词的前缀匹配"""
+        await create_users("Alice", "malice", "Bob", "bobby_tables")
+
+        assert await search("LIC") == ["Alice", "malice"]
+        assert await search("ice@exa") == ["Alice", "malice"]
+        assert await search("by_t") == ["bobby_tables"]
+        assert await search("al") == ["Alice"]
+        assert await search("B") == ["Bob", "bobby_tables"]
+        assert await search("nobody") == []
+        assert await search("  ") == ["Alice", "malice", "Bob", "bobby_tables"]
+        assert await search("bob", User.filter(username="Bob")) == ["Bob"]
+
+    @pytest.mark.asyncio
+    async def test_special_characters(self, db):
+        """测试关键词中的引号与通配符按普通字符匹配"""
+        await create_users('quo"te', "per%cent", "plain")
+
+        assert await search('o"t') == ['quo"te']
+        assert await search("r%c") == ["per%cent"]
+        assert await search("%") == []
+        assert await search('"') == []
+
+    @pytest.mark.asyncio
+    async def test_index_follows_writes(self, db):
+        """测试搜索索引随用户的修改与删除同步"""
+        await create_users("carol", "dave")
+        user = await User.get(username="carol")
+
+        user.username = "caroline"
+        await user.save()
+        assert await search("oline") == ["caroline"]
+
+        await User.filter(username="dave").update(email="d@other.org")
+        assert await search("example") == ["caroline"]
+        assert await search("other") == ["dave"]
+
+        await user.delete()
+        assert await search("carol") == []
+
+    @pytest.mark.asyncio
+    async def test_admin_list_search(self, client: AsyncClient, test_user, superuser_headers):
+        """测试管理后台用户列表的搜索参数"""
+        response = await client.get("/api/v1/admin/users?search=TESTUS", headers=superuser_headers)
+        data = response.json()
+        assert data["total"] == 1
+        assert [u["username"] for u in data["items"]] == ["testuser"]